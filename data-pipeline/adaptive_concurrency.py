@@ -0,0 +1,269 @@
+import os
+import time
+import inspect
+import random
+import asyncio
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional, Callable, AsyncIterator, Awaitable, TypeVar
+
+from metrics import PIPELINE_CONCURRENCY_LIMIT, PIPELINE_IN_FLIGHT, PIPELINE_ITEMS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Error codes and statuses that mean "slow down" (S3 answers 503 SlowDown)
+THROTTLING_ERROR_CODES = frozenset({
+    'SlowDown', 'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestLimitExceeded',
+    'TooManyRequests', 'TooManyRequestsException', 'RequestThrottled', 'ServiceUnavailable', '503', '429'
+})
+THROTTLING_STATUSES = frozenset({429, 503})
+
+# First delay before retrying a throttled item; doubles per attempt
+RETRY_BASE_DELAY = 0.5
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """
+    Whether an exception reports that the server is throttling requests
+
+    Recognizes botocore ClientErrors (error code or HTTP status), aiohttp
+    response errors and download errors carrying a 429/503 status.
+    """
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        code = response.get('Error', {}).get('Code')
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+        return code in THROTTLING_ERROR_CODES or status in THROTTLING_STATUSES
+    return getattr(error, 'status', None) in THROTTLING_STATUSES
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit adapted by additive increase / multiplicative decrease
+
+    Each success raises the limit by increase / limit, i.e. by `increase`
+    per window of successes; a throttling response multiplies it by
+    `decrease`. Decreases are at most one per cooldown, so a burst of
+    throttled requests that were all in flight together counts as one
+    congestion signal. Not thread-safe: use it from one event loop at a time.
+    """
+
+    def __init__(self,
+                 name: str,
+                 initial: float,
+                 minimum: float = 1,
+                 maximum: float = 64,
+                 increase: float = 1.0,
+                 decrease: float = 0.5,
+                 cooldown: float = 1.0):
+        self.name = name
+        self.minimum = max(1.0, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(self.maximum, max(self.minimum, initial))
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = float('-inf')
+        # Resolved (and replaced) whenever a slot may have become free
+        self._changed: Optional[asyncio.Future] = None
+        PIPELINE_CONCURRENCY_LIMIT.set(self.limit, pipeline=name)
+
+    @classmethod
+    def from_env(cls, name: str, default_initial: int, default_maximum: int) -> 'AIMDLimiter':
+        """Limiter configured by <NAME>_CONCURRENCY and <NAME>_MAX_CONCURRENCY"""
+        prefix = name.upper()
+        initial = int(os.getenv(f'{prefix}_CONCURRENCY', str(default_initial)))
+        maximum = int(os.getenv(f'{prefix}_MAX_CONCURRENCY', str(max(default_maximum, initial))))
+        return cls(name, initial=initial, maximum=maximum)
+
+    @property
+    def available(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free"""
+        if not self.available:
+            return False
+        self.in_flight += 1
+        PIPELINE_IN_FLIGHT.set(self.in_flight, pipeline=self.name)
+        return True
+
+    async def acquire(self):
+        """Wait for a free slot"""
+        loop = asyncio.get_running_loop()
+        while not self.try_acquire():
+            # A future left by waiters on an earlier event loop cannot be awaited here
+            if self._changed is None or self._changed.get_loop() is not loop:
+                self._changed = loop.create_future()
+            # wait() leaves the shared future alone if this waiter is cancelled
+            await asyncio.wait([self._changed])
+
+    def release(self):
+        self.in_flight -= 1
+        PIPELINE_IN_FLIGHT.set(self.in_flight, pipeline=self.name)
+        self._wake()
+
+    def _wake(self):
+        changed, self._changed = self._changed, None
+        if changed is not None and not changed.done() and not changed.get_loop().is_closed():
+            changed.set_result(None)
+
+    def record_success(self):
+        if self.limit < self.maximum:
+            previous = int(self.limit)
+            self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            PIPELINE_CONCURRENCY_LIMIT.set(self.limit, pipeline=self.name)
+            if int(self.limit) > previous:
+                self._wake()
+
+    def record_throttle(self):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        PIPELINE_CONCURRENCY_LIMIT.set(self.limit, pipeline=self.name)
+        logger.warning(f"{self.name}: throttled, concurrency limit {previous:.1f} -> {self.limit:.1f}")
+
+    async def __aenter__(self) -> 'AIMDLimiter':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+@dataclass
+class PipelineProgress:
+    """Counters of a running pipeline"""
+    discovered: int = 0
+    completed: int = 0
+    failed: int = 0
+    throttled: int = 0
+    retried: int = 0
+    in_flight: int = 0
+    limit: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def processed(self) -> int:
+        return self.completed + self.failed
+
+    @property
+    def rate(self) -> float:
+        """Items processed per second so far"""
+        elapsed = time.monotonic() - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop('started_at')
+        data['processed'] = self.processed
+        data['rate'] = round(self.rate, 2)
+        return data
+
+
+async def run_adaptive_pipeline(items: AsyncIterator[T],
+                                worker: Callable[[T], Awaitable[R]],
+                                limiter: AIMDLimiter,
+                                on_result: Optional[Callable[[T, R], Optional[Awaitable[None]]]] = None,
+                                on_progress: Optional[Callable[[PipelineProgress], None]] = None,
+                                retries: int = 3) -> PipelineProgress:
+    """
+    Process items as they arrive with a pool of workers under an adaptive concurrency limit
+
+    Items flow through a bounded queue, so a slow source and slow items
+    overlap instead of waiting for each other. Every success feeds the
+    limiter's additive increase; a throttling error shrinks the limit and
+    the item is retried after a jittered backoff. Other errors count the
+    item as failed.
+
+    Args:
+        items: Source of work items; its exceptions propagate
+        worker: Coroutine function processing one item
+        limiter: Concurrency limit to adapt
+        on_result: Called with (item, result) after each success; awaited if it returns an awaitable
+        on_progress: Called with the progress counters after each processed item
+        retries: Attempts per item after throttling errors
+
+    Returns:
+        Final progress counters
+
+    Raises:
+        Exception: Whatever the source or a callback raised; the other tasks are cancelled first
+    """
+    progress = PipelineProgress(limit=limiter.limit)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * int(limiter.maximum))
+    done = object()
+
+    def report():
+        progress.in_flight = limiter.in_flight
+        progress.limit = limiter.limit
+        if on_progress:
+            on_progress(progress)
+
+    async def process(item: T):
+        for attempt in range(retries + 1):
+            async with limiter:
+                try:
+                    result = await worker(item)
+                except Exception as e:
+                    throttled = is_throttling_error(e)
+                    if throttled:
+                        limiter.record_throttle()
+                        progress.throttled += 1
+                        PIPELINE_ITEMS.inc(pipeline=limiter.name, result="throttled")
+                    if not throttled or attempt == retries:
+                        progress.failed += 1
+                        PIPELINE_ITEMS.inc(pipeline=limiter.name, result="failed")
+                        logger.error(f"{limiter.name}: giving up on item after {attempt + 1} attempts: {e}")
+                        return
+                else:
+                    limiter.record_success()
+                    progress.completed += 1
+                    PIPELINE_ITEMS.inc(pipeline=limiter.name, result="completed")
+                    if on_result:
+                        outcome = on_result(item, result)
+                        if inspect.isawaitable(outcome):
+                            await outcome
+                    return
+            # Back off outside the limiter so other items can use the slot
+            progress.retried += 1
+            await asyncio.sleep(RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    async def run_worker():
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            await process(item)
+            report()
+
+    async def produce():
+        async for item in items:
+            progress.discovered += 1
+            await queue.put(item)
+        # Only on success: after an error the workers are cancelled and a full queue would never drain
+        for _ in workers:
+            await queue.put(done)
+
+    workers = [asyncio.ensure_future(run_worker()) for _ in range(int(limiter.maximum))]
+    producer = asyncio.ensure_future(produce())
+    try:
+        await asyncio.gather(producer, *workers)
+    except BaseException:
+        producer.cancel()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(producer, *workers, return_exceptions=True)
+        raise
+
+    report()
+    return progress
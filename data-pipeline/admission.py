@@ -0,0 +1,175 @@
+import os
+import math
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from contextlib import asynccontextmanager
+from typing import List, Dict, Tuple, Optional
+
+from metrics import ADMISSION_IN_PROGRESS, ADMISSION_QUEUED, ADMISSION_REJECTED
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Lower value is served first
+PRIORITIES = {
+    'high': 0,
+    'normal': 1,
+    'low': 2
+}
+DEFAULT_PRIORITY = PRIORITIES['normal']
+
+# Weight of the latest request in the moving average of service time
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted within its deadline"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def parse_priority(value: Optional[str]) -> int:
+    """Map an X-Priority header value (high, normal, low) to a priority level"""
+    if not value:
+        return DEFAULT_PRIORITY
+    return PRIORITIES.get(value.strip().lower(), DEFAULT_PRIORITY)
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded, prioritized wait queue for one endpoint class
+
+    Up to max_concurrent requests run at once; up to max_queue more wait,
+    highest priority first, then in arrival order. A request is rejected
+    immediately if the queue is full or if the estimated wait (from a moving
+    average of service time) exceeds max_wait, and rejected after waiting
+    max_wait seconds otherwise, so callers get a 429 with a useful
+    Retry-After instead of a timeout.
+    """
+
+    def __init__(self,
+                 name: str,
+                 max_concurrent: int,
+                 max_queue: int,
+                 max_wait: float,
+                 initial_service_time: float = 1.0):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self.service_time = initial_service_time
+        self._running = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_env(cls, name: str, max_concurrent: int, max_queue: int, max_wait: float) -> 'AdmissionController':
+        """Create a controller whose limits can be overridden with ADMISSION_<NAME>_* variables"""
+        prefix = f"ADMISSION_{name.upper().replace('-', '_')}"
+        return cls(
+            name,
+            max_concurrent=int(os.getenv(f"{prefix}_CONCURRENCY", str(max_concurrent))),
+            max_queue=int(os.getenv(f"{prefix}_QUEUE", str(max_queue))),
+            max_wait=float(os.getenv(f"{prefix}_MAX_WAIT", str(max_wait)))
+        )
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _update_gauges(self):
+        ADMISSION_IN_PROGRESS.set(self._running, endpoint_class=self.name)
+        ADMISSION_QUEUED.set(len(self._waiters), endpoint_class=self.name)
+
+    def _estimated_wait(self, ahead: int) -> float:
+        """Seconds until a request with `ahead` waiters in front of it would start"""
+        return (ahead // self.max_concurrent + 1) * self.service_time
+
+    def _reject(self, reason: str, retry_after: float):
+        ADMISSION_REJECTED.inc(endpoint_class=self.name, reason=reason)
+        logger.warning(f"Rejecting {self.name} request ({reason}; {self._running} running, {len(self._waiters)} queued)")
+        raise AdmissionRejected(f"Too many concurrent {self.name} requests, retry later", retry_after)
+
+    def _remove_waiter(self, future: asyncio.Future):
+        self._waiters = [waiter for waiter in self._waiters if waiter[2] is not future]
+        heapq.heapify(self._waiters)
+
+    async def _acquire(self, priority: int):
+        if self._running < self.max_concurrent and not self._waiters:
+            self._running += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full", self._estimated_wait(len(self._waiters)))
+
+        ahead = sum(1 for waiter in self._waiters if waiter[0] <= priority)
+        estimate = self._estimated_wait(ahead)
+        if estimate > self.max_wait:
+            self._reject("deadline", estimate)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._update_gauges()
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # A slot was handed over just as we gave up; pass it on
+                self._release()
+            else:
+                self._remove_waiter(future)
+                self._update_gauges()
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject("timeout", self.service_time)
+            raise
+
+    def _release(self):
+        # Hand the slot directly to the highest-priority live waiter
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                self._update_gauges()
+                return
+        self._running -= 1
+        self._update_gauges()
+
+    @asynccontextmanager
+    async def admit(self, priority: int = DEFAULT_PRIORITY):
+        """
+        Hold one concurrency slot for the duration of the block
+
+        Args:
+            priority: Queue priority (see PRIORITIES); lower runs first
+
+        Raises:
+            AdmissionRejected: If the request cannot start within max_wait
+        """
+        await self._acquire(priority)
+        self._update_gauges()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.service_time += SERVICE_TIME_SMOOTHING * (elapsed - self.service_time)
+            self._release()
+
+    def status(self) -> Dict[str, float]:
+        return {
+            "running": self._running,
+            "queued": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "avg_service_seconds": round(self.service_time, 3)
+        }
@@ -1,9 +1,9 @@
-import json
 from collections import Counter
 
+from publication_file import read_publications
+
 # Load the processed publications data
-with open('data/processed_publications.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+data = read_publications('data/processed_publications.json')
 
 # Extract research areas
 areas = [item.get('research_area', 'Unknown') for item in data]
@@ -0,0 +1,168 @@
+import io
+import os
+import tarfile
+import zipfile
+import logging
+import posixpath
+from typing import Dict, Optional, Iterator, Tuple, Union, BinaryIO, Sequence
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Members larger than this are skipped instead of extracted
+DEFAULT_MAX_MEMBER_BYTES = int(os.getenv('ARCHIVE_MEMBER_MAX_MB', '512')) * 1024 * 1024
+# Where spooled members go (default: the system temporary directory)
+DEFAULT_SCRATCH_DIR = os.getenv('ARCHIVE_SCRATCH_DIR') or None
+
+COPY_CHUNK_SIZE = 1 << 20
+
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz')
+ZIP_SUFFIXES = ('.zip',)
+
+# An archive given as raw bytes, a file path, or a readable binary file
+ArchiveSource = Union[bytes, str, os.PathLike, BinaryIO]
+
+
+def is_archive(filename: str) -> bool:
+    """Whether a file name denotes a tar or zip archive"""
+    return filename.lower().endswith(TAR_SUFFIXES + ZIP_SUFFIXES)
+
+
+def safe_member_path(name: str) -> Optional[str]:
+    """
+    Relative path to store an archive member under, or None if it would escape the directory
+
+    Leading slashes are dropped, so absolute member names stay inside the
+    extraction directory; names that climb out of it with '..' are rejected.
+    """
+    path = posixpath.normpath(name.replace('\\', '/').lstrip('/'))
+    if path in ('', '.') or path == '..' or path.startswith('../'):
+        return None
+    return path
+
+
+def _wanted(name: str, size: int, max_member_bytes: Optional[int], extensions: Optional[Sequence[str]]) -> bool:
+    # Hidden files (and macOS resource forks); './' prefixes of tar member names are fine
+    if posixpath.basename(name.rstrip('/')).startswith('.'):
+        return False
+    if extensions and not name.lower().endswith(tuple(ext.lower() for ext in extensions)):
+        return False
+    if max_member_bytes is not None and size > max_member_bytes:
+        logger.warning(f"Skipping {name}: {size} bytes exceeds the {max_member_bytes} byte member limit")
+        return False
+    return True
+
+
+def _open_source(source: ArchiveSource) -> Tuple[BinaryIO, bool]:
+    """File object for a source, and whether the caller must close it"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), True
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, 'rb'), True
+    return source, False
+
+
+def iter_archive_members(source: ArchiveSource,
+                         filename: str,
+                         max_member_bytes: Optional[int] = DEFAULT_MAX_MEMBER_BYTES,
+                         extensions: Optional[Sequence[str]] = None) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Yield (member name, readable file object) for each regular file in an archive
+
+    Tar archives are read as a stream, so the source need not be seekable
+    and nothing is buffered beyond the decompressor's window; zip archives
+    need a seekable source (bytes, a path, or a seekable file). A file that
+    is not an archive is yielded as its only member. Each file object is
+    only valid until the next member is requested.
+
+    Args:
+        source: Archive bytes, path, or binary file object
+        filename: Archive file name, used to detect its format
+        max_member_bytes: Skip members larger than this (None: no limit)
+        extensions: Only yield members whose names end with one of these
+
+    Raises:
+        tarfile.TarError, zipfile.BadZipFile: If the archive is corrupt
+    """
+    fileobj, owned = _open_source(source)
+    try:
+        lower = filename.lower()
+        if lower.endswith(TAR_SUFFIXES):
+            with tarfile.open(fileobj=fileobj, mode='r|*') as tar:
+                for member in tar:
+                    if member.isfile() and _wanted(member.name, member.size, max_member_bytes, extensions):
+                        extracted = tar.extractfile(member)
+                        if extracted is not None:
+                            yield member.name, extracted
+
+        elif lower.endswith(ZIP_SUFFIXES):
+            with zipfile.ZipFile(fileobj) as zip_file:
+                for info in zip_file.infolist():
+                    if not info.is_dir() and _wanted(info.filename, info.file_size, max_member_bytes, extensions):
+                        # ZipExtFile stops at the declared size and checks the CRC
+                        with zip_file.open(info) as extracted:
+                            yield info.filename, extracted
+
+        else:
+            size = None
+            if hasattr(fileobj, 'seek') and fileobj.seekable():
+                position = fileobj.tell()
+                size = fileobj.seek(0, io.SEEK_END) - position
+                fileobj.seek(position)
+            if _wanted(filename, size or 0, max_member_bytes, extensions):
+                yield filename, fileobj
+    finally:
+        if owned:
+            fileobj.close()
+
+
+def _copy_capped(src: BinaryIO, dst: BinaryIO, max_bytes: Optional[int]) -> bool:
+    """Copy src to dst in chunks; False if it holds more than max_bytes"""
+    copied = 0
+    while True:
+        chunk = src.read(COPY_CHUNK_SIZE)
+        if not chunk:
+            return True
+        copied += len(chunk)
+        if max_bytes is not None and copied > max_bytes:
+            return False
+        dst.write(chunk)
+
+
+def spool_archive(source: ArchiveSource,
+                  filename: str,
+                  directory: str,
+                  max_member_bytes: Optional[int] = DEFAULT_MAX_MEMBER_BYTES,
+                  extensions: Optional[Sequence[str]] = None) -> Dict[str, str]:
+    """
+    Extract the regular files of an archive into a directory, one bounded chunk at a time
+
+    Args:
+        source: Archive bytes, path, or binary file object
+        filename: Archive file name, used to detect its format
+        directory: Scratch directory to write members under
+        max_member_bytes: Skip members larger than this (None: no limit)
+        extensions: Only extract members whose names end with one of these
+
+    Returns:
+        Mapping of member name to the path it was written to
+    """
+    extracted: Dict[str, str] = {}
+    root = os.path.abspath(directory)
+    for name, member in iter_archive_members(source, filename, max_member_bytes, extensions):
+        relative = safe_member_path(name)
+        if relative is None:
+            logger.warning(f"Skipping {name} from {filename}: path escapes the extraction directory")
+            continue
+        path = os.path.join(root, *relative.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as out:
+            complete = _copy_capped(member, out, max_member_bytes)
+        if not complete:
+            # Only reachable for sources whose size was not known up front
+            logger.warning(f"Skipping {name} from {filename}: exceeds the {max_member_bytes} byte member limit")
+            os.remove(path)
+            continue
+        extracted[name] = path
+    return extracted
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark the OSDR S3 catalog listing against a local S3 stand-in
+
+Starts a moto S3 server in a separate process, so it does not compete for
+this process's GIL (or uses --endpoint-url, e.g. a MinIO instance),
+fills a bucket with synthetic OSD-<n>/ study prefixes and compares the
+previous sequential crawl (one paginated listing per study, in turn, on the
+event loop) against S3CatalogLister at several concurrency levels. A
+round-trip delay is added to every request to approximate a WAN link to
+AWS, and a ticker task measures how long the event loop is blocked.
+
+With --throttle-rate the stand-in also enforces a token-bucket request
+rate and answers requests above it with 503 SlowDown, as S3 does when a
+prefix is hit too hard; botocore's own retries are turned off so the
+lister sees the throttling, and each pool size is run with a fixed
+concurrency limit and with the adaptive (AIMD) one.
+
+Requires boto3 and, without --endpoint-url, moto[server].
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# Add the current directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+
+from adaptive_concurrency import AIMDLimiter
+from s3_catalog import S3CatalogLister
+
+BUCKET = "nasa-osdr-benchmark"
+
+SLOW_DOWN_BODY = (b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                  b'<Error><Code>SlowDown</Code><Message>Please reduce your request rate.</Message></Error>')
+
+
+class _RawBody:
+    """Minimal urllib3-like body for a canned botocore response"""
+
+    def __init__(self, body: bytes):
+        self._body = body
+
+    def stream(self, **kwargs):
+        yield self._body
+
+
+class TokenBucket:
+    """Thread-safe request budget of `rate` per second with bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.rejected += 1
+            return False
+
+
+def make_client(endpoint_url: str, latency: float, max_pool_connections: int = 64,
+                throttle: Optional[TokenBucket] = None):
+    """
+    Client for the stand-in server that sleeps `latency` seconds before every request
+
+    With a token bucket, requests it rejects get a 503 SlowDown and are not
+    retried by botocore.
+    """
+    client = boto3.client(
+        's3',
+        endpoint_url=endpoint_url,
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name="us-east-1",
+        config=Config(max_pool_connections=max_pool_connections,
+                      retries={'max_attempts': 1 if throttle else 5, 'mode': 'standard'})
+    )
+
+    def before_send(request, **kwargs):
+        if latency > 0:
+            time.sleep(latency)
+        if throttle is None or throttle.take():
+            return None
+        return AWSResponse(request.url, 503, {'Content-Type': 'application/xml'}, _RawBody(SLOW_DOWN_BODY))
+
+    if latency > 0 or throttle is not None:
+        client.meta.events.register('before-send.s3.*', before_send)
+    return client
+
+
+def start_moto_server() -> tuple:
+    """Run moto's S3 server on a free local port; returns (process, endpoint URL)"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-H", "127.0.0.1", "-p", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("moto server did not start")
+
+
+def populate(endpoint_url: str, studies: int, files_per_study: int):
+    """Create the bucket with synthetic study prefixes"""
+    client = make_client(endpoint_url, 0)
+    client.create_bucket(Bucket=BUCKET)
+
+    def put_study(number: int):
+        for j in range(files_per_study):
+            client.put_object(Bucket=BUCKET, Key=f"OSD-{number}/GLDS-{number}_sample_{j}.csv", Body=b"x")
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(put_study, range(1, studies + 1)))
+
+
+async def measure_loop_lag(stop: asyncio.Event, lags: list):
+    """Record the worst delay of a 10 ms ticker while the crawl runs"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+
+async def sequential_crawl(client) -> tuple:
+    """The previous implementation: blocking paginators inside the coroutine, one study after another"""
+    found = 0
+    first = None
+    start = time.perf_counter()
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=BUCKET, Prefix='OSD-', Delimiter='/'):
+        for prefix in page.get('CommonPrefixes', []):
+            objects = []
+            for study_page in client.get_paginator('list_objects_v2').paginate(Bucket=BUCKET, Prefix=prefix['Prefix']):
+                objects.extend(study_page.get('Contents', []))
+            if objects:
+                found += 1
+                if first is None:
+                    first = time.perf_counter() - start
+    return found, first
+
+
+async def concurrent_crawl(client, concurrency: int, limiter: Optional[AIMDLimiter] = None) -> tuple:
+    found = 0
+    first = None
+    start = time.perf_counter()
+    lister = S3CatalogLister(BUCKET, prefix='OSD-', client=client, concurrency=concurrency, limiter=limiter)
+    async for _study_id, _objects in lister.iter_studies():
+        found += 1
+        if first is None:
+            first = time.perf_counter() - start
+    return found, first
+
+
+async def run(name: str, crawl, throttle: Optional[TokenBucket] = None) -> None:
+    stop = asyncio.Event()
+    lags: list = []
+    ticker = asyncio.create_task(measure_loop_lag(stop, lags))
+    start = time.perf_counter()
+    found, first = await crawl
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    max_lag = max(lags) if lags else elapsed
+    throttled = f" {throttle.rejected:>10}" if throttle is not None else ""
+    print(f"{name:<24} {found:>7} {elapsed:>9.2f}s {first or 0:>11.3f}s {max_lag * 1000:>12.1f}ms{throttled}")
+
+
+def throttled_crawls(endpoint_url: str, latency: float, args):
+    """Fixed versus adaptive concurrency limits against the rate-limited stand-in"""
+    print(f"Throttling: {args.throttle_rate:g} requests/s (burst {args.throttle_burst:g}), 503 SlowDown beyond")
+    print(f"{'Strategy':<24} {'Studies':>7} {'Total':>10} {'First study':>12} {'Max loop lag':>14} {'Throttled':>10}")
+    for concurrency in args.concurrency:
+        for adaptive in (False, True):
+            throttle = TokenBucket(args.throttle_rate, args.throttle_burst)
+            client = make_client(endpoint_url, latency, max_pool_connections=concurrency, throttle=throttle)
+            minimum = 1 if adaptive else concurrency
+            limiter = AIMDLimiter("s3_list", initial=concurrency, minimum=minimum, maximum=concurrency)
+            name = f"{'AIMD' if adaptive else 'fixed'} x{concurrency}"
+            asyncio.run(run(name, concurrent_crawl(client, concurrency, limiter), throttle))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--studies", type=int, default=2000, help="Synthetic study prefixes")
+    parser.add_argument("--files-per-study", type=int, default=3, help="Objects per study")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Added delay per S3 request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 32], help="Thread pool sizes to test")
+    parser.add_argument("--throttle-rate", type=float, default=0,
+                        help="Requests per second the stand-in accepts before answering 503 SlowDown (0: unlimited)")
+    parser.add_argument("--throttle-burst", type=float, default=10, help="Request burst the throttled stand-in accepts")
+    parser.add_argument("--endpoint-url", help="Existing S3-compatible endpoint (default: start a moto server)")
+    args = parser.parse_args()
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if endpoint_url is None:
+        server, endpoint_url = start_moto_server()
+
+    try:
+        print(f"Populating {args.studies} studies x {args.files_per_study} files at {endpoint_url}...")
+        populate(endpoint_url, args.studies, args.files_per_study)
+
+        latency = args.latency_ms / 1000
+        print(f"\nAdded latency: {args.latency_ms:g} ms per request")
+        if args.throttle_rate:
+            throttled_crawls(endpoint_url, latency, args)
+            return
+        print(f"{'Strategy':<24} {'Studies':>7} {'Total':>10} {'First study':>12} {'Max loop lag':>14}")
+        asyncio.run(run("sequential (previous)", sequential_crawl(make_client(endpoint_url, latency))))
+        for concurrency in args.concurrency:
+            client = make_client(endpoint_url, latency, max_pool_connections=concurrency)
+            asyncio.run(run(f"thread pool x{concurrency}", concurrent_crawl(client, concurrency)))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark response serialization for the publication list endpoints
+
+Compares the default path (FastAPI's jsonable_encoder + json.dumps, which is
+what returning a dict from an endpoint does) against assembling the response
+from publication fragments pre-encoded by EncodedPublications.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add the current directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from publication_encoder import EncodedPublications, json_object_with_list, ORJSON_AVAILABLE
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+
+def make_publications(count: int, files_per_study: int = 20):
+    """Create synthetic publications shaped like processed OSDR studies"""
+    publications = []
+    for i in range(1, count + 1):
+        study_id = f"OSD-{i}"
+        datafiles = [
+            {
+                'file_url': f"https://nasa-osdr.s3.amazonaws.com/{study_id}/GLDS-{i}_rna_seq_sample_{j}.csv",
+                'file_type': 'NASA Research Data',
+                'key': f"{study_id}/GLDS-{i}_rna_seq_sample_{j}.csv"
+            }
+            for j in range(files_per_study)
+        ]
+        study = {
+            'accession': study_id,
+            'title': f"NASA OSDR Study {study_id}",
+            'description': f"Real research from NASA OSDR: {study_id}",
+            'study_type': "Transcriptomics",
+            'submission_date': f"20{10 + i % 15}-0{1 + i % 9}-1{i % 9}T00:00:00",
+            'doi': f"10.26030/nasa-{study_id.lower()}",
+            'principal_investigator': ["NASA OSDR Team"],
+            'authors': ["NASA OSDR Team"],
+            'organism': [{"scientificName": "Mus musculus"}],
+            'datafiles': datafiles,
+            'keywords': ["space biology", "NASA", "OSDR", study_id.lower()],
+            'space_program': "NASA OSDR",
+            'repository_source': "s3://nasa-osdr"
+        }
+        publications.append({
+            'title': study['title'],
+            'authors': study['principal_investigator'],
+            'abstract': study['description'],
+            'publication_date': study['submission_date'],
+            'doi': study['doi'],
+            'osdr_id': study_id,
+            'keywords': [],
+            'research_area': "Transcriptomics",
+            'study_type': "Transcriptomics",
+            'organisms': ["Mus musculus"],
+            'file_urls': [f['file_url'] for f in datafiles],
+            'metadata': {**study, 'entities': {'persons': [], 'organizations': ["NASA"]}, 'ai_summary': ""}
+        })
+    return publications
+
+
+def default_encode(page, total, limit, offset) -> bytes:
+    """Serialize a page the way FastAPI does for a returned dict"""
+    content = {
+        "publications": page,
+        "total": total,
+        "pagination": {"limit": limit, "offset": offset, "has_more": total > offset + limit}
+    }
+    if jsonable_encoder is not None:
+        content = jsonable_encoder(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def preencoded(encoded, total, limit, offset) -> bytes:
+    """Serialize a page from pre-encoded fragments"""
+    return json_object_with_list("publications", encoded[offset:offset + limit], {
+        "total": total,
+        "pagination": {"limit": limit, "offset": offset, "has_more": total > offset + limit}
+    })
+
+
+def time_it(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark publication list serialization")
+    parser.add_argument("--publications", type=int, default=5000)
+    parser.add_argument("--files-per-study", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    publications = make_publications(args.publications, args.files_per_study)
+    total = len(publications)
+
+    start = time.perf_counter()
+    encoded = EncodedPublications(publications)
+    build_seconds = time.perf_counter() - start
+
+    print(f"Publications: {total}  (encoder: {'orjson' if ORJSON_AVAILABLE else 'json'}, "
+          f"jsonable_encoder: {'yes' if jsonable_encoder else 'not installed'})")
+    print(f"One-off pre-encoding cost: {build_seconds * 1000:.1f} ms")
+    print("=" * 60)
+    print(f"{'page size':>10} {'default (ms)':>14} {'pre-encoded (ms)':>18} {'speed-up':>10}")
+
+    for limit in (50, 200, 1000):
+        page = publications[:limit]
+        assert json.loads(default_encode(page, total, limit, 0)) == json.loads(preencoded(encoded, total, limit, 0))
+
+        baseline = time_it(lambda: default_encode(page, total, limit, 0), args.iterations)
+        fast = time_it(lambda: preencoded(encoded, total, limit, 0), args.iterations)
+        print(f"{limit:>10} {baseline * 1000:>14.3f} {fast * 1000:>18.3f} {baseline / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
-import json
+from publication_file import read_publications
 
 # Load the processed publications
-with open('data/processed_publications.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+data = read_publications('data/processed_publications.json')
 
 # Count research areas
 areas = {}
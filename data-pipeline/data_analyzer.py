@@ -19,6 +19,9 @@ from sklearn.decomposition import PCA
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.preprocessing import StandardScaler
+
+from publication_file import iter_publications_file
+
 try:
     from textblob import TextBlob
 except ImportError:
@@ -74,11 +77,8 @@ class NASADataAnalyzer:
     def load_data(self) -> pd.DataFrame:
         """Load processed NASA OSDR data into pandas DataFrame"""
         try:
-            with open(self.data_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Convert to DataFrame
-            self.df = pd.DataFrame(data)
+            # Stream records straight into the DataFrame instead of parsing the whole document first
+            self.df = pd.DataFrame(iter_publications_file(self.data_path))
             
             # Data preprocessing
             self.df['publication_date'] = pd.to_datetime(self.df['publication_date'])
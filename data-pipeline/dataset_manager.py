@@ -0,0 +1,211 @@
+import os
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Callable, Sequence
+
+from search_index import PublicationSearchIndex
+from statistics_aggregator import PublicationStatistics
+from file_catalog import FileCatalog
+from suggest_index import SuggestionIndex
+from publication_encoder import EncodedPublications
+from publication_file import read_publications, iter_publications_file
+from publication_store import DEFAULT_STORE_PATH, StoreFragments, StorePublications, load_or_build_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PUBLICATIONS_PATH = os.getenv('PUBLICATIONS_FILE', 'data/processed_publications.json')
+DEFAULT_POLL_INTERVAL = float(os.getenv('PUBLICATIONS_POLL_INTERVAL', '5'))
+
+# (mtime_ns, size) of a file, used to detect rewrites
+FileSignature = Tuple[int, int]
+
+
+def file_signature(path: str) -> Optional[FileSignature]:
+    """Return the (mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """
+    Immutable bundle of the publications and every index derived from them
+
+    Request handlers read one snapshot reference and use only its members,
+    so a reload can never hand them a search index from one dataset and
+    encoded records from another.
+    """
+    version: int = 0
+    publications: Sequence[Dict[str, Any]] = field(default_factory=list)
+    search_index: PublicationSearchIndex = field(default_factory=PublicationSearchIndex)
+    statistics: PublicationStatistics = field(default_factory=PublicationStatistics)
+    file_catalog: FileCatalog = field(default_factory=FileCatalog)
+    encoded: EncodedPublications = field(default_factory=EncodedPublications)
+    suggestions: SuggestionIndex = field(default_factory=SuggestionIndex)
+    source_signature: Optional[FileSignature] = None
+
+    @classmethod
+    def build(cls,
+              publications: Sequence[Dict[str, Any]],
+              version: int,
+              source_signature: Optional[FileSignature] = None,
+              encoded: Optional[EncodedPublications] = None,
+              records: Optional[List[Dict[str, Any]]] = None) -> 'DatasetSnapshot':
+        """
+        Build all derived indexes for a sequence of publications (CPU-bound)
+
+        Args:
+            publications: Records the snapshot serves
+            version: Dataset version number
+            source_signature: Signature of the file the records were read from
+            encoded: Pre-encoded records, if already available
+            records: The same records decoded into a list, used for building only;
+                lets a lazily decoding view be decoded once instead of once per index
+        """
+        if records is None:
+            records = publications
+        search_index = PublicationSearchIndex(records)
+        # Serve from the given sequence; a decoded build list is dropped with this frame
+        search_index.publications = publications
+        return cls(
+            version=version,
+            publications=publications,
+            search_index=search_index,
+            statistics=PublicationStatistics(records),
+            file_catalog=FileCatalog(records, version=version),
+            encoded=encoded if encoded is not None else EncodedPublications(records),
+            suggestions=SuggestionIndex(records, search_index),
+            source_signature=source_signature
+        )
+
+    def __len__(self) -> int:
+        return len(self.publications)
+
+
+class DatasetManager:
+    """
+    Owns the current DatasetSnapshot and reloads it when the publications file changes
+
+    Loading and index building run in a worker thread; the finished snapshot
+    is published with a single reference assignment on the event loop, so
+    in-flight requests keep the snapshot they started with. A polling
+    watcher compares the file's mtime and size and reloads once a new
+    signature has been stable for one poll interval, which skips files that
+    are still being written.
+
+    With a store_path, records are served from a memory-mapped publication
+    store shared by all worker processes (see publication_store); each
+    worker decodes the store once per reload to build its derived indexes,
+    keeps only those, and decodes records on access.
+    """
+
+    def __init__(self,
+                 path: str = DEFAULT_PUBLICATIONS_PATH,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 store_path: Optional[str] = DEFAULT_STORE_PATH):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.store_path = store_path or None
+        self.current = DatasetSnapshot()
+        self._listeners: List[Callable[[DatasetSnapshot], None]] = []
+        self._lock: Optional[asyncio.Lock] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._failed_signature: Optional[FileSignature] = None
+
+    def add_listener(self, listener: Callable[[DatasetSnapshot], None]):
+        """Call listener with every newly published snapshot"""
+        self._listeners.append(listener)
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _publish(self, snapshot: DatasetSnapshot):
+        self.current = snapshot
+        for listener in self._listeners:
+            listener(snapshot)
+        logger.info(f"Published dataset version {snapshot.version} ({len(snapshot)} publications)")
+
+    def _load_snapshot(self, signature: FileSignature, version: int) -> DatasetSnapshot:
+        """Parse the publications file (or map its store) and build a snapshot (runs in a thread)"""
+        if self.store_path is None:
+            return DatasetSnapshot.build(read_publications(self.path), version, signature)
+
+        store = load_or_build_store(self.store_path, signature, lambda: iter_publications_file(self.path))
+        publications = StorePublications(store)
+        return DatasetSnapshot.build(
+            publications,
+            version,
+            signature,
+            encoded=EncodedPublications.from_fragments(StoreFragments(store), store.fingerprint),
+            # Decode the store once for all index builds; only the mapped store is kept
+            records=list(publications)
+        )
+
+    async def reload(self, force: bool = False) -> bool:
+        """
+        Load the publications file if it changed since the current snapshot
+
+        Args:
+            force: Reload even if the file signature is unchanged
+
+        Returns:
+            True if a new snapshot was published
+        """
+        async with self._get_lock():
+            signature = file_signature(self.path)
+            if signature is None:
+                return False
+            if not force and signature in (self.current.source_signature, self._failed_signature):
+                return False
+
+            try:
+                snapshot = await asyncio.to_thread(self._load_snapshot, signature, self.current.version + 1)
+            except Exception as e:
+                # Keep serving the current snapshot; retry when the file changes again
+                logger.error(f"Error loading publications from {self.path}: {e}")
+                self._failed_signature = signature
+                return False
+
+            self._publish(snapshot)
+            return True
+
+    async def _watch(self):
+        pending: Optional[FileSignature] = None
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                signature = file_signature(self.path)
+                if signature is None or signature in (self.current.source_signature, self._failed_signature):
+                    pending = None
+                elif signature == pending:
+                    logger.info(f"Detected new publications file {self.path}, reloading")
+                    await self.reload()
+                    pending = None
+                else:
+                    # Wait one more interval for the writer to finish
+                    pending = signature
+            except Exception as e:
+                logger.error(f"Publications file watcher error: {e}")
+
+    def start_watching(self):
+        """Start the background file watcher on the running event loop"""
+        if self._watch_task is None and self.poll_interval > 0:
+            self._watch_task = asyncio.create_task(self._watch())
+            logger.info(f"Watching {self.path} for changes every {self.poll_interval:g}s")
+
+    async def stop_watching(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
@@ -9,6 +9,8 @@ import logging
 from bs4 import BeautifulSoup
 import re
 
+from http_cache import create_client_session
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,7 +22,7 @@ async def debug_osdr_fetch():
     logger.info(f"Fetching content from: {base_url}")
     
     try:
-        async with aiohttp.ClientSession() as session:
+        async with create_client_session() as session:
             async with session.get(base_url, timeout=aiohttp.ClientTimeout(total=30)) as response:
                 if response.status == 200:
                     html_content = await response.text()
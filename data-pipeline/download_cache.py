@@ -0,0 +1,304 @@
+import os
+import json
+import random
+import asyncio
+import hashlib
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+import aiohttp
+from multidict import CIMultiDict
+
+from metrics import S3_DOWNLOAD_BYTES, DOWNLOAD_CACHE_REQUESTS
+from adaptive_concurrency import AIMDLimiter, is_throttling_error
+from http_cache import HTTPCache, CacheEntry, CachingClientSession, get_http_cache, HTTP_CACHE_ENABLED
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DOWNLOAD_CACHE_DIR = os.getenv('DOWNLOAD_CACHE_DIR', 'data/downloads')
+DEFAULT_MAX_DOWNLOAD_BYTES = int(os.getenv('DOWNLOAD_MAX_MB', '100')) * 1024 * 1024
+DEFAULT_DOWNLOAD_RETRIES = int(os.getenv('DOWNLOAD_RETRIES', '3'))
+# Upper bound of the adaptive download concurrency limit
+MAX_CONCURRENT_DOWNLOADS = int(os.getenv('MAX_CONCURRENT_DOWNLOADS', '5'))
+
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# First delay before resuming an interrupted download; doubles per attempt
+RETRY_BASE_DELAY = 1.0
+
+
+class DownloadError(Exception):
+    """Raised when a file cannot be downloaded"""
+
+    def __init__(self, message: str, retryable: bool = False, status: Optional[int] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        # HTTP status of the failed response, if there was one
+        self.status = status
+
+
+class DownloadTooLargeError(DownloadError):
+    """Raised when a file exceeds the download byte limit"""
+
+
+@dataclass(frozen=True)
+class CachedFile:
+    """A downloaded file in the HTTP cache's blob store (or the download directory without it)"""
+    url: str
+    path: str
+    sha256: str
+    size: int
+    # True if no body was transferred (served from disk or revalidated with 304)
+    from_cache: bool
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _remove(*paths: str):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _hash_file(path: str) -> "hashlib._Hash":
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest
+
+
+class DownloadCache:
+    """
+    Downloads files in bounded chunks into the shared HTTP cache
+
+    Response bodies are streamed to a partial file while their SHA-256 is
+    computed, then moved into the HTTP cache's content-addressed blob store;
+    its index records the digest and the server's ETag / Last-Modified, so
+    the sessions and this cache see the same entries. Requesting a cached
+    URL again revalidates it with a conditional request, so unchanged files
+    are not transferred again. An interrupted download keeps its partial
+    file and resumes with an HTTP Range request (guarded by If-Range), both
+    within one fetch and on the next run. The byte limit is enforced on the
+    bytes actually received, whether or not Content-Length is sent.
+
+    At most MAX_CONCURRENT_DOWNLOADS requests run at once; the limit is
+    halved when the server answers 429/503 and grows back as downloads
+    succeed. Concurrent fetches of one URL are serialized within a process;
+    the directory should not be shared by hosts that download simultaneously.
+
+    With HTTP_CACHE_ENABLED off (and no http_cache passed), nothing is
+    cached: every fetch downloads the file again and keeps only the latest
+    copy per URL in the download directory.
+    """
+
+    # Per partial-file locks shared by every cache instance in the process
+    _locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def __init__(self,
+                 directory: str = DEFAULT_DOWNLOAD_CACHE_DIR,
+                 http_cache: Optional[HTTPCache] = None,
+                 retries: int = DEFAULT_DOWNLOAD_RETRIES,
+                 chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+                 limiter: Optional[AIMDLimiter] = None):
+        # Holds partial downloads; complete files live in the HTTP cache when it is enabled
+        self.directory = directory
+        if http_cache is None and HTTP_CACHE_ENABLED:
+            http_cache = get_http_cache()
+        self.http_cache = http_cache
+        self.retries = max(0, retries)
+        self.chunk_size = chunk_size
+        self.limiter = limiter if limiter is not None else AIMDLimiter(
+            "download", initial=MAX_CONCURRENT_DOWNLOADS, maximum=MAX_CONCURRENT_DOWNLOADS)
+        os.makedirs(os.path.join(directory, 'partial'), exist_ok=True)
+        if self.http_cache is None:
+            os.makedirs(os.path.join(directory, 'files'), exist_ok=True)
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _partial_path(self, key: str) -> str:
+        return os.path.join(self.directory, 'partial', f"{key}.part")
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.directory, 'files', key)
+
+    def _lookup_entry(self, url: str) -> Optional[CacheEntry]:
+        return self.http_cache.lookup(url) if self.http_cache is not None else None
+
+    def lookup(self, url: str) -> Optional[CachedFile]:
+        """The cached copy of a URL, without contacting the server"""
+        entry = self._lookup_entry(url)
+        if entry is None:
+            return None
+        return CachedFile(url, entry.path, entry.sha256, entry.size, True)
+
+    async def fetch(self,
+                    session: aiohttp.ClientSession,
+                    url: str,
+                    max_bytes: Optional[int] = DEFAULT_MAX_DOWNLOAD_BYTES,
+                    revalidate: bool = True) -> CachedFile:
+        """
+        Return a URL's content from the cache, downloading it if missing or changed
+
+        Args:
+            session: HTTP session to download with (plain or caching)
+            url: File URL
+            max_bytes: Hard limit on the file size (None: no limit)
+            revalidate: Check a cached copy with the server (False: trust it as is)
+
+        Returns:
+            The cached file
+
+        Raises:
+            DownloadTooLargeError: If the file exceeds max_bytes
+            DownloadError: If the server answers with an error status
+            aiohttp.ClientError, asyncio.TimeoutError: If the last retry fails
+        """
+        if isinstance(session, CachingClientSession):
+            # Stream the body here instead of letting the wrapper buffer it
+            session = session.session
+        key = self._key(url)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+
+        async with lock:
+            entry = await asyncio.to_thread(self._lookup_entry, url)
+            if entry is not None and not revalidate:
+                DOWNLOAD_CACHE_REQUESTS.inc(result="hit")
+                return CachedFile(url, entry.path, entry.sha256, entry.size, True)
+
+            for attempt in range(self.retries + 1):
+                try:
+                    async with self.limiter:
+                        cached = await self._download(session, url, key, entry, max_bytes)
+                    self.limiter.record_success()
+                    return cached
+                except (aiohttp.ClientError, asyncio.TimeoutError, DownloadError) as e:
+                    if is_throttling_error(e):
+                        self.limiter.record_throttle()
+                    if (isinstance(e, DownloadError) and not e.retryable) or attempt == self.retries:
+                        raise
+                    delay = RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.5)
+                    logger.warning(f"Download of {url} interrupted ({e!r}), resuming in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+    async def _download(self,
+                        session: aiohttp.ClientSession,
+                        url: str,
+                        key: str,
+                        entry: Optional[CacheEntry],
+                        max_bytes: Optional[int]) -> CachedFile:
+        partial_path = self._partial_path(key)
+        meta_path = f"{partial_path}.json"
+        # Byte offsets and Content-Length must refer to the stored representation
+        headers: Dict[str, str] = {'Accept-Encoding': 'identity'}
+
+        if entry is not None:
+            headers.update(entry.conditional_headers())
+
+        # Resume a partial download if the server can confirm it is the same version
+        offset = 0
+        meta = _read_json(meta_path)
+        if meta and meta.get('url') == url and os.path.exists(partial_path):
+            validator = meta.get('etag') or meta.get('last_modified')
+            offset = os.path.getsize(partial_path) if validator else 0
+            if offset:
+                headers['Range'] = f"bytes={offset}-"
+                headers['If-Range'] = validator
+
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and entry is not None:
+                _remove(partial_path, meta_path)
+                await asyncio.to_thread(self.http_cache.revalidated, entry, response.headers)
+                DOWNLOAD_CACHE_REQUESTS.inc(result="hit")
+                return CachedFile(url, entry.path, entry.sha256, entry.size, True)
+
+            if response.status == 206 and offset:
+                start = response.headers.get('Content-Range', '').replace('bytes ', '').split('-')[0]
+                if start != str(offset):
+                    _remove(partial_path, meta_path)
+                    raise DownloadError(f"Unexpected Content-Range for {url}", retryable=True)
+            elif response.status == 200:
+                offset = 0
+            elif response.status == 416:
+                # The partial file no longer matches the remote one
+                _remove(partial_path, meta_path)
+                raise DownloadError(f"Range not satisfiable for {url}", retryable=True)
+            else:
+                raise DownloadError(f"HTTP {response.status} for {url}",
+                                    retryable=response.status == 429 or response.status >= 500,
+                                    status=response.status)
+
+            content_length = response.headers.get('Content-Length')
+            if max_bytes is not None and content_length and offset + int(content_length) > max_bytes:
+                _remove(partial_path, meta_path)
+                raise DownloadTooLargeError(f"{url} is {offset + int(content_length)} bytes, limit is {max_bytes}")
+
+            response_headers = CIMultiDict(response.headers)
+            response_headers.popall('Content-Range', None)
+            if offset:
+                # A 206 need not repeat the validators the partial file was started with
+                for name, field in (('ETag', 'etag'), ('Last-Modified', 'last_modified')):
+                    if name not in response_headers and meta.get(field):
+                        response_headers[name] = meta[field]
+                digest = await asyncio.to_thread(_hash_file, partial_path)
+                DOWNLOAD_CACHE_REQUESTS.inc(result="resumed")
+                logger.info(f"Resuming {url} at byte {offset}")
+            else:
+                digest = hashlib.sha256()
+                _write_json(meta_path, {'url': url,
+                                        'etag': response.headers.get('ETag'),
+                                        'last_modified': response.headers.get('Last-Modified')})
+                DOWNLOAD_CACHE_REQUESTS.inc(result="miss")
+
+            size = offset
+            with open(partial_path, 'ab' if offset else 'wb') as f:
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        f.close()
+                        _remove(partial_path, meta_path)
+                        raise DownloadTooLargeError(f"{url} exceeds the {max_bytes} byte limit")
+                    digest.update(chunk)
+                    f.write(chunk)
+                    S3_DOWNLOAD_BYTES.inc(len(chunk))
+
+            if content_length and size != offset + int(content_length):
+                raise aiohttp.ClientPayloadError(f"{url} ended after {size - offset} of {content_length} bytes")
+
+        sha256 = digest.hexdigest()
+        if self.http_cache is None:
+            path = self._file_path(key)
+            os.replace(partial_path, path)
+        else:
+            stored = await asyncio.to_thread(self.http_cache.store_file, url, 200, response_headers,
+                                             partial_path, sha256, size)
+            path = stored.path
+        _remove(meta_path)
+        return CachedFile(url, path, sha256, size, False)
@@ -0,0 +1,364 @@
+import logging
+from array import array
+from urllib.parse import urlparse
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Row kinds
+FILE_URL = 0
+DATAFILE = 1
+
+# Marks a size or description the source record did not have (an explicit null is kept as None)
+ABSENT = object()
+
+
+def classify_file_type(file_url, file_name=""):
+    """Classify file type based on extension and content"""
+    file_type = "Unknown"
+    experiment_type = "Unknown"
+
+    if not file_url and not file_name:
+        return file_type, experiment_type
+
+    # Use file name if available, otherwise extract from URL
+    name_to_check = file_name if file_name else file_url.lower()
+
+    # Determine file type from extension
+    if any(ext in name_to_check for ext in ['.csv', '.tsv', '.txt']):
+        file_type = "Tabular"
+        experiment_type = "Data Table"
+    elif any(ext in name_to_check for ext in ['.json', '.xml']):
+        file_type = "Metadata"
+        experiment_type = "Study Metadata"
+    elif any(ext in name_to_check for ext in ['.pdf']):
+        file_type = "Document"
+        experiment_type = "Research Paper"
+    elif any(ext in name_to_check for ext in ['.fastq', '.fq', '.bam', '.sam']):
+        file_type = "Omics"
+        experiment_type = "Sequencing Data"
+    elif any(ext in name_to_check for ext in ['.h5', '.hdf5']):
+        file_type = "Omics"
+        experiment_type = "Expression Data"
+    elif any(ext in name_to_check for ext in ['.fasta', '.fa', '.fna']):
+        file_type = "Omics"
+        experiment_type = "Sequence Data"
+    elif any(ext in name_to_check for ext in ['.tif', '.tiff', '.png', '.jpg', '.jpeg']):
+        file_type = "Image"
+        experiment_type = "Microscopy Image"
+    elif any(ext in name_to_check for ext in ['.zip', '.tar', '.tar.gz', '.tgz']):
+        file_type = "Archive"
+        experiment_type = "Compressed Data"
+
+    return file_type, experiment_type
+
+def extract_species_from_metadata(metadata):
+    """Extract species information from metadata"""
+    species = "Unknown"
+
+    # Look for organism information in various metadata fields
+    organism_fields = ['organism', 'organisms', 'species', 'scientificName']
+
+    for field in organism_fields:
+        if field in metadata:
+            organism_data = metadata[field]
+            if isinstance(organism_data, list) and organism_data:
+                species = organism_data[0].get('scientificName', 'Unknown') if isinstance(organism_data[0], dict) else str(organism_data[0])
+                break
+            elif isinstance(organism_data, str):
+                species = organism_data
+                break
+
+    # If still unknown, return as is without hardcoded patterns
+    # Removed hardcoded species detection to prevent hardcoding
+
+    return species
+
+def extract_mission_info(metadata):
+    """Extract mission information from metadata"""
+    mission = "Unknown"
+
+    # Look for mission-related information
+    mission_fields = ['space_program', 'mission', 'platform', 'study_type']
+
+    for field in mission_fields:
+        if field in metadata:
+            mission_data = metadata[field]
+            if isinstance(mission_data, str):
+                mission = mission_data
+                break
+
+    # If still unknown, return as is without hardcoded patterns
+    # Removed hardcoded mission detection to prevent hardcoding
+
+    return mission
+
+def file_name_from_url(file_url: str, default: str) -> str:
+    """Return the last path segment of a URL, or default if there is none"""
+    path_parts = urlparse(file_url).path.split('/')
+    if path_parts and path_parts[-1]:
+        return path_parts[-1]
+    return default
+
+
+class _Codebook:
+    """Interns repeated strings as small integer codes"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class FileCatalog:
+    """
+    Flattened, columnar catalog of every OSDR file referenced by the publications cache
+
+    Built once per dataset version. Each file is one row; per-row values are
+    kept in parallel arrays with repeated strings (type, species, mission...)
+    dictionary-encoded. Rows are grouped by study, so a study maps to a
+    contiguous row range, and every file type, species and mission value has
+    a sorted posting list of rows. Paging only materializes the rows on the
+    requested page.
+    """
+
+    def __init__(self, publications: Optional[List[Dict[str, Any]]] = None, version: int = 0):
+        self.version = version
+
+        # Categorical dictionaries
+        self.file_types = _Codebook()
+        self.experiment_types = _Codebook()
+        self.species = _Codebook()
+        self.missions = _Codebook()
+
+        # Per-study columns
+        self.study_ids: List[str] = []
+        self.study_dates: List[str] = []
+        self.study_species = array('I')
+        self.study_missions = array('I')
+        self.study_ranges: Dict[str, Tuple[int, int]] = {}
+
+        # Per-file columns
+        self.row_study = array('I')
+        self.row_kind = array('B')
+        self.row_ordinal = array('I')
+        self.row_type = array('I')
+        self.row_experiment_type = array('I')
+        self.row_name: List[str] = []
+        self.row_url: List[str] = []
+        # ABSENT where the datafile had no such key
+        self.row_size: List[Any] = []
+        self.row_description: List[Any] = []
+
+        # Posting lists: code -> sorted row numbers
+        self.type_postings: Dict[int, array] = {}
+        self.species_postings: Dict[int, array] = {}
+        self.mission_postings: Dict[int, array] = {}
+
+        if publications:
+            self.build(publications)
+
+    def __len__(self) -> int:
+        return len(self.row_url)
+
+    def _add_row(self, study: int, kind: int, ordinal: int, name: str, url: str,
+                 file_type: str, experiment_type: str, size: Any, description: Any):
+        row = len(self.row_url)
+        type_code = self.file_types.encode(file_type)
+        self.row_study.append(study)
+        self.row_kind.append(kind)
+        self.row_ordinal.append(ordinal)
+        self.row_type.append(type_code)
+        self.row_experiment_type.append(self.experiment_types.encode(experiment_type))
+        self.row_name.append(name)
+        self.row_url.append(url)
+        self.row_size.append(size)
+        self.row_description.append(description)
+
+        self.type_postings.setdefault(type_code, array('I')).append(row)
+        self.species_postings.setdefault(self.study_species[study], array('I')).append(row)
+        self.mission_postings.setdefault(self.study_missions[study], array('I')).append(row)
+
+    def build(self, publications: List[Dict[str, Any]]):
+        """
+        Flatten and classify every file URL and metadata datafile once
+
+        Args:
+            publications: Publication dictionaries from the cache
+        """
+        seen_ids = set()
+
+        for pub in publications:
+            osdr_id = pub.get('osdr_id', '')
+            if not osdr_id:
+                continue
+
+            metadata = pub.get('metadata', {}) or {}
+            study = len(self.study_ids)
+            self.study_ids.append(osdr_id)
+            self.study_dates.append(pub.get('publication_date', ''))
+            self.study_species.append(self.species.encode(extract_species_from_metadata(metadata)))
+            self.study_missions.append(self.missions.encode(extract_mission_info(metadata)))
+            start = len(self.row_url)
+
+            for i, file_url in enumerate(pub.get('file_urls', []) or []):
+                # Skip empty URLs and duplicate file IDs
+                file_id = (osdr_id, FILE_URL, i + 1)
+                if not file_url or file_id in seen_ids:
+                    continue
+                seen_ids.add(file_id)
+
+                file_name = file_name_from_url(file_url, f"File {i+1}")
+                file_type, experiment_type = classify_file_type(file_url, file_name)
+                self._add_row(study, FILE_URL, i + 1, file_name, file_url,
+                              file_type, experiment_type, ABSENT, ABSENT)
+
+            for i, datafile in enumerate(metadata.get('datafiles', []) or []):
+                file_url = datafile.get('file_url', '')
+                file_id = (osdr_id, DATAFILE, i + 1)
+                if not file_url or file_id in seen_ids:
+                    continue
+                seen_ids.add(file_id)
+
+                file_name = file_name_from_url(file_url, f"Data File {i+1}")
+
+                # Get file type from datafile metadata or classify
+                file_type = datafile.get('file_type', 'Unknown')
+                experiment_type = "Unknown"
+                if file_type == "Unknown":
+                    file_type, experiment_type = classify_file_type(file_url, file_name)
+                elif file_type == "NASA Research Data":
+                    experiment_type = "Space Biology Experiment"
+
+                self._add_row(study, DATAFILE, i + 1, file_name, file_url,
+                              file_type, experiment_type,
+                              datafile.get('file_size', ABSENT), datafile.get('description', ABSENT))
+
+            # First publication wins for duplicate study IDs
+            self.study_ranges.setdefault(osdr_id, (start, len(self.row_url)))
+
+        logger.info(f"Built file catalog v{self.version}: {len(self)} files across {len(self.study_ids)} studies")
+
+    def row(self, row: int) -> Dict[str, Any]:
+        """Materialize a single catalog row as an API file record"""
+        study = self.row_study[row]
+        study_id = self.study_ids[study]
+        kind = self.row_kind[row]
+        ordinal = self.row_ordinal[row]
+
+        if kind == FILE_URL:
+            file_id = f"{study_id}_file_{ordinal}"
+            default_description = f"File associated with {study_id} study"
+        else:
+            file_id = f"{study_id}_datafile_{ordinal}"
+            default_description = f"Data file associated with {study_id} study"
+
+        size = self.row_size[row]
+        description = self.row_description[row]
+        return {
+            "id": file_id,
+            "name": self.row_name[row],
+            "type": self.file_types.values[self.row_type[row]],
+            "experiment_type": self.experiment_types.values[self.row_experiment_type[row]],
+            "size": size if size is not ABSENT else "Unknown",
+            "date": self.study_dates[study],
+            "description": description if description is not ABSENT else default_description,
+            "url": self.row_url[row],
+            "study_id": study_id,
+            "species": self.species.values[self.study_species[study]],
+            "mission": self.missions.values[self.study_missions[study]]
+        }
+
+    def _matching_rows(self,
+                       file_type: Optional[str] = None,
+                       species: Optional[str] = None,
+                       mission: Optional[str] = None):
+        """
+        Return the rows matching all given filters as a sequence
+
+        The smallest posting list drives the scan; the remaining filters are
+        checked against the code columns, so cost is bounded by the most
+        selective filter.
+        """
+        filters = []
+        for value, codebook, postings, column in (
+            (file_type, self.file_types, self.type_postings, None),
+            (species, self.species, self.species_postings, self.study_species),
+            (mission, self.missions, self.mission_postings, self.study_missions),
+        ):
+            if value is None:
+                continue
+            code = codebook.codes.get(value)
+            if code is None:
+                return array('I')
+            filters.append((postings.get(code, array('I')), code, column))
+
+        if not filters:
+            return range(len(self))
+
+        filters.sort(key=lambda f: len(f[0]))
+        driver, rest = filters[0][0], filters[1:]
+        if not rest:
+            return driver
+
+        def matches(row: int) -> bool:
+            for _, code, column in rest:
+                if column is None:
+                    if self.row_type[row] != code:
+                        return False
+                elif column[self.row_study[row]] != code:
+                    return False
+            return True
+
+        return array('I', (row for row in driver if matches(row)))
+
+    def page(self,
+             limit: int,
+             offset: int = 0,
+             file_type: Optional[str] = None,
+             species: Optional[str] = None,
+             mission: Optional[str] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Return one page of file records with optional filters
+
+        Returns:
+            Tuple of (total matching files, records on the requested page)
+        """
+        rows = self._matching_rows(file_type, species, mission)
+        return len(rows), [self.row(row) for row in rows[offset:offset + limit]]
+
+    def count(self,
+              file_type: Optional[str] = None,
+              species: Optional[str] = None,
+              mission: Optional[str] = None) -> int:
+        """Number of files matching the given filters"""
+        return len(self._matching_rows(file_type, species, mission))
+
+    def iter_rows(self,
+                  offset: int = 0,
+                  limit: Optional[int] = None,
+                  file_type: Optional[str] = None,
+                  species: Optional[str] = None,
+                  mission: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield file records, materializing one row at a time"""
+        rows = self._matching_rows(file_type, species, mission)
+        end = len(rows) if limit is None else offset + limit
+        for row in rows[offset:end]:
+            yield self.row(row)
+
+    def study_files(self, study_id: str) -> List[Dict[str, Any]]:
+        """Return every file record for a study, or an empty list if unknown"""
+        start, end = self.study_ranges.get(study_id, (0, 0))
+        return [self.row(row) for row in range(start, end)]
+
+    def has_study(self, study_id: str) -> bool:
+        return study_id in self.study_ranges
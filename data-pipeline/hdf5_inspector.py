@@ -0,0 +1,223 @@
+import io
+import os
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Union, BinaryIO
+
+import requests
+
+# Try to import h5py for HDF5 support
+try:
+    import h5py  # type: ignore[reportMissingImports]
+    H5PY_AVAILABLE = True
+except ImportError:
+    h5py = None
+    H5PY_AVAILABLE = False
+    logging.warning("h5py not available for HDF5 processing. Install with: pip install h5py")
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Remote files are read in blocks of this size; HDF5 metadata is small and clustered
+RANGE_BLOCK_SIZE = int(os.getenv('HDF5_RANGE_BLOCK_KB', '64')) * 1024
+RANGE_CACHE_BLOCKS = 256
+
+# An HDF5 file given as raw bytes, a local path, or a seekable binary file
+HDF5Source = Union[bytes, bytearray, memoryview, str, os.PathLike, BinaryIO]
+
+
+class HTTPRangeFile(io.RawIOBase):
+    """
+    Read-only, seekable file object over a remote file, fetched with HTTP range requests
+
+    Reads are served from fixed-size blocks kept in a small LRU cache, so
+    h5py's many small metadata reads cost one request per block touched.
+    An empty remote file (416 on the first range, confirmed by HEAD) reads
+    as zero bytes, so h5py rejects it like any other non-HDF5 file.
+    The remote file's ETag is sent as If-Range, so a file replaced while it
+    is being read fails instead of mixing two versions.
+    """
+
+    def __init__(self,
+                 url: str,
+                 session: Optional[requests.Session] = None,
+                 block_size: int = RANGE_BLOCK_SIZE,
+                 cache_blocks: int = RANGE_CACHE_BLOCKS,
+                 timeout: float = 30):
+        super().__init__()
+        self.url = url
+        self.session = session if session is not None else requests.Session()
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+        self.timeout = timeout
+        self.requests_made = 0
+        self.bytes_fetched = 0
+        self._blocks: "OrderedDict[int, bytes]" = OrderedDict()
+        self._position = 0
+        self._etag: Optional[str] = None
+        # The first block also tells us the file size
+        self.size = -1
+        self._block(0)
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        headers = {'Range': f"bytes={start}-{end}", 'Accept-Encoding': 'identity'}
+        if self._etag:
+            headers['If-Range'] = self._etag
+        response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+        self.requests_made += 1
+        if response.status_code == 416 and self.size < 0:
+            # No byte range exists in an empty file
+            response.close()
+            return self._fetch_empty()
+        if response.status_code != 206:
+            response.close()
+            if response.status_code == 200:
+                raise OSError(f"{self.url} changed while reading, or the server ignores range requests")
+            raise OSError(f"HTTP {response.status_code} for range {start}-{end} of {self.url}")
+
+        content_range = response.headers.get('Content-Range', '')
+        total = content_range.rpartition('/')[2]
+        if self.size < 0:
+            if not total.isdigit():
+                raise OSError(f"{self.url} did not report its size in Content-Range")
+            self.size = int(total)
+            self._etag = response.headers.get('ETag')
+        data = response.content
+        self.bytes_fetched += len(data)
+        return data
+
+    def _fetch_empty(self) -> bytes:
+        """Confirm with a HEAD request that the remote file is empty"""
+        response = self.session.head(self.url, headers={'Accept-Encoding': 'identity'},
+                                     timeout=self.timeout, allow_redirects=True)
+        self.requests_made += 1
+        response.close()
+        if response.status_code != 200 or response.headers.get('Content-Length') != '0':
+            raise OSError(f"HTTP 416 for the first range of {self.url}")
+        self.size = 0
+        self._etag = response.headers.get('ETag')
+        return b''
+
+    def _block(self, index: int) -> bytes:
+        block = self._blocks.get(index)
+        if block is not None:
+            self._blocks.move_to_end(index)
+            return block
+        start = index * self.block_size
+        end = start + self.block_size - 1
+        if self.size >= 0:
+            end = min(end, self.size - 1)
+        block = self._fetch(start, end)
+        self._blocks[index] = block
+        while len(self._blocks) > self.cache_blocks:
+            self._blocks.popitem(last=False)
+        return block
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast('B')
+        end = min(self._position + len(view), self.size)
+        written = 0
+        while self._position < end:
+            index, offset = divmod(self._position, self.block_size)
+            block = self._block(index)
+            chunk = block[offset:offset + end - self._position]
+            if not chunk:
+                break
+            view[written:written + len(chunk)] = chunk
+            written += len(chunk)
+            self._position += len(chunk)
+        return written
+
+
+def describe_hdf5(h5_file) -> Dict[str, Any]:
+    """Shapes, dtypes and attributes of every dataset and group in an open HDF5 file"""
+    hdf5_info: Dict[str, Any] = {}
+
+    def extract_info(name, obj):
+        if isinstance(obj, h5py.Dataset):
+            hdf5_info[name] = {
+                'shape': obj.shape,
+                'dtype': str(obj.dtype),
+                'size': obj.size,
+                'attrs': dict(obj.attrs)
+            }
+        elif isinstance(obj, h5py.Group):
+            hdf5_info[name] = {
+                'type': 'group',
+                'attrs': dict(obj.attrs)
+            }
+
+    h5_file.visititems(extract_info)
+    return hdf5_info
+
+
+def inspect_hdf5(source: HDF5Source) -> Dict[str, Any]:
+    """
+    Describe the structure of an HDF5 file without writing it anywhere
+
+    bytes are wrapped in a BytesIO, which shares the buffer instead of
+    copying it (a bytearray or memoryview is copied once, as BytesIO only
+    shares immutable bytes); paths (such as download cache entries) are
+    opened in place;
+    file objects go through h5py's file-object driver. Only metadata is
+    read, never dataset contents.
+
+    Raises:
+        RuntimeError: If h5py is not installed
+        OSError: If the source is not a readable HDF5 file
+    """
+    if not H5PY_AVAILABLE:
+        raise RuntimeError("HDF5 inspection not available. h5py is required.")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    with h5py.File(source, 'r') as h5_file:
+        return describe_hdf5(h5_file)
+
+
+def inspect_remote_hdf5(url: str,
+                        session: Optional[requests.Session] = None,
+                        block_size: int = RANGE_BLOCK_SIZE) -> Dict[str, Any]:
+    """
+    Describe a remote HDF5 file by reading only its superblock and object headers (blocking)
+
+    Args:
+        url: File URL; the server must support range requests
+        session: requests session to use
+        block_size: Bytes fetched per range request
+
+    Raises:
+        RuntimeError: If h5py is not installed
+        OSError: If the file cannot be read with range requests
+    """
+    if not H5PY_AVAILABLE:
+        raise RuntimeError("HDF5 inspection not available. h5py is required.")
+    remote = HTTPRangeFile(url, session=session, block_size=block_size)
+    with remote:
+        info = inspect_hdf5(remote)
+    logger.info(f"Inspected {url} with {remote.requests_made} range requests "
+                f"({remote.bytes_fetched} of {remote.size} bytes)")
+    return info
@@ -0,0 +1,633 @@
+import os
+import json
+import asyncio
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Mapping, Callable, Awaitable, AsyncIterator, BinaryIO
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from metrics import HTTP_CACHE_REQUESTS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', 'data/http_cache')
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Responses buffered by the session wrappers are only stored up to this size
+HTTP_CACHE_MAX_ENTRY_BYTES = int(os.getenv('HTTP_CACHE_MAX_ENTRY_MB', '32')) * 1024 * 1024
+# Total size of stored bodies; least recently validated entries are evicted beyond it
+HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_MB', '4096')) * 1024 * 1024
+# Chunk size of streams over cached bodies
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Request headers that mean the caller is doing its own conditional or partial request
+_PASSTHROUGH_HEADERS = ('range', 'if-none-match', 'if-modified-since', 'if-range', 'if-match')
+# Hop-by-hop and transfer headers that do not describe the stored body
+_UNSTORED_HEADERS = ('connection', 'keep-alive', 'transfer-encoding', 'content-encoding', 'content-length')
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A stored response: its status, headers, validators and body blob"""
+    url: str
+    status: int
+    headers: List[Tuple[str, str]]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    sha256: str
+    size: int
+    path: str
+
+    def read_body(self) -> bytes:
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that ask the server whether this entry is still current"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def is_cacheable(status: int, headers: Mapping[str, str]) -> bool:
+    """Whether a GET response can be stored and revalidated later"""
+    if status != 200:
+        return False
+    if 'no-store' in headers.get('Cache-Control', '').lower():
+        return False
+    return bool(headers.get('ETag') or headers.get('Last-Modified'))
+
+
+def _stored_headers(headers: Mapping[str, str]) -> List[Tuple[str, str]]:
+    return [(name, value) for name, value in headers.items() if name.lower() not in _UNSTORED_HEADERS]
+
+
+def _passthrough(headers: Optional[Mapping[str, str]]) -> bool:
+    return bool(headers) and any(name.lower() in _PASSTHROUGH_HEADERS for name in headers)
+
+
+class HTTPCache:
+    """
+    Persistent cache of HTTP GET responses shared by every session in the pipeline
+
+    An SQLite index maps each URL to the response status, headers and
+    validators (ETag / Last-Modified); bodies are blob files named by their
+    SHA-256, so identical content is stored once and large downloads can be
+    moved in without re-reading them. Entries are never served without
+    revalidation: callers send the entry's conditional headers and replay
+    the stored body when the server answers 304 Not Modified.
+
+    A blob is deleted once no entry references it, and the total size of
+    the blobs is kept within max_bytes by evicting the entries that were
+    least recently stored or revalidated. All methods block on SQLite and
+    file I/O; call them from a thread in async code.
+    """
+
+    def __init__(self, directory: str = DEFAULT_HTTP_CACHE_DIR, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.blob_dir = os.path.join(directory, 'blobs')
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, 'index.sqlite'), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                validated_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_sha256 ON responses (sha256)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_validated_at ON responses (validated_at)")
+        self._conn.commit()
+        # Bytes of distinct blobs referenced by the index
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM responses GROUP BY sha256)"
+        ).fetchone()[0]
+
+    def blob_path(self, sha256: str) -> str:
+        """Where the body with a given digest is stored"""
+        return os.path.join(self.blob_dir, sha256[:2], sha256)
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """The stored response for a URL, if its body is still on disk"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM responses WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        path = self.blob_path(row['sha256'])
+        try:
+            if os.path.getsize(path) != row['size']:
+                return None
+        except OSError:
+            return None
+        return CacheEntry(url, row['status'], [tuple(pair) for pair in json.loads(row['headers'])],
+                          row['etag'], row['last_modified'], row['sha256'], row['size'], path)
+
+    @property
+    def total_bytes(self) -> int:
+        """Size of the blobs referenced by the index"""
+        return self._total_bytes
+
+    def _referenced(self, sha256: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM responses WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone() is not None
+
+    def _release_blob(self, sha256: str, size: int):
+        """Delete a blob no entry references any more (call with the lock held)"""
+        if self._referenced(sha256):
+            return
+        self._total_bytes -= size
+        try:
+            os.remove(self.blob_path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep_url: str):
+        """Drop least recently validated entries until the blobs fit in max_bytes (call with the lock held)"""
+        evicted = 0
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT url, sha256, size FROM responses WHERE url != ? ORDER BY validated_at LIMIT 64",
+                (keep_url,)
+            ).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                self._conn.execute("DELETE FROM responses WHERE url = ?", (row['url'],))
+                self._release_blob(row['sha256'], row['size'])
+                evicted += 1
+                if self._total_bytes <= self.max_bytes:
+                    break
+        if evicted:
+            logger.info(f"Evicted {evicted} HTTP cache entries to stay within {self.max_bytes} bytes")
+
+    def _put(self, url: str, status: int, headers: Mapping[str, str],
+             body_path: str, sha256: str, size: int) -> CacheEntry:
+        """Index a response whose body was written to body_path (moved into the blob store)"""
+        path = self.blob_path(sha256)
+        now = time.time()
+        stored = _stored_headers(headers)
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        with self._lock:
+            # Placed under the lock so a concurrent release cannot delete the blob before it is indexed
+            if os.path.exists(path):
+                os.remove(body_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(body_path, path)
+            previous = self._conn.execute("SELECT sha256, size FROM responses WHERE url = ?", (url,)).fetchone()
+            if not self._referenced(sha256):
+                self._total_bytes += size
+            self._conn.execute('''
+                INSERT OR REPLACE INTO responses (
+                    url, status, headers, etag, last_modified, sha256, size, stored_at, validated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (url, status, json.dumps(stored), etag, last_modified, sha256, size, now, now))
+            # The replaced body may now be unreferenced
+            if previous is not None and previous['sha256'] != sha256:
+                self._release_blob(previous['sha256'], previous['size'])
+            self._evict(url)
+            self._conn.commit()
+        return CacheEntry(url, status, stored, etag, last_modified, sha256, size, path)
+
+    def store(self, url: str, status: int, headers: Mapping[str, str], body: bytes) -> CacheEntry:
+        """Store a complete response body"""
+        sha256 = hashlib.sha256(body).hexdigest()
+        tmp_path = os.path.join(self.blob_dir, f"{sha256}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        return self._put(url, status, headers, tmp_path, sha256, len(body))
+
+    def store_file(self, url: str, status: int, headers: Mapping[str, str],
+                   file_path: str, sha256: str, size: int) -> CacheEntry:
+        """Store a body already written to disk (moved into the blob store)"""
+        return self._put(url, status, headers, file_path, sha256, size)
+
+    def revalidated(self, entry: CacheEntry, headers: Mapping[str, str]) -> CacheEntry:
+        """Record a 304 for an entry, adopting any validators the server sent with it"""
+        etag = headers.get('ETag') or entry.etag
+        last_modified = headers.get('Last-Modified') or entry.last_modified
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET etag = ?, last_modified = ?, validated_at = ? WHERE url = ?",
+                (etag, last_modified, time.time(), entry.url)
+            )
+            self._conn.commit()
+        return CacheEntry(entry.url, entry.status, entry.headers, etag, last_modified,
+                          entry.sha256, entry.size, entry.path)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared_caches: Dict[str, HTTPCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_http_cache(directory: str = DEFAULT_HTTP_CACHE_DIR) -> HTTPCache:
+    """The process-wide cache for a directory"""
+    with _shared_lock:
+        cache = _shared_caches.get(directory)
+        if cache is None:
+            cache = HTTPCache(directory)
+            _shared_caches[directory] = cache
+        return cache
+
+
+class _ResponseBody:
+    """text(), json(), get_encoding() and raise_for_status() over an async read()"""
+
+    status: int
+    reason: str
+    headers: CIMultiDictProxy
+
+    async def read(self) -> bytes:
+        raise NotImplementedError
+
+    def get_encoding(self) -> str:
+        content_type = self.headers.get('Content-Type', '')
+        for parameter in content_type.split(';')[1:]:
+            name, _, value = parameter.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                return value.strip('"')
+        return 'utf-8'
+
+    async def text(self, encoding: Optional[str] = None, errors: str = 'strict') -> str:
+        return (await self.read()).decode(encoding or self.get_encoding(), errors)
+
+    async def json(self, *, loads=json.loads, **kwargs) -> Any:
+        return loads(await self.text())
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status, message=self.reason,
+                                              headers=self.headers)
+
+
+class _BodyStream:
+    """The subset of aiohttp.StreamReader used for response bodies, over an async read(n)"""
+
+    async def read(self, n: int = -1) -> bytes:
+        raise NotImplementedError
+
+    async def readany(self) -> bytes:
+        return await self.read(STREAM_CHUNK_SIZE)
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self.read(n)
+            if not chunk:
+                return
+            yield chunk
+
+    async def iter_any(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self.readany()
+            if not chunk:
+                return
+            yield chunk
+
+
+class _FileStream(_BodyStream):
+    """Body stream over an open cache blob, read in a worker thread"""
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self._eof = False
+
+    async def read(self, n: int = -1) -> bytes:
+        if self._eof:
+            return b''
+        data = await asyncio.to_thread(self._file.read, n)
+        if not data or n < 0:
+            self.close()
+        return data
+
+    def at_eof(self) -> bool:
+        return self._eof
+
+    def close(self):
+        self._eof = True
+        self._file.close()
+
+
+class _CachingStream(_BodyStream):
+    """
+    Body stream of a live response that keeps what passes through it for the cache
+
+    Chunks are kept only while the body is within the entry size limit;
+    the complete body is stored once the stream reaches its end. A body
+    that is not read to the end is not stored.
+    """
+
+    def __init__(self, content: aiohttp.StreamReader, limit: int, store: Callable[[bytes], Awaitable[None]]):
+        self._content = content
+        self._limit = limit
+        self._store = store
+        self._chunks: Optional[List[bytes]] = []
+        self._size = 0
+        self._finished = False
+
+    async def _feed(self, data: bytes) -> bytes:
+        if self._chunks is not None and data:
+            self._size += len(data)
+            if self._size > self._limit:
+                self._chunks = None
+                HTTP_CACHE_REQUESTS.inc(result="uncacheable")
+            else:
+                self._chunks.append(data)
+        if not self._finished and self._content.at_eof():
+            self._finished = True
+            if self._chunks is not None:
+                chunks, self._chunks = self._chunks, None
+                await self._store(b''.join(chunks))
+        return data
+
+    async def read(self, n: int = -1) -> bytes:
+        return await self._feed(await self._content.read(n))
+
+    async def readany(self) -> bytes:
+        return await self._feed(await self._content.readany())
+
+    def at_eof(self) -> bool:
+        return self._content.at_eof()
+
+
+class CachedClientResponse(_ResponseBody):
+    """
+    A response replayed from the cache after the server answered 304
+
+    Supports the subset of aiohttp.ClientResponse used in the pipeline:
+    status, headers, url, content (a stream over the stored body), read(),
+    text(), json(), release() and raise_for_status().
+    """
+
+    from_cache = True
+
+    def __init__(self, url: str, entry: CacheEntry, body: BinaryIO):
+        self.url = URL(url)
+        self.status = entry.status
+        self.reason = "OK"
+        self.headers = CIMultiDictProxy(CIMultiDict(entry.headers))
+        self.content = _FileStream(body)
+
+    async def __aenter__(self) -> 'CachedClientResponse':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def release(self):
+        self.content.close()
+
+    close = release
+
+    async def read(self) -> bytes:
+        return await self.content.read()
+
+
+class StreamingClientResponse(_ResponseBody):
+    """
+    A live aiohttp response whose body is stored in the cache as it is read
+
+    content is a stream over the body; read() reads it whole. Other
+    attributes are those of the wrapped aiohttp.ClientResponse.
+    """
+
+    from_cache = False
+
+    def __init__(self, response: aiohttp.ClientResponse, content: Any):
+        self._response = response
+        self.content = content
+        self._body: Optional[bytes] = None
+
+    def __getattr__(self, name: str):
+        return getattr(self._response, name)
+
+    async def __aenter__(self) -> 'StreamingClientResponse':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    async def read(self) -> bytes:
+        if self._body is None:
+            self._body = b''.join([chunk async for chunk in self.content.iter_any()])
+        return self._body
+
+
+class _CachedRequest:
+    """Awaitable / async context manager returned by CachingClientSession.get"""
+
+    def __init__(self, coroutine):
+        self._coroutine = coroutine
+        self._response = None
+
+    def __await__(self):
+        return self._coroutine.__await__()
+
+    async def __aenter__(self):
+        self._response = await self._coroutine
+        return self._response
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._response.release()
+
+
+class CachingClientSession:
+    """
+    aiohttp.ClientSession wrapper that revalidates GETs against the shared HTTP cache
+
+    get() sends the stored validators and, on 304, streams the stored body
+    from disk. Other responses are returned live: their body streams from
+    the network, and cacheable ones are stored once read to the end, unless
+    they exceed HTTP_CACHE_MAX_ENTRY_MB. As with aiohttp, release the
+    response (or use it as a context manager) when done. Requests that
+    carry their own Range or conditional headers (such as the download
+    cache's) and every other method go straight to the session.
+    """
+
+    def __init__(self,
+                 session: Optional[aiohttp.ClientSession] = None,
+                 cache: Optional[HTTPCache] = None,
+                 **session_kwargs):
+        self.session = session if session is not None else aiohttp.ClientSession(**session_kwargs)
+        self.cache = cache if cache is not None else get_http_cache()
+
+    def __getattr__(self, name: str):
+        return getattr(self.session, name)
+
+    async def __aenter__(self) -> 'CachingClientSession':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        await self.session.close()
+
+    def get(self, url, *, headers: Optional[Mapping[str, str]] = None, params=None, **kwargs):
+        if _passthrough(headers):
+            return self.session.get(url, headers=headers, params=params, **kwargs)
+        return _CachedRequest(self._get(url, headers, params, kwargs))
+
+    def _replay(self, entry: CacheEntry, headers: Mapping[str, str]) -> Tuple[CacheEntry, BinaryIO]:
+        entry = self.cache.revalidated(entry, headers)
+        # Opened now, so a later eviction cannot remove the body from under the reader
+        return entry, open(entry.path, 'rb')
+
+    async def _get(self, url, headers: Optional[Mapping[str, str]], params, kwargs):
+        key = str(URL(str(url)).update_query(params) if params else URL(str(url)))
+        # SQLite and blob I/O stay off the event loop
+        entry = await asyncio.to_thread(self.cache.lookup, key)
+        request_headers = dict(headers or {})
+        if entry is not None:
+            request_headers.update(entry.conditional_headers())
+
+        response = await self.session.get(key, headers=request_headers, **kwargs)
+        if response.status == 304 and entry is not None:
+            response.release()
+            entry, body = await asyncio.to_thread(self._replay, entry, response.headers)
+            HTTP_CACHE_REQUESTS.inc(result="hit")
+            return CachedClientResponse(key, entry, body)
+
+        content_length = response.headers.get('Content-Length')
+        if (not is_cacheable(response.status, response.headers)
+                or (content_length and content_length.isdigit() and int(content_length) > HTTP_CACHE_MAX_ENTRY_BYTES)):
+            HTTP_CACHE_REQUESTS.inc(result="uncacheable")
+            return StreamingClientResponse(response, response.content)
+
+        status, response_headers = response.status, response.headers
+
+        async def store(body: bytes):
+            await asyncio.to_thread(self.cache.store, key, status, response_headers, body)
+            HTTP_CACHE_REQUESTS.inc(result="miss")
+
+        return StreamingClientResponse(response, _CachingStream(response.content, HTTP_CACHE_MAX_ENTRY_BYTES, store))
+
+
+def create_client_session(**session_kwargs):
+    """aiohttp session for the pipeline: cached unless HTTP_CACHE_ENABLED is off"""
+    if not HTTP_CACHE_ENABLED:
+        return aiohttp.ClientSession(**session_kwargs)
+    return CachingClientSession(**session_kwargs)
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """
+    requests transport adapter that revalidates GETs against the shared HTTP cache
+
+    Mounted on a requests.Session, it adds the stored validators to GET
+    requests, turns a 304 into the stored response (with from_cache set),
+    and stores cacheable 200 responses up to HTTP_CACHE_MAX_ENTRY_MB.
+    """
+
+    def __init__(self, cache: Optional[HTTPCache] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache if cache is not None else get_http_cache()
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if request.method != 'GET' or _passthrough(request.headers):
+            return super().send(request, **kwargs)
+
+        entry = self.cache.lookup(request.url)
+        if entry is not None:
+            request.headers.update(entry.conditional_headers())
+
+        response = super().send(request, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            entry = self.cache.revalidated(entry, response.headers)
+            response.close()
+            HTTP_CACHE_REQUESTS.inc(result="hit")
+            return self._replay(request, entry)
+
+        response.from_cache = False
+        if is_cacheable(response.status_code, response.headers):
+            body = self._bounded_content(response, kwargs.get('stream', False))
+            if body is not None:
+                self.cache.store(request.url, response.status_code, response.headers, body)
+                HTTP_CACHE_REQUESTS.inc(result="miss")
+                return response
+        HTTP_CACHE_REQUESTS.inc(result="uncacheable")
+        return response
+
+    @staticmethod
+    def _bounded_content(response: requests.Response, stream: bool) -> Optional[bytes]:
+        """
+        The response body if it fits HTTP_CACHE_MAX_ENTRY_BYTES, else None
+
+        Without a Content-Length, a body the caller buffers anyway
+        (stream=False) is read up to the limit to find out; a streamed one
+        is left unread and not cached.
+        """
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit():
+            if int(content_length) > HTTP_CACHE_MAX_ENTRY_BYTES:
+                return None
+            body = response.content
+        elif stream:
+            return None
+        else:
+            chunks: List[bytes] = []
+            size = 0
+            stream_chunks = response.raw.stream(STREAM_CHUNK_SIZE, decode_content=True)
+            for chunk in stream_chunks:
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > HTTP_CACHE_MAX_ENTRY_BYTES:
+                    # Too large to cache; hand the caller the whole body as requests would have
+                    chunks.extend(stream_chunks)
+                    break
+            body = b''.join(chunks)
+            response._content = body
+            response._content_consumed = True
+        # Content-Length counts encoded bytes; the decoded body may be larger
+        return body if len(body) <= HTTP_CACHE_MAX_ENTRY_BYTES else None
+
+    def _replay(self, request: requests.PreparedRequest, entry: CacheEntry) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry.status
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response._content = entry.read_body()
+        response.from_cache = True
+        return response
+
+
+def create_requests_session() -> requests.Session:
+    """requests session for the pipeline: cached unless HTTP_CACHE_ENABLED is off"""
+    session = requests.Session()
+    if HTTP_CACHE_ENABLED:
+        adapter = CachingHTTPAdapter()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    return session
@@ -0,0 +1,325 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', 'data/jobs.db')
+DEFAULT_MAX_CONCURRENT_JOBS = int(os.getenv('JOB_MAX_CONCURRENCY', '2'))
+DEFAULT_MAX_QUEUED_JOBS = int(os.getenv('JOB_MAX_QUEUED', '16'))
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+# Minimum seconds between persisted progress updates
+PROGRESS_FLUSH_INTERVAL = 1.0
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when too many jobs are already waiting to run"""
+
+
+class JobStore:
+    """
+    SQLite persistence for background jobs
+
+    Every state change and (throttled) progress update is written through, so
+    job history and results survive a restart of the API process.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_JOB_STORE_PATH):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                job_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT,
+                message TEXT,
+                progress_done INTEGER DEFAULT 0,
+                progress_total INTEGER,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                completed_at TEXT
+            )
+        ''')
+        self._conn.commit()
+
+    def save(self, job: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO jobs (
+                    job_id, job_type, status, params, message, progress_done, progress_total,
+                    result, error, created_at, started_at, completed_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                job['job_id'], job['job_type'], job['status'],
+                json.dumps(job.get('params'), default=str), job.get('message'),
+                job.get('progress_done', 0), job.get('progress_total'),
+                json.dumps(job['result'], default=str) if job.get('result') is not None else None,
+                job.get('error'), job['created_at'], job.get('started_at'), job.get('completed_at')
+            ))
+            self._conn.commit()
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['params'] = json.loads(job['params']) if job['params'] else None
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, job_type: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs first, without their (potentially large) results"""
+        query = "SELECT * FROM jobs"
+        args: tuple = ()
+        if job_type:
+            query += " WHERE job_type = ?"
+            args = (job_type,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, args + (limit,)).fetchall()
+        jobs = []
+        for row in rows:
+            job = self._row_to_job(row)
+            job['result'] = None
+            jobs.append(job)
+        return jobs
+
+    def mark_interrupted(self) -> int:
+        """Mark jobs left active by a previous process as interrupted"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, completed_at = ?, message = ? WHERE status IN (?, ?)",
+                (INTERRUPTED, datetime.now().isoformat(), "Interrupted by service restart", *ACTIVE_STATES)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobContext:
+    """Handle passed to a running job for reporting progress"""
+
+    def __init__(self, manager: 'JobManager', job: Dict[str, Any]):
+        self._manager = manager
+        self._job = job
+        self._last_flush = 0.0
+
+    @property
+    def job_id(self) -> str:
+        return self._job['job_id']
+
+    def set_total(self, total: int):
+        self._job['progress_total'] = total
+        self._flush(force=True)
+
+    def update(self,
+               done: Optional[int] = None,
+               message: Optional[str] = None,
+               advance: int = 0,
+               total: Optional[int] = None):
+        """
+        Record progress; persisted at most once per PROGRESS_FLUSH_INTERVAL
+
+        Args:
+            done: Absolute number of items completed
+            message: Human-readable progress message
+            advance: Items completed since the last update
+            total: Total number of items, if it became known
+        """
+        if total is not None:
+            self._job['progress_total'] = total
+        if done is not None:
+            self._job['progress_done'] = done
+        self._job['progress_done'] = self._job.get('progress_done', 0) + advance
+        if message is not None:
+            self._job['message'] = message
+        self._flush()
+
+    def _flush(self, force: bool = False):
+        now = time.monotonic()
+        if force or now - self._last_flush >= PROGRESS_FLUSH_INTERVAL:
+            self._last_flush = now
+            self._manager.store.save(self._job)
+
+
+JobFunction = Callable[[JobContext], Awaitable[Any]]
+
+
+class JobManager:
+    """
+    Bounded-concurrency scheduler for long-running background jobs
+
+    Jobs get an ID immediately and wait on a semaphore for a run slot. Each
+    job reports progress through its JobContext; status, progress, results
+    and errors are persisted to a JobStore. Running or queued jobs can be
+    cancelled. At most max_queued jobs may wait for a slot.
+    """
+
+    def __init__(self,
+                 store: Optional[JobStore] = None,
+                 max_concurrent: int = DEFAULT_MAX_CONCURRENT_JOBS,
+                 max_queued: int = DEFAULT_MAX_QUEUED_JOBS):
+        self.store = store or JobStore()
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max(0, max_queued)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        interrupted = self.store.mark_interrupted()
+        if interrupted:
+            logger.warning(f"Marked {interrupted} jobs from a previous run as interrupted")
+
+    def submit(self, job_type: str, func: JobFunction, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Queue a job for execution
+
+        Args:
+            job_type: Job category (e.g. "process", "incremental-ingest")
+            func: Coroutine function called with the job's JobContext; its return value is the result
+            params: Request parameters, stored for reference
+
+        Returns:
+            The job record
+
+        Raises:
+            JobQueueFullError: If max_queued jobs are already waiting
+        """
+        queued = sum(1 for job in self._jobs.values() if job['status'] == QUEUED)
+        if queued >= self.max_queued:
+            raise JobQueueFullError(f"{queued} jobs are already queued")
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'job_type': job_type,
+            'status': QUEUED,
+            'params': params or {},
+            'message': "Queued",
+            'progress_done': 0,
+            'progress_total': None,
+            'result': None,
+            'error': None,
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'completed_at': None
+        }
+        self._jobs[job['job_id']] = job
+        self.store.save(job)
+        self._tasks[job['job_id']] = asyncio.create_task(self._run(job, func))
+        logger.info(f"Queued {job_type} job {job['job_id']}")
+        return job
+
+    async def _run(self, job: Dict[str, Any], func: JobFunction):
+        job_id = job['job_id']
+        try:
+            async with self._semaphore:
+                job['status'] = RUNNING
+                job['message'] = "Running"
+                job['started_at'] = datetime.now().isoformat()
+                self.store.save(job)
+
+                result = await func(JobContext(self, job))
+
+                job['status'] = COMPLETED
+                job['message'] = "Completed"
+                job['result'] = result
+        except asyncio.CancelledError:
+            job['status'] = CANCELLED
+            job['message'] = "Cancelled"
+        except Exception as e:
+            logger.error(f"{job['job_type']} job {job_id} failed: {e}")
+            job['status'] = FAILED
+            job['message'] = "Failed"
+            job['error'] = str(e)
+        finally:
+            job['completed_at'] = datetime.now().isoformat()
+            self.store.save(job)
+            self._tasks.pop(job_id, None)
+            self._jobs.pop(job_id, None)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; returns False if it is not active"""
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def active_jobs(self, job_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [job for job in self._jobs.values() if job_type is None or job['job_type'] == job_type]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job record with live progress metrics, from memory if active, else from the store"""
+        job = self._jobs.get(job_id) or self.store.get(job_id)
+        if job is None:
+            return None
+        return {**job, **self._progress_metrics(job)}
+
+    def list(self, job_type: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        jobs = []
+        for stored in self.store.list(job_type, limit):
+            job = self._jobs.get(stored['job_id'], stored)
+            jobs.append({**job, 'result': None, **self._progress_metrics(job)})
+        return jobs
+
+    def _progress_metrics(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Throughput (items/sec), fraction complete and ETA for a job"""
+        done = job.get('progress_done') or 0
+        total = job.get('progress_total')
+        metrics = {'progress': None, 'items_per_second': None, 'eta_seconds': None}
+        if total:
+            metrics['progress'] = min(done / total, 1.0)
+        if job.get('started_at'):
+            end = datetime.fromisoformat(job['completed_at']) if job.get('completed_at') else datetime.now()
+            elapsed = (end - datetime.fromisoformat(job['started_at'])).total_seconds()
+            if elapsed > 0 and done:
+                rate = done / elapsed
+                metrics['items_per_second'] = rate
+                if total and job['status'] == RUNNING:
+                    metrics['eta_seconds'] = max(total - done, 0) / rate
+        return metrics
+
+    async def shutdown(self):
+        """Cancel active jobs (they are recorded as cancelled) and close the store"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.store.close()
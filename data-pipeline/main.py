@@ -1,21 +1,30 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Callable
 import asyncio
+import inspect
 import json
 import os
 from datetime import datetime
+from collections import Counter
 import logging
 from pathlib import Path
 
 from osdr_processor import OSDADataProcessor, Publication
-from transformer_analyzer import TransformerAnalyzer
 # Import scientific data analyzer
 from scientific_data_analyzer import ScientificDataAnalyzer
-# Import NASADataAnalyzer for clustering data
-from data_analyzer import NASADataAnalyzer
+from analysis_pool import AnalysisWorkerPool, AnalysisQueueFullError
+from search_index import PublicationSearchIndex, FACET_FIELDS
+from publication_encoder import EncodedPublications, dumps, json_object_with_list
+from dataset_manager import DatasetManager, DatasetSnapshot
+from semantic_index import SemanticSearchService, SemanticIndex
+from single_flight import SingleFlight, canonical_key
+from job_manager import JobManager, JobContext, JobQueueFullError
+from admission import AdmissionController, AdmissionRejected, parse_priority
+from response_cache import ResponseCache, CachedResponse, make_cache_key, etag_matches
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, CallbackMetric, MetricsMiddleware
 
 # Import summarization components
 try:
@@ -55,6 +64,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and in-flight request metrics
+app.add_middleware(MetricsMiddleware)
+
 # Pydantic models
 class PublicationResponse(BaseModel):
     title: str
@@ -71,13 +83,18 @@ class PublicationResponse(BaseModel):
     metadata: Dict[str, Any]
 
 class SearchRequest(BaseModel):
-    query: str = Field(..., description="Search query")
+    query: str = Field(..., description="Search query; in keyword mode every word must occur in the title, "
+                                          "abstract or keywords, also inside a longer word")
     research_areas: Optional[List[str]] = Field(None, description="Filter by research areas")
     organisms: Optional[List[str]] = Field(None, description="Filter by organisms")
+    study_types: Optional[List[str]] = Field(None, description="Filter by study types")
     date_from: Optional[datetime] = Field(None, description="Filter by date from")
     date_to: Optional[datetime] = Field(None, description="Filter by date to")
     limit: int = Field(50, description="Maximum number of results")
     offset: int = Field(0, description="Results offset for pagination")
+    facets: Optional[List[str]] = Field(None, description="Return value counts over all results for these fields (research_area, organism, study_type, year)")
+    facet_limit: int = Field(20, description="Maximum number of values per facet")
+    mode: str = Field("keyword", description="keyword (ranked term matching) or semantic (title and abstract embedding similarity)")
 
 class SummarizationRequest(BaseModel):
     query: str = Field(..., description="Query to summarize")
@@ -103,155 +120,258 @@ class ProcessingStatus(BaseModel):
 
 # Global state
 processing_status = ProcessingStatus(status="idle", message="Ready to start processing")
-publications_cache: List[Dict[str, Any]] = []
+# Publications and derived indexes, swapped atomically on reload (see DatasetManager)
+datasets = DatasetManager()
+# Process-lifetime summarizer shared by all /summarize requests
+summarizer_service = None
+summarizer_lock: Optional[asyncio.Lock] = None
+
+# Worker processes for CPU-bound /analyze jobs (size from ANALYSIS_POOL_SIZE / ANALYSIS_MAX_QUEUE)
+analysis_pool = AnalysisWorkerPool()
+
+# Encoded responses of read endpoints, keyed by dataset fingerprint (RESPONSE_CACHE_* settings)
+response_cache = ResponseCache()
+
+# Publication-level embedding index, rebuilt in the background for each dataset version
+semantic_search = SemanticSearchService()
+
+# Identical concurrent /summarize and /analyze calls share one computation
+summarize_flights = SingleFlight("summarize")
+analyze_flights = SingleFlight("analyze")
+
+# Concurrency limits for heavy endpoints; read endpoints are never queued behind them
+# (override with ADMISSION_<CLASS>_CONCURRENCY / _QUEUE / _MAX_WAIT)
+summarize_admission = AdmissionController.from_env("summarize", max_concurrent=4, max_queue=16, max_wait=10)
+analyze_admission = AdmissionController.from_env(
+    "analyze", max_concurrent=analysis_pool.pool_size, max_queue=analysis_pool.max_queue, max_wait=30
+)
 
-# Initialize transformer analyzer
-transformer_analyzer = TransformerAnalyzer()
+# Seconds clients are asked to wait when the job queue is full
+JOB_QUEUE_RETRY_AFTER = 30
+
+# Persistent scheduler for /process, /incremental-ingest and /scientific-data-analysis (created on startup)
+job_manager: Optional[JobManager] = None
+
+# Scrape-time metrics read from the global state
+REGISTRY.register(CallbackMetric(
+    "response_cache_lookups_total", "Response cache lookups by result",
+    lambda: {("hit",): response_cache.hits, ("miss",): response_cache.misses},
+    ("result",), metric_type="counter"
+))
+REGISTRY.register(CallbackMetric(
+    "response_cache_hit_ratio", "Fraction of response cache lookups served from cache",
+    lambda: {(): response_cache.hits / max(response_cache.hits + response_cache.misses, 1)}
+))
+REGISTRY.register(CallbackMetric(
+    "response_cache_bytes", "Bytes held by the in-process response cache",
+    lambda: {(): response_cache.local.current_bytes}
+))
+REGISTRY.register(CallbackMetric(
+    "analysis_jobs_pending", "/analyze jobs running or queued in the worker pool",
+    lambda: {(): analysis_pool.pending}
+))
+REGISTRY.register(CallbackMetric(
+    "background_jobs_active", "Background jobs queued or running, by type",
+    lambda: {
+        (job_type,): count
+        for job_type, count in Counter(job['job_type'] for job in (job_manager.active_jobs() if job_manager else [])).items()
+    },
+    ("job_type",)
+))
+REGISTRY.register(CallbackMetric(
+    "publications_cached", "Publications in the in-memory cache",
+    lambda: {(): len(datasets.current)}
+))
+REGISTRY.register(CallbackMetric(
+    "dataset_version", "Number of times the publications cache has been replaced",
+    lambda: {(): datasets.current.version}
+))
 
 # Utility functions
-def load_publications_from_file(file_path: str = "data/processed_publications.json") -> List[Dict[str, Any]]:
-    """Load publications from file"""
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Check if we have real data
-                if not data or len(data) == 0:
-                    logger.error("Publication file is empty or contains no data")
-                    # Don't generate fallback data, return empty list to trigger real data fetch
-                    return []
-                return data
-        except Exception as e:
-            logger.error(f"Error loading publications: {e}")
-            # Don't generate fallback data, return empty list to trigger real data fetch
-            return []
-    else:
-        logger.info("Publication file not found, will fetch real NASA OSDR data when processing is triggered")
-        return []  # Return empty list instead of generating fallback data
-
-def search_publications(publications: List[Dict[str, Any]], request: SearchRequest) -> List[Dict[str, Any]]:
-    """Search publications based on request parameters"""
-    results = publications.copy()
-    
-    # Text search in title, abstract, and keywords
-    if request.query:
-        query_lower = request.query.lower()
-        results = [
-            pub for pub in results
-            if (query_lower in pub.get('title', '').lower() or
-                query_lower in pub.get('abstract', '').lower() or
-                any(query_lower in keyword.lower() for keyword in pub.get('keywords', [])))
-        ]
-    
-    # Filter by research areas
-    if request.research_areas:
-        results = [
-            pub for pub in results
-            if pub.get('research_area') in request.research_areas
-        ]
-    
-    # Filter by organisms
-    if request.organisms:
-        results = [
-            pub for pub in results
-            if any(organism in request.organisms for organism in pub.get('organisms', []))
-        ]
-    
-    # Filter by date range
-    if request.date_from:
-        results = [
-            pub for pub in results
-            if datetime.fromisoformat(pub.get('publication_date', '').replace('Z', '+00:00')) >= request.date_from
-        ]
-    
-    if request.date_to:
-        results = [
-            pub for pub in results
-            if datetime.fromisoformat(pub.get('publication_date', '').replace('Z', '+00:00')) <= request.date_to
-        ]
+def on_dataset_published(snapshot: DatasetSnapshot):
+    """Drop state tied to the previous dataset"""
+    # Cached responses for the previous dataset can no longer be served
+    response_cache.invalidate()
+    schedule_semantic_index(snapshot)
+
+datasets.add_listener(on_dataset_published)
+
+async def build_semantic_index(job: JobContext, snapshot: DatasetSnapshot) -> Dict[str, Any]:
+    """Embed a snapshot's publications (or load their saved embeddings) and publish its semantic index"""
+    def progress(done: int, total: int):
+        job.update(done, f"Embedded {done}/{total} publications", total=total)
     
-    # Pagination
-    return results[request.offset:request.offset + request.limit]
-
-def classify_file_type(file_url, file_name=""):
-    """Classify file type based on extension and content"""
-    file_type = "Unknown"
-    experiment_type = "Unknown"
-    
-    if not file_url and not file_name:
-        return file_type, experiment_type
-    
-    # Use file name if available, otherwise extract from URL
-    name_to_check = file_name if file_name else file_url.lower()
-    
-    # Determine file type from extension
-    if any(ext in name_to_check for ext in ['.csv', '.tsv', '.txt']):
-        file_type = "Tabular"
-        experiment_type = "Data Table"
-    elif any(ext in name_to_check for ext in ['.json', '.xml']):
-        file_type = "Metadata"
-        experiment_type = "Study Metadata"
-    elif any(ext in name_to_check for ext in ['.pdf']):
-        file_type = "Document"
-        experiment_type = "Research Paper"
-    elif any(ext in name_to_check for ext in ['.fastq', '.fq', '.bam', '.sam']):
-        file_type = "Omics"
-        experiment_type = "Sequencing Data"
-    elif any(ext in name_to_check for ext in ['.h5', '.hdf5']):
-        file_type = "Omics"
-        experiment_type = "Expression Data"
-    elif any(ext in name_to_check for ext in ['.fasta', '.fa', '.fna']):
-        file_type = "Omics"
-        experiment_type = "Sequence Data"
-    elif any(ext in name_to_check for ext in ['.tif', '.tiff', '.png', '.jpg', '.jpeg']):
-        file_type = "Image"
-        experiment_type = "Microscopy Image"
-    elif any(ext in name_to_check for ext in ['.zip', '.tar', '.tar.gz', '.tgz']):
-        file_type = "Archive"
-        experiment_type = "Compressed Data"
-    
-    return file_type, experiment_type
-
-def extract_species_from_metadata(metadata):
-    """Extract species information from metadata"""
-    species = "Unknown"
-    
-    # Look for organism information in various metadata fields
-    organism_fields = ['organism', 'organisms', 'species', 'scientificName']
-    
-    for field in organism_fields:
-        if field in metadata:
-            organism_data = metadata[field]
-            if isinstance(organism_data, list) and organism_data:
-                species = organism_data[0].get('scientificName', 'Unknown') if isinstance(organism_data[0], dict) else str(organism_data[0])
-                break
-            elif isinstance(organism_data, str):
-                species = organism_data
-                break
-    
-    # If still unknown, return as is without hardcoded patterns
-    # Removed hardcoded species detection to prevent hardcoding
-    
-    return species
-
-def extract_mission_info(metadata):
-    """Extract mission information from metadata"""
-    mission = "Unknown"
-    
-    # Look for mission-related information
-    mission_fields = ['space_program', 'mission', 'platform', 'study_type']
-    
-    for field in mission_fields:
-        if field in metadata:
-            mission_data = metadata[field]
-            if isinstance(mission_data, str):
-                mission = mission_data
-                break
-    
-    # If still unknown, return as is without hardcoded patterns
-    # Removed hardcoded mission detection to prevent hardcoding
-    
-    return mission
+    index = await asyncio.to_thread(semantic_search.build, snapshot.publications, snapshot.encoded.fingerprint, progress)
+    return {
+        "dataset_version": snapshot.version,
+        "publications": len(index),
+        "ann": index.ann is not None
+    }
+
+def schedule_semantic_index(snapshot: DatasetSnapshot):
+    """Start a background job building the semantic index for a newly published snapshot"""
+    if job_manager is None or not semantic_search.available or not len(snapshot):
+        return
+    # An index for an older snapshot is never served, so stop building it
+    for job in job_manager.active_jobs("semantic-index"):
+        job_manager.cancel(job['job_id'])
+    try:
+        job_manager.submit(
+            "semantic-index",
+            lambda job: build_semantic_index(job, snapshot),
+            {"dataset_version": snapshot.version}
+        )
+    except JobQueueFullError as e:
+        logger.warning(f"Could not schedule semantic index build: {e}")
+
+def current_dataset() -> DatasetSnapshot:
+    """The dataset snapshot a request should use for its whole lifetime"""
+    return datasets.current
+
+def get_db_config() -> Dict[str, str]:
+    """Database configuration from the environment"""
+    return {
+        'host': os.getenv('DATABASE_HOST', 'postgres'),
+        'port': os.getenv('DATABASE_PORT', '5432'),
+        'user': os.getenv('DATABASE_USER', 'postgres'),
+        'password': os.getenv('DATABASE_PASSWORD', 'password'),
+        'database': os.getenv('DATABASE_NAME', 'nasa_biology')
+    }
+
+async def get_summarizer():
+    """Return the shared summarizer, creating and warming it on first use"""
+    global summarizer_service, summarizer_lock
+    
+    if summarizer_service is not None:
+        return summarizer_service
+    
+    if summarizer_lock is None:
+        summarizer_lock = asyncio.Lock()
+    
+    async with summarizer_lock:
+        if summarizer_service is None:
+            # Model loading is blocking; keep it off the event loop
+            summarizer = await asyncio.to_thread(RetrievalAugmentedSummarizer, get_db_config())
+            await summarizer.__aenter__()
+            await asyncio.to_thread(summarizer.warm_up)
+            summarizer_service = summarizer
+            logger.info("Summarizer service ready")
+    
+    return summarizer_service
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_BATCH_SIZE = 100
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    """Whether the client asked for a streamed NDJSON response"""
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def iter_ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode records as newline-delimited JSON, flushing in small batches"""
+    batch = []
+    for record in records:
+        batch.append(dumps(record))
+        if len(batch) >= NDJSON_BATCH_SIZE:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+def ndjson_response(body: Iterable[bytes], total: int) -> StreamingResponse:
+    """Stream NDJSON chunks; the total record count is sent as a header"""
+    return StreamingResponse(
+        body,
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"X-Total-Count": str(total)}
+    )
+
+def job_accepted(job: Dict[str, Any], **extra) -> JSONResponse:
+    """202 response pointing the client at a submitted job"""
+    status_url = f"/jobs/{job['job_id']}"
+    return JSONResponse(
+        status_code=202,
+        content={**extra, "job_id": job['job_id'], "job_status": job['status'], "status_url": status_url},
+        headers={"Location": status_url}
+    )
+
+async def cached_response(request: Request,
+                          endpoint: str,
+                          params: Dict[str, Any],
+                          encoded: EncodedPublications,
+                          build: Callable[[], Any]) -> Response:
+    """
+    Serve a JSON body from the response cache, answering revalidations with 304
+    
+    Args:
+        request: Incoming request (for If-None-Match)
+        endpoint: Cache namespace for the endpoint
+        params: Normalized request parameters
+        encoded: Encoded publications snapshot the body is built from; its fingerprint versions the key
+        build: Produces the response body (bytes, or an awaitable of bytes) on a cache miss
+    """
+    key = make_cache_key(endpoint, params, encoded.fingerprint)
+    entry = await response_cache.get(key)
+    if entry is None:
+        body = build()
+        if inspect.isawaitable(body):
+            body = await body
+        entry = CachedResponse.from_body(body)
+        await response_cache.set(key, entry)
+    
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+def too_many_requests(detail: str, retry_after: int) -> HTTPException:
+    """429 response asking the client to retry later"""
+    return HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(retry_after)})
+
+def submit_job(job_type: str, func, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Submit a background job, translating a full queue into 429"""
+    try:
+        return job_manager.submit(job_type, func, params)
+    except JobQueueFullError as e:
+        raise too_many_requests(f"Job queue is full ({e}), retry later", JOB_QUEUE_RETRY_AFTER)
+
+def search_publications(index: PublicationSearchIndex, request: SearchRequest) -> Tuple[int, List[int], Dict[str, Dict[str, int]]]:
+    """Search publications based on request parameters, returning the total hit count, the document IDs on the requested page and any facet counts"""
+    return index.search_with_facets(
+        query=request.query,
+        research_areas=request.research_areas,
+        organisms=request.organisms,
+        date_from=request.date_from,
+        date_to=request.date_to,
+        limit=request.limit,
+        offset=request.offset,
+        study_types=request.study_types,
+        facets=request.facets,
+        facet_limit=request.facet_limit
+    )
+
+def semantic_search_publications(index: PublicationSearchIndex,
+                                 semantic: SemanticIndex,
+                                 query_vector,
+                                 request: SearchRequest) -> Tuple[int, List[int], List[float], Dict[str, Dict[str, int]]]:
+    """Rank publications passing the structured filters by embedding similarity, returning the number of candidates, the page of document IDs, their scores and any facet counts"""
+    mask = index.filter_mask(request.research_areas, request.organisms, request.date_from, request.date_to, request.study_types)
+    total = len(index) if mask is None else int(mask.sum())
+    doc_ids, scores = semantic.search(query_vector, max(request.offset, 0) + max(request.limit, 0), mask)
+    
+    facet_counts: Dict[str, Dict[str, int]] = {}
+    if request.facets:
+        # Every candidate is ranked, so facets describe the filtered set
+        _, _, facet_counts = index.search_with_facets(
+            research_areas=request.research_areas,
+            organisms=request.organisms,
+            date_from=request.date_from,
+            date_to=request.date_to,
+            limit=0,
+            study_types=request.study_types,
+            facets=request.facets,
+            facet_limit=request.facet_limit
+        )
+    return total, doc_ids[request.offset:], scores[request.offset:], facet_counts
 
 # API Endpoints
 
@@ -265,16 +385,21 @@ async def root():
         "endpoints": {
             "GET /health": "Health check",
             "GET /status": "Processing status",
-            "POST /process": "Start data processing",
+            "GET /metrics": "Prometheus metrics (request latency, stage timings, cache hit ratios)",
+            "POST /process": "Start data processing (background job)",
             "POST /search": "Search publications",
+            "GET /suggest": "Typeahead suggestions for a partially typed query",
             "GET /publications": "Get all publications",
             "GET /statistics": "Get dataset statistics",
             "GET /osdr-files": "Get all OSDR files with metadata",
-            "GET /osdr-files/{study_id}": "Get files for a specific OSDR study",
+            "GET /osdr-files/{study_id}": "Get files for a specific OSDR study (same records as GET /osdr-files)",
             "POST /analyze": "Analyze data using transformer-based AI model",
             "POST /summarize": "Generate retrieval-augmented summary for a query",
-            "POST /incremental-ingest": "Run incremental ingest with change detection",
-            "POST /scientific-data-analysis": "Analyze actual scientific data files from NASA OSDR studies"
+            "POST /incremental-ingest": "Run incremental ingest with change detection (background job)",
+            "POST /scientific-data-analysis": "Analyze actual scientific data files from NASA OSDR studies (background job)",
+            "GET /jobs": "List background jobs",
+            "GET /jobs/{job_id}": "Get status, progress and result of a background job",
+            "DELETE /jobs/{job_id}": "Cancel a queued or running background job"
         }
     }
 
@@ -283,449 +408,269 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now()}
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text-format metrics"""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+def sync_processing_status() -> ProcessingStatus:
+    """
+    Processing status, reconciled with the job manager
+
+    A /process job cancelled while still queued never runs
+    process_osdr_data, so nothing else moves the status out of "processing".
+    """
+    if processing_status.status == "processing" and not job_manager.active_jobs("process"):
+        processing_status.status = "cancelled"
+        processing_status.message = "Processing cancelled"
+        processing_status.completed_at = datetime.now()
+    return processing_status
+
 @app.get("/status", response_model=ProcessingStatus)
 async def get_processing_status():
     """Get current processing status"""
-    return processing_status
+    return sync_processing_status()
 
-@app.post("/process")
-async def start_processing(background_tasks: BackgroundTasks):
-    """Start processing OSDR data"""
+@app.post("/process", status_code=202)
+async def start_processing():
+    """Start processing OSDR data as a background job"""
     global processing_status
     
-    if processing_status.status == "processing":
+    # The job manager, not the status, knows whether a process job is queued or running
+    if job_manager.active_jobs("process"):
         raise HTTPException(status_code=400, detail="Processing already in progress")
     
+    # Real data only
+    job = submit_job("process", process_osdr_data)
+    
     processing_status.status = "processing"
     processing_status.message = "Starting data processing..."
+    processing_status.progress = None
     processing_status.started_at = datetime.now()
     processing_status.completed_at = None
     
-    # Add background task for real data only
-    background_tasks.add_task(process_osdr_data)
-    
-    return {"message": "Processing started", "status": processing_status.status}
+    return job_accepted(job, message="Processing started", status=processing_status.status)
+
+@app.get("/jobs")
+async def list_jobs(job_type: Optional[str] = Query(None, description="Filter by job type"),
+                    limit: int = Query(50, ge=1, le=500)):
+    """List recent background jobs, newest first (results omitted)"""
+    return {"jobs": job_manager.list(job_type, limit)}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get status, progress (items/sec, ETA) and result of a background job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.delete("/jobs/{job_id}", status_code=202)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running background job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job['status']}")
+    return {"job_id": job_id, "message": "Cancellation requested"}
 
 @app.post("/search")
-async def search_publications_endpoint(request: SearchRequest):
+async def search_publications_endpoint(request: SearchRequest, http_request: Request):
     """Search publications with filters"""
-    global publications_cache
     
-    # Load publications if not cached
-    if not publications_cache:
-        publications_cache = load_publications_from_file()
+    # Capture a consistent snapshot of the index and its encoded records
+    dataset = current_dataset()
     
-    if not publications_cache:
+    if not dataset.publications:
         raise HTTPException(status_code=404, detail="No publications found. Please process data first.")
     
-    results = search_publications(publications_cache, request)
-    
-    return {
-        "query": request.query,
-        "total_results": len(results),
-        "results": results,
-        "pagination": {
-            "limit": request.limit,
-            "offset": request.offset,
-            "has_more": len(results) == request.limit
+    index, encoded = dataset.search_index, dataset.encoded
+    
+    unknown_facets = [facet for facet in request.facets or [] if facet not in FACET_FIELDS]
+    if unknown_facets:
+        raise HTTPException(status_code=400, detail=f"Unknown facets {unknown_facets}; expected any of {list(FACET_FIELDS)}")
+    if request.mode not in ("keyword", "semantic"):
+        raise HTTPException(status_code=400, detail=f"Unknown search mode '{request.mode}'; expected keyword or semantic")
+    
+    semantic: Optional[SemanticIndex] = None
+    if request.mode == "semantic":
+        if not semantic_search.available:
+            raise HTTPException(status_code=501, detail="Semantic search not available. Install sentence-transformers.")
+        semantic = semantic_search.index_for(encoded.fingerprint)
+        if semantic is None:
+            raise HTTPException(status_code=503, detail="Semantic index for the current dataset is still being built",
+                                headers={"Retry-After": "30"})
+    
+    async def build() -> bytes:
+        scores = None
+        if semantic is None:
+            total_results, doc_ids, facet_counts = search_publications(index, request)
+        else:
+            # Model inference is CPU-bound; keep it off the event loop
+            query_vector = await asyncio.to_thread(semantic_search.encode_query, request.query)
+            total_results, doc_ids, scores, facet_counts = semantic_search_publications(index, semantic, query_vector, request)
+        
+        extra = {
+            "query": request.query,
+            "total_results": total_results,
+            "pagination": {
+                "limit": request.limit,
+                "offset": request.offset,
+                "has_more": request.offset + len(doc_ids) < total_results
+            }
         }
-    }
+        if request.facets:
+            extra["facets"] = facet_counts
+        if scores is not None:
+            extra["scores"] = [round(score, 4) for score in scores]
+        
+        # Assemble the response from pre-encoded publication fragments
+        return json_object_with_list("results", encoded.select(doc_ids), extra)
+    
+    return await cached_response(http_request, "search", request.dict(), encoded, build)
+
+@app.get("/suggest")
+async def suggest(
+    q: str = Query(..., description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions")
+):
+    """Suggest titles, keywords, organisms and entities starting with the typed text"""
+    dataset = current_dataset()
+    return {"query": q, "suggestions": dataset.suggestions.suggest(q, limit)}
 
 @app.get("/publications")
 async def get_publications(
-    limit: int = Query(50, description="Maximum number of results"),
-    offset: int = Query(0, description="Results offset")
+    request: Request,
+    limit: Optional[int] = Query(None, description="Maximum number of results (default 50; unlimited when streaming)"),
+    offset: int = Query(0, description="Results offset"),
+    stream: bool = Query(False, description="Stream results as NDJSON (same as Accept: application/x-ndjson)")
 ):
     """Get all publications with pagination"""
-    global publications_cache
     
-    # Load publications if not cached
-    if not publications_cache:
-        publications_cache = load_publications_from_file()
+    dataset = current_dataset()
+    encoded = dataset.encoded
     
-    if not publications_cache:
+    # Stream pre-encoded records from the cache snapshot without building a response list
+    if wants_ndjson(request, stream):
+        end = None if limit is None else offset + limit
+        return ndjson_response(encoded.iter_ndjson(offset, end, NDJSON_BATCH_SIZE), len(encoded))
+    
+    if limit is None:
+        limit = 50
+    
+    if not dataset.publications:
         return {"publications": [], "total": 0}
     
-    # Pagination
-    results = publications_cache[offset:offset + limit]
+    # Pagination over pre-encoded records
+    def build() -> bytes:
+        total = len(encoded)
+        return json_object_with_list("publications", encoded[offset:offset + limit], {
+            "total": total,
+            "pagination": {
+                "limit": limit,
+                "offset": offset,
+                "has_more": total > offset + limit
+            }
+        })
     
-    return {
-        "publications": results,
-        "total": len(publications_cache),
-        "pagination": {
-            "limit": limit,
-            "offset": offset,
-            "has_more": len(publications_cache) > offset + limit
-        }
-    }
+    return await cached_response(request, "publications", {"limit": limit, "offset": offset}, encoded, build)
 
 @app.get("/statistics")
-async def get_statistics():
+async def get_statistics(request: Request):
     """Get dataset statistics"""
-    global publications_cache
     
-    # Load publications if not cached
-    if not publications_cache:
-        try:
-            publications_cache = load_publications_from_file()
-        except (FileNotFoundError, ValueError, ConnectionError) as e:
-            # If there's an error loading real data, return an error response
-            logger.error(f"Error loading real NASA OSDR data: {e}")
-            return JSONResponse(
-                status_code=503,
-                content={"error": "Error fetching real NASA OSDR data", "message": str(e)}
-            )
+    dataset = current_dataset()
     
-    if not publications_cache:
+    if not dataset.publications:
         # If no publications found, return error instead of fallback data
         return JSONResponse(
             status_code=503,
             content={"error": "Error fetching real NASA OSDR data", "message": "No real NASA OSDR data available. Please trigger data processing to fetch real data from NASA OSDR repository."}
         )
     
-    # Calculate statistics
-    total_publications = len(publications_cache)
-    research_areas = {}
-    organisms = set()
-    years = {}
-    authors = set()
-    
-    # Track the earliest and latest years for 30+ year calculation
-    earliest_year = None
-    latest_year = None
-    
-    for pub in publications_cache:
-        # Research areas
-        area = pub.get('research_area', 'Unknown')
-        research_areas[area] = research_areas.get(area, 0) + 1
-        
-        # Organisms - properly extract from nested structure
-        organisms_list = pub.get('organisms', [])
-        if not organisms_list and 'metadata' in pub:
-            # Try to extract from metadata
-            metadata = pub.get('metadata', {})
-            if 'organism' in metadata:
-                organism_data = metadata['organism']
-                if isinstance(organism_data, list):
-                    for org in organism_data:
-                        if isinstance(org, dict) and 'scientificName' in org:
-                            organisms_list.append(org['scientificName'])
-                        elif isinstance(org, str):
-                            organisms_list.append(org)
-                elif isinstance(organism_data, dict) and 'scientificName' in organism_data:
-                    organisms_list.append(organism_data['scientificName'])
-                elif isinstance(organism_data, str):
-                    organisms_list.append(organism_data)
-        
-        # If still no organisms, try direct metadata fields
-        if not organisms_list:
-            # Check for organism in various metadata fields
-            organism_fields = ['organism', 'organisms', 'species', 'scientificName']
-            for field in organism_fields:
-                if field in pub:
-                    org_data = pub[field]
-                    if isinstance(org_data, list):
-                        organisms_list.extend(org_data)
-                    elif isinstance(org_data, str):
-                        organisms_list.append(org_data)
-                    elif isinstance(org_data, dict) and 'scientificName' in org_data:
-                        organisms_list.append(org_data['scientificName'])
-        
-        organisms.update(organisms_list)
-        
-        # Years - track for 30+ year calculation
-        try:
-            pub_date = datetime.fromisoformat(pub.get('publication_date', ''))
-            year = pub_date.year
-            years[year] = years.get(year, 0) + 1
-            
-            # Update earliest and latest years
-            if earliest_year is None or year < earliest_year:
-                earliest_year = year
-            if latest_year is None or year > latest_year:
-                latest_year = year
-        except Exception as e:
-            logger.warning(f"Error parsing publication date: {e}")
-            pass
-        
-        # Authors
-        authors.update(pub.get('authors', []))
-    
-    # Calculate year range for 30+ years
-    year_range = "N/A"
-    if earliest_year is not None and latest_year is not None:
-        year_range = f"{earliest_year} - {latest_year}"
-    
-    return {
-        "total_publications": total_publications,
-        "unique_organisms": len(organisms),
-        "unique_authors": len(authors),
-        "research_areas": len(research_areas),
-        "year_range": year_range,
-        "top_research_areas": dict(sorted(research_areas.items(), key=lambda x: x[1], reverse=True)[:10]),
-        "publications_by_year": dict(sorted(years.items())),
-        "top_organisms": list(organisms)[:20]
-    }
+    # Serve the precomputed aggregate maintained alongside the cache
+    return await cached_response(request, "statistics", {}, dataset.encoded, lambda: dumps(dataset.statistics.snapshot()))
 
 @app.get("/osdr-files")
-async def get_osdr_files(limit: int = Query(100, description="Maximum number of files to return", ge=1, le=1000), 
-                        offset: int = Query(0, description="Number of files to skip", ge=0)):
+async def get_osdr_files(request: Request,
+                        limit: Optional[int] = Query(None, description="Maximum number of files to return (default 100, max 1000; unlimited when streaming)", ge=1), 
+                        offset: int = Query(0, description="Number of files to skip", ge=0),
+                        file_type: Optional[str] = Query(None, description="Filter by file type"),
+                        species: Optional[str] = Query(None, description="Filter by species"),
+                        mission: Optional[str] = Query(None, description="Filter by mission"),
+                        stream: bool = Query(False, description="Stream files as NDJSON (same as Accept: application/x-ndjson)")):
     """Get all OSDR files with metadata, classified by type and experiment, with pagination support"""
-    global publications_cache
     
     logger.info("Fetching OSDR files endpoint called")
     
-    # Load publications if not cached
-    if not publications_cache:
-        logger.info("No cached publications found, attempting to load from file")
-        publications_cache = load_publications_from_file()
+    dataset = current_dataset()
+    catalog = dataset.file_catalog
     
-    if not publications_cache:
+    if not dataset.publications:
         logger.warning("No publications data available, returning empty list")
         return []
     
-    # Extract file information from publications
-    files = []
-    file_ids = set()  # To avoid duplicates
+    # Stream rows from the catalog one at a time
+    if wants_ndjson(request, stream):
+        total_files = catalog.count(file_type=file_type, species=species, mission=mission)
+        return ndjson_response(
+            iter_ndjson(catalog.iter_rows(offset, limit, file_type=file_type, species=species, mission=mission)),
+            total_files
+        )
     
-    logger.info(f"Processing {len(publications_cache)} publications for file extraction")
+    if limit is None:
+        limit = 100
+    elif limit > 1000:
+        raise HTTPException(status_code=422, detail="limit must be at most 1000; use stream=true for bulk exports")
     
-    for pub in publications_cache:
-        osdr_id = pub.get('osdr_id', '')
-        if not osdr_id:
-            continue
-            
-        metadata = pub.get('metadata', {})
-        
-        # Extract species and mission info
-        species = extract_species_from_metadata(metadata)
-        mission = extract_mission_info(metadata)
-        
-        # Extract file information from each publication
-        file_urls = pub.get('file_urls', [])
-        
-        # Also check for datafiles in the metadata
-        datafiles = metadata.get('datafiles', [])
-        
-        # Process file_urls
-        for i, file_url in enumerate(file_urls):
-            # Skip empty URLs
-            if not file_url:
-                continue
-                
-            # Create a unique file ID
-            file_id = f"{osdr_id}_file_{i+1}"
-            
-            # Skip if we've already added this file
-            if file_id in file_ids:
-                continue
-                
-            file_ids.add(file_id)
-            
-            # Extract filename from URL
-            file_name = f"File {i+1}"
-            if file_url:
-                from urllib.parse import urlparse
-                parsed_url = urlparse(file_url)
-                path_parts = parsed_url.path.split('/')
-                if path_parts and path_parts[-1]:
-                    file_name = path_parts[-1]
-            
-            # Classify file type
-            file_type, experiment_type = classify_file_type(file_url, file_name)
-            
-            files.append({
-                "id": file_id,
-                "name": file_name,
-                "type": file_type,
-                "experiment_type": experiment_type,
-                "size": "Unknown",
-                "date": pub.get('publication_date', ''),
-                "description": f"File associated with {osdr_id} study",
-                "url": file_url,
-                "study_id": osdr_id,
-                "species": species,
-                "mission": mission
-            })
-        
-        # Process datafiles from metadata
-        for i, datafile in enumerate(datafiles):
-            file_url = datafile.get('file_url', '')
-            if not file_url:
-                continue
-                
-            # Create a unique file ID
-            file_id = f"{osdr_id}_datafile_{i+1}"
-            
-            # Skip if we've already added this file
-            if file_id in file_ids:
-                continue
-                
-            file_ids.add(file_id)
-            
-            # Extract filename from URL
-            file_name = f"Data File {i+1}"
-            if file_url:
-                from urllib.parse import urlparse
-                parsed_url = urlparse(file_url)
-                path_parts = parsed_url.path.split('/')
-                if path_parts and path_parts[-1]:
-                    file_name = path_parts[-1]
-            
-            # Get file type from datafile metadata or classify
-            file_type = datafile.get('file_type', 'Unknown')
-            experiment_type = "Unknown"
-            
-            # If file_type is still unknown, classify it
-            if file_type == "Unknown":
-                file_type, experiment_type = classify_file_type(file_url, file_name)
-            else:
-                # Infer experiment type from file type
-                if file_type == "NASA Research Data":
-                    experiment_type = "Space Biology Experiment"
-            
-            files.append({
-                "id": file_id,
-                "name": file_name,
-                "type": file_type,
-                "experiment_type": experiment_type,
-                "size": datafile.get('file_size', 'Unknown'),
-                "date": pub.get('publication_date', ''),
-                "description": datafile.get('description', f"Data file associated with {osdr_id} study"),
-                "url": file_url,
-                "study_id": osdr_id,
-                "species": species,
-                "mission": mission
-            })
-    
-    # Apply pagination
-    total_files = len(files)
-    paginated_files = files[offset:offset + limit]
-    
-    logger.info(f"Returning {len(paginated_files)} OSDR files (limited from {total_files} total files)")
-    return {
-        "files": paginated_files,
-        "total": total_files,
-        "limit": limit,
-        "offset": offset,
-        "has_more": offset + limit < total_files
-    }
+    # Page through the prebuilt file catalog
+    def build() -> bytes:
+        total_files, paginated_files = catalog.page(
+            limit, offset, file_type=file_type, species=species, mission=mission
+        )
+        logger.info(f"Returning {len(paginated_files)} OSDR files (limited from {total_files} total files)")
+        return dumps({
+            "files": paginated_files,
+            "total": total_files,
+            "limit": limit,
+            "offset": offset,
+            "has_more": offset + limit < total_files
+        })
+    
+    params = {"limit": limit, "offset": offset, "file_type": file_type, "species": species, "mission": mission}
+    return await cached_response(request, "osdr-files", params, dataset.encoded, build)
 
 @app.get("/osdr-files/{study_id}")
 async def get_osdr_files_by_study(study_id: str):
-    """Get files for a specific OSDR study, classified by type and experiment"""
-    global publications_cache
+    """
+    Get files for a specific OSDR study, classified by type and experiment
+
+    Records have the same fields and values as in GET /osdr-files. Metadata
+    datafiles report their own size and description (before, this endpoint
+    always returned "Unknown" and a generic description). Missing values
+    still fall back to those defaults, and an explicit null is returned as null.
+    """
     
     logger.info(f"Fetching OSDR files for study: {study_id}")
     
-    # Load publications if not cached
-    if not publications_cache:
-        logger.info("No cached publications found, attempting to load from file")
-        publications_cache = load_publications_from_file()
+    dataset = current_dataset()
     
-    if not publications_cache:
+    if not dataset.publications:
         logger.warning("No publications data available, returning empty list")
         return []
     
-    # Find the publication with the matching study ID
-    target_pub = None
-    for pub in publications_cache:
-        if pub.get('osdr_id', '') == study_id:
-            target_pub = pub
-            break
-    
-    if not target_pub:
+    if not dataset.file_catalog.has_study(study_id):
         logger.warning(f"No publication found for study ID: {study_id}")
         return []
     
-    # Extract file information from the publication
-    files = []
-    metadata = target_pub.get('metadata', {})
-    
-    # Extract species and mission info
-    species = extract_species_from_metadata(metadata)
-    mission = extract_mission_info(metadata)
-    
-    # Process file_urls
-    file_urls = target_pub.get('file_urls', [])
-    for i, file_url in enumerate(file_urls):
-        # Skip empty URLs
-        if not file_url:
-            continue
-            
-        # Extract filename from URL
-        file_name = f"File {i+1}"
-        if file_url:
-            from urllib.parse import urlparse
-            parsed_url = urlparse(file_url)
-            path_parts = parsed_url.path.split('/')
-            if path_parts and path_parts[-1]:
-                file_name = path_parts[-1]
-        
-        # Classify file type
-        file_type, experiment_type = classify_file_type(file_url, file_name)
-        
-        files.append({
-            "id": f"{study_id}_file_{i+1}",
-            "name": file_name,
-            "type": file_type,
-            "experiment_type": experiment_type,
-            "size": "Unknown",
-            "date": target_pub.get('publication_date', ''),
-            "description": f"File associated with {study_id} study",
-            "url": file_url,
-            "study_id": study_id,
-            "species": species,
-            "mission": mission
-        })
-    
-    # Process datafiles from metadata
-    datafiles = metadata.get('datafiles', [])
-    for i, datafile in enumerate(datafiles):
-        file_url = datafile.get('file_url', '')
-        if not file_url:
-            continue
-            
-        # Extract filename from URL
-        file_name = f"Data File {i+1}"
-        if file_url:
-            from urllib.parse import urlparse
-            parsed_url = urlparse(file_url)
-            path_parts = parsed_url.path.split('/')
-            if path_parts and path_parts[-1]:
-                file_name = path_parts[-1]
-        
-        # Get file type from datafile metadata or classify
-        file_type = datafile.get('file_type', 'Unknown')
-        experiment_type = "Unknown"
-        
-        # If file_type is still unknown, classify it
-        if file_type == "Unknown":
-            file_type, experiment_type = classify_file_type(file_url, file_name)
-        else:
-            # Infer experiment type from file type
-            if file_type == "NASA Research Data":
-                experiment_type = "Space Biology Experiment"
-        
-        files.append({
-            "id": f"{study_id}_datafile_{i+1}",
-            "name": file_name,
-            "type": file_type,
-            "experiment_type": experiment_type,
-            "size": "Unknown",
-            "date": target_pub.get('publication_date', ''),
-            "description": f"Data file associated with {study_id} study",
-            "url": file_url,
-            "study_id": study_id,
-            "species": species,
-            "mission": mission
-        })
+    files = dataset.file_catalog.study_files(study_id)
     
     logger.info(f"Returning {len(files)} files for study {study_id}")
     return files
 
 @app.post("/analyze")
-async def analyze_data(data: dict):
+async def analyze_data(data: dict, request: Request):
     """Analyze NASA OSDR data using transformer-based AI model"""
     try:
         logger.info("=" * 60)
@@ -735,283 +680,282 @@ async def analyze_data(data: dict):
         # Log data size information
         data_size = len(data.get('publications', [])) if isinstance(data, dict) else len(data) if isinstance(data, list) else 0
         logger.info(f"AI Engine: Processing {data_size} publications")
-        logger.info("AI Engine: Initializing transformer-based analysis engine...")
-        
-        # Show progress visualization header
-        logger.info("-" * 60)
-        logger.info("AI Engine: Analysis Progress Visualization")
-        logger.info("-" * 60)
-        
-        # Perform analysis with progress tracking
-        results = transformer_analyzer.analyze_data(data)
+        logger.info(f"AI Engine: Dispatching to analysis worker pool ({analysis_pool.pending} jobs pending)")
         
-        # Show completion
-        logger.info("-" * 60)
-        logger.info("AI Engine: Analysis Progress Visualization - COMPLETE")
-        logger.info("-" * 60)
+        async def analyze() -> Dict[str, Any]:
+            async with analyze_admission.admit(parse_priority(request.headers.get("x-priority"))):
+                return await analysis_pool.run(data)
         
-        # Add clustering data from NASADataAnalyzer if not already present
-        # Only add clustering data if we have publications data to analyze
-        if data and len(data) > 0:
-            try:
-                # Initialize NASADataAnalyzer to get clustering data
-                data_analyzer = NASADataAnalyzer()
-                # Load data for analysis (this will use the data passed in)
-                if data_analyzer.load_data().empty:
-                    # If no cached data, create a temporary DataFrame from the input data
-                    import pandas as pd
-                    # Convert input data to DataFrame format expected by NASADataAnalyzer
-                    temp_data = []
-                    if 'publications' in data:
-                        temp_data = data['publications']
-                    elif 'data' in data and 'publications' in data['data']:
-                        temp_data = data['data']['publications']
-                    elif isinstance(data, list):
-                        temp_data = data
-                    
-                    if temp_data:
-                        data_analyzer.df = pd.DataFrame(temp_data)
-                        # Add required columns if missing
-                        required_columns = ['authors', 'organisms', 'keywords', 'abstract', 'title', 'publication_date']
-                        for col in required_columns:
-                            if col not in data_analyzer.df.columns:
-                                data_analyzer.df[col] = data_analyzer.df.get(col, [])
-                        
-                        # Perform clustering analysis
-                        clustering_data = data_analyzer.perform_clustering_analysis()
-                        if clustering_data:
-                            results['clustering'] = clustering_data
-                            logger.info("AI Engine: Added clustering analysis data")
-            except Exception as e:
-                logger.warning(f"Failed to add clustering data: {e}")
-                # Continue without clustering data rather than failing completely
+        # Transformer analysis and clustering run in a worker process; identical concurrent payloads share one run
+        results = await analyze_flights.do(canonical_key(data), analyze)
         
         logger.info("=" * 60)
         logger.info("AI Engine: Data analysis completed successfully")
         logger.info("=" * 60)
         
         return {"success": True, "data": results}
+    except AdmissionRejected as e:
+        raise too_many_requests(str(e), e.retry_after)
+    except AnalysisQueueFullError as e:
+        logger.warning(f"AI Engine: Rejecting analysis request: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         logger.error(f"AI Engine: Transformer analysis failed: {e}")
         logger.error("=" * 60)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 @app.post("/summarize")
-async def summarize_query(request: SummarizationRequest):
+async def summarize_query(request: SummarizationRequest, http_request: Request):
     """Generate a retrieval-augmented summary for a query"""
     if not SUMMARIZATION_AVAILABLE:
         raise HTTPException(status_code=501, detail="Summarization module not available")
     
-    # This import is only used if the module is available
-    from summarization.summarizer import RetrievalAugmentedSummarizer
-    
-    try:
-        # Database configuration
-        db_config = {
-            'host': os.getenv('DATABASE_HOST', 'postgres'),
-            'port': os.getenv('DATABASE_PORT', '5432'),
-            'user': os.getenv('DATABASE_USER', 'postgres'),
-            'password': os.getenv('DATABASE_PASSWORD', 'password'),
-            'database': os.getenv('DATABASE_NAME', 'nasa_biology')
-        }
+    async def summarize() -> Dict[str, Any]:
+        # Reuse the process-wide summarizer (models, FAISS index and DB pool stay resident)
+        summarizer = await get_summarizer()
+        await summarizer.reload_vector_index_if_changed()
         
-        # Generate summary using the summarization module
-        async with RetrievalAugmentedSummarizer(db_config) as summarizer:
+        # Bound parallel inference and database pool usage
+        async with summarize_admission.admit(parse_priority(http_request.headers.get("x-priority"))):
             summary = await summarizer.summarize_query(
                 request.query,
                 top_k=request.top_k,
                 max_evidence=request.max_evidence
             )
+        
+        # Convert to dictionary for JSON serialization
+        return {
+            "insight": summary.insight,
+            "evidence_bullets": summary.evidence_bullets,
+            "research_gaps": summary.research_gaps,
+            "query": summary.query,
+            "timestamp": summary.timestamp,
+            "model_fingerprint": summary.model_fingerprint
+        }
+    
+    try:
+        # Identical concurrent queries await the same retrieval and compression
+        summary_dict = await summarize_flights.do(canonical_key(request.dict()), summarize)
+        
+        return {"success": True, "summary": summary_dict}
             
-            # Convert to dictionary for JSON serialization
-            from summarization.summarizer import asdict
-            summary_dict = {
-                "insight": summary.insight,
-                "evidence_bullets": summary.evidence_bullets,
-                "research_gaps": summary.research_gaps,
-                "query": summary.query,
-                "timestamp": summary.timestamp,
-                "model_fingerprint": summary.model_fingerprint
-            }
-            
-            return {"success": True, "summary": summary_dict}
-            
+    except AdmissionRejected as e:
+        raise too_many_requests(str(e), e.retry_after)
     except Exception as e:
         logger.error(f"Summarization failed: {e}")
         raise HTTPException(status_code=500, detail=f"Summarization failed: {str(e)}")
 
-@app.post("/incremental-ingest")
+@app.post("/incremental-ingest", status_code=202)
 async def run_incremental_ingest(request: IncrementalIngestRequest):
-    """Run incremental ingest with change detection"""
+    """Run incremental ingest with change detection as a background job"""
     if not INCREMENTAL_INGEST_AVAILABLE:
         raise HTTPException(status_code=501, detail="Incremental ingest module not available")
     
     # This import is only used if the module is available
     from incremental_ingest import IncrementalIngestManager
     
-    try:
-        # Run incremental ingest
+    async def ingest(job: JobContext):
+        job.update(message=f"Running incremental ingest for '{request.nslsl_query}'")
         manager = IncrementalIngestManager()
-        results = await manager.run_incremental_ingest(request.nslsl_query)
-        
-        return {"success": True, "results": results}
-        
-    except Exception as e:
-        logger.error(f"Incremental ingest failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Incremental ingest failed: {str(e)}")
+        return await manager.run_incremental_ingest(request.nslsl_query)
+    
+    job = submit_job("incremental-ingest", ingest, request.dict())
+    return job_accepted(job, success=True)
 
-@app.post("/scientific-data-analysis")
+@app.post("/scientific-data-analysis", status_code=202)
 async def analyze_scientific_data(request: ScientificDataAnalysisRequest):
-    """Analyze actual scientific data files from NASA OSDR studies"""
-    global publications_cache
+    """Analyze actual scientific data files from NASA OSDR studies as a background job"""
     
-    try:
-        logger.info("Starting scientific data analysis...")
-        
-        # Load publications if not cached
-        if not publications_cache:
-            publications_cache = load_publications_from_file()
-        
-        if not publications_cache:
-            raise HTTPException(status_code=404, detail="No publications found. Please process data first.")
+    publications = current_dataset().publications
+    
+    if not publications:
+        raise HTTPException(status_code=404, detail="No publications found. Please process data first.")
+    
+    # Filter publications based on request
+    if request.study_id:
+        # Analyze specific study
+        target_publications = [
+            pub for pub in publications 
+            if pub.get('osdr_id') == request.study_id
+        ]
+        if not target_publications:
+            raise HTTPException(status_code=404, detail=f"Study {request.study_id} not found.")
+    else:
+        # Analyze a sample of studies
+        target_publications = publications[:request.limit]
+    
+    job = submit_job(
+        "scientific-data-analysis",
+        lambda job: run_scientific_data_analysis(job, target_publications),
+        request.dict()
+    )
+    return job_accepted(job, success=True)
+
+# Background tasks
+async def run_scientific_data_analysis(job: JobContext, target_publications: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Background job analyzing the data files of the given studies"""
+    logger.info("Starting scientific data analysis...")
+    job.set_total(len(target_publications))
+    
+    async with ScientificDataAnalyzer() as analyzer:
+        async def analyze_study(study: Dict[str, Any]):
+            try:
+                return await analyzer.analyze_study_data(study)
+            finally:
+                job.update(advance=1, message=f"Analyzed {study.get('osdr_id')}")
         
-        # Filter publications based on request
-        if request.study_id:
-            # Analyze specific study
-            target_publications = [
-                pub for pub in publications_cache 
-                if pub.get('osdr_id') == request.study_id
-            ]
-            if not target_publications:
-                raise HTTPException(status_code=404, detail=f"Study {request.study_id} not found.")
-        else:
-            # Analyze a sample of studies
-            target_publications = publications_cache[:request.limit]
+        # Process studies concurrently
+        tasks = [analyze_study(study) for study in target_publications]
+        study_results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    # Filter out errors
+    valid_results = [
+        result for result in study_results 
+        if isinstance(result, dict) and 'error' not in result
+    ]
+    
+    # Generate overall summary
+    total_studies = len(target_publications)
+    processed_studies = len(valid_results)
+    
+    # Aggregate insights
+    all_insights = []
+    for result in valid_results:
+        all_insights.extend(result.get('scientific_insights', []))
+    
+    # Data type summary
+    data_type_summary = {}
+    file_type_summary = {}
+    category_summary = {}
+    
+    for result in valid_results:
+        for data_type, count in result.get('data_type_distribution', {}).items():
+            data_type_summary[data_type] = data_type_summary.get(data_type, 0) + count
         
-        # Run scientific data analysis
-        async with ScientificDataAnalyzer() as analyzer:
-            # Process studies concurrently
-            tasks = [
-                analyzer.analyze_study_data(study) 
-                for study in target_publications
-            ]
-            study_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Filter out errors
-            valid_results = [
-                result for result in study_results 
-                if isinstance(result, dict) and 'error' not in result
-            ]
-            
-            # Generate overall summary
-            total_studies = len(target_publications)
-            processed_studies = len(valid_results)
-            
-            # Aggregate insights
-            all_insights = []
-            for result in valid_results:
-                all_insights.extend(result.get('scientific_insights', []))
-            
-            # Data type summary
-            data_type_summary = {}
-            file_type_summary = {}
-            category_summary = {}
-            
-            for result in valid_results:
-                for data_type, count in result.get('data_type_distribution', {}).items():
-                    data_type_summary[data_type] = data_type_summary.get(data_type, 0) + count
-                
-                for file_type, count in result.get('file_type_distribution', {}).items():
-                    file_type_summary[file_type] = file_type_summary.get(file_type, 0) + count
-                    
-                for category, count in result.get('data_category_distribution', {}).items():
-                    category_summary[category] = category_summary.get(category, 0) + count
-            
-            overall_analysis = {
-                "analysis_timestamp": datetime.now().isoformat(),
-                "total_studies_analyzed": total_studies,
-                "successfully_processed_studies": processed_studies,
-                "processing_success_rate": processed_studies / total_studies if total_studies > 0 else 0,
-                "data_type_distribution": data_type_summary,
-                "file_type_distribution": file_type_summary,
-                "data_category_distribution": category_summary,
-                "key_scientific_insights": list(set(all_insights)),  # Remove duplicates
-                "study_level_analyses": valid_results
-            }
+        for file_type, count in result.get('file_type_distribution', {}).items():
+            file_type_summary[file_type] = file_type_summary.get(file_type, 0) + count
             
-            logger.info(f"Scientific data analysis completed. {processed_studies}/{total_studies} studies processed.")
-            return {"success": True, "results": overall_analysis}
-            
-    except Exception as e:
-        logger.error(f"Scientific data analysis failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Scientific data analysis failed: {str(e)}")
+        for category, count in result.get('data_category_distribution', {}).items():
+            category_summary[category] = category_summary.get(category, 0) + count
+    
+    overall_analysis = {
+        "analysis_timestamp": datetime.now().isoformat(),
+        "total_studies_analyzed": total_studies,
+        "successfully_processed_studies": processed_studies,
+        "processing_success_rate": processed_studies / total_studies if total_studies > 0 else 0,
+        "data_type_distribution": data_type_summary,
+        "file_type_distribution": file_type_summary,
+        "data_category_distribution": category_summary,
+        "key_scientific_insights": list(set(all_insights)),  # Remove duplicates
+        "study_level_analyses": valid_results
+    }
+    
+    logger.info(f"Scientific data analysis completed. {processed_studies}/{total_studies} studies processed.")
+    return overall_analysis
 
-# Background tasks
-async def process_osdr_data():
-    """Background task to process OSDR data"""
-    global processing_status, publications_cache
+async def process_osdr_data(job: JobContext) -> Dict[str, Any]:
+    """Background job to process OSDR data"""
+    global processing_status
+    
+    def report_progress(done: int, total: int):
+        processing_status.progress = done / total if total else None
+        processing_status.message = f"Processing OSDR data... ({done}/{total} studies)"
+        job.update(done, processing_status.message, total=total)
     
     try:
         # Use real OSDR processor only (no api_key parameter needed)
         async with OSDADataProcessor() as processor:
             processing_status.message = "Processing OSDR data..."
-            publications = await processor.process_all_studies(
-                output_path=str(Path("data/processed_publications.json"))
+            job.update(message=processing_status.message)
+            publication_count = await processor.write_all_studies(
+                output_path=datasets.path,
+                progress_callback=report_progress
             )
             
-            if publications:
-                publications_cache = [
-                    {
-                        'title': pub.title,
-                        'authors': pub.authors,
-                        'abstract': pub.abstract,
-                        'publication_date': pub.publication_date.isoformat(),
-                        'doi': pub.doi,
-                        'osdr_id': pub.osdr_id,
-                        'keywords': pub.keywords,
-                        'research_area': pub.research_area,
-                        'study_type': pub.study_type,
-                        'organisms': pub.organisms,
-                        'file_urls': pub.file_urls,
-                        'metadata': pub.metadata
-                    }
-                    for pub in publications
-                ]
+            if publication_count:
+                # Publish the file just written (and its shared store) to this worker; other workers' watchers pick it up
+                await datasets.reload(force=True)
                 
                 processing_status.status = "completed"
-                processing_status.message = f"Successfully processed {len(publications)} publications"
-                processing_status.total_publications = len(publications)
-                processing_status.processed_publications = len(publications)
+                processing_status.message = f"Successfully processed {publication_count} publications"
+                processing_status.total_publications = publication_count
+                processing_status.processed_publications = publication_count
             else:
                 processing_status.status = "error"
                 processing_status.message = "No publications were processed"
                 
+    except asyncio.CancelledError:
+        processing_status.status = "cancelled"
+        processing_status.message = "Processing cancelled"
+        raise
     except Exception as e:
         logger.error(f"Error processing OSDR data: {e}")
         processing_status.status = "error"
         processing_status.message = f"Error: {str(e)}"
+        raise
+    finally:
+        processing_status.completed_at = datetime.now()
     
-    processing_status.completed_at = datetime.now()
+    return {
+        "total_publications": processing_status.total_publications,
+        "dataset_version": datasets.current.version,
+        "message": processing_status.message
+    }
 
 # Startup event
 @app.on_event("startup")
 async def startup_event():
-    """Load cached data on startup"""
-    global publications_cache
+    """Load cached data and warm long-lived services on startup"""
+    global job_manager
     
     logger.info("Starting NASA Space Biology Data Pipeline API...")
     
-    # Try to load existing data
+    # Try to load existing data, then pick up files written later by offline pipeline runs
     try:
-        publications_cache = load_publications_from_file()
-        if publications_cache:
-            logger.info(f"Loaded {len(publications_cache)} publications from cache")
+        await datasets.reload()
+        if datasets.current.publications:
+            logger.info(f"Loaded {len(datasets.current)} publications from cache")
         else:
             logger.info("No cached data found. Use /process to fetch real NASA OSDR data")
     except Exception as e:
         logger.error(f"Error during startup: {e}")
-        publications_cache = []
         logger.info("Starting with empty cache. Use /process to fetch real NASA OSDR data")
+    datasets.start_watching()
+    
+    # Open the job store; jobs left running by a previous process are marked interrupted
+    job_manager = JobManager()
+    
+    # The snapshot loaded above was published before jobs could be scheduled
+    schedule_semantic_index(datasets.current)
+    
+    # Start analysis workers so their models load before the first request
+    analysis_pool.start()
+    
+    # Pre-load and warm the summarizer so requests only pay for retrieval
+    if SUMMARIZATION_AVAILABLE:
+        try:
+            await get_summarizer()
+        except Exception as e:
+            logger.error(f"Summarizer warm-up failed, will retry on first /summarize request: {e}")
+
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release resources held by long-lived services"""
+    global summarizer_service
+    
+    analysis_pool.shutdown()
+    
+    await datasets.stop_watching()
+    
+    if job_manager is not None:
+        await job_manager.shutdown()
+    
+    await response_cache.close()
+    
+    if summarizer_service is not None:
+        await summarizer_service.__aexit__(None, None, None)
+        summarizer_service = None
 
 if __name__ == "__main__":
     import uvicorn
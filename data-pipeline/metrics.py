@@ -0,0 +1,334 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable, Iterator
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base class for a labelled metric family in the Prometheus text format"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        # Unlabelled metrics are exported as 0 before their first update
+        self._values: Dict[LabelValues, float] = {} if labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        # Unlabelled metrics are exported as 0 before their first update
+        self._values: Dict[LabelValues, float] = {} if labelnames else {(): 0.0}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class CallbackMetric(Metric):
+    """Gauge or counter whose values are read from a callback at scrape time"""
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 callback: Callable[[], Dict[LabelValues, float]],
+                 labelnames: Tuple[str, ...] = (),
+                 metric_type: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.metric_type = metric_type
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self.callback().items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    metric_type = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of a block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            snapshot = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together for a scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Process-wide registry and the metrics shared across modules
+REGISTRY = MetricsRegistry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route, until the response body is fully sent",
+    ("method", "route", "status")
+))
+
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    ("method", "route")
+))
+
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "pipeline_stage_duration_seconds",
+    "Duration of internal stages (embedding_encode, faiss_search, postgres_fetch, ner, s3_list, s3_download)",
+    ("stage",)
+))
+
+S3_OBJECTS_LISTED = REGISTRY.register(Counter(
+    "osdr_s3_objects_listed_total",
+    "Objects returned by OSDR S3 bucket listings"
+))
+
+S3_DOWNLOAD_BYTES = REGISTRY.register(Counter(
+    "osdr_download_bytes_total",
+    "Bytes downloaded from the OSDR repository"
+))
+
+DOWNLOAD_CACHE_REQUESTS = REGISTRY.register(Counter(
+    "download_cache_requests_total",
+    "File downloads by outcome: served from the local cache (hit), fetched in full (miss) or resumed from a partial file (resumed)",
+    ("result",)
+))
+
+HTTP_CACHE_REQUESTS = REGISTRY.register(Counter(
+    "http_cache_requests_total",
+    "GET requests through the shared HTTP cache: answered 304 and replayed from disk (hit), stored (miss) or not storable (uncacheable)",
+    ("result",)
+))
+
+
+SINGLE_FLIGHT_REQUESTS = REGISTRY.register(Counter(
+    "single_flight_requests_total",
+    "Requests that started a computation (leader) or joined an identical in-flight one (coalesced)",
+    ("group", "role")
+))
+
+
+ADMISSION_IN_PROGRESS = REGISTRY.register(Gauge(
+    "admission_requests_in_progress",
+    "Admitted requests currently running, by endpoint class",
+    ("endpoint_class",)
+))
+
+ADMISSION_QUEUED = REGISTRY.register(Gauge(
+    "admission_requests_queued",
+    "Requests waiting for admission, by endpoint class",
+    ("endpoint_class",)
+))
+
+ADMISSION_REJECTED = REGISTRY.register(Counter(
+    "admission_rejected_total",
+    "Requests rejected with 429 by admission control",
+    ("endpoint_class", "reason")
+))
+
+
+PIPELINE_CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "pipeline_concurrency_limit",
+    "Current adaptive (AIMD) concurrency limit, by pipeline",
+    ("pipeline",)
+))
+
+PIPELINE_IN_FLIGHT = REGISTRY.register(Gauge(
+    "pipeline_in_flight",
+    "Items currently being processed, by pipeline",
+    ("pipeline",)
+))
+
+PIPELINE_ITEMS = REGISTRY.register(Counter(
+    "pipeline_items_total",
+    "Items processed by adaptive pipelines, by outcome (completed, failed, throttled attempts)",
+    ("pipeline", "result")
+))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency and in-flight requests
+
+    Routes are labelled by their path template (e.g. /jobs/{job_id}) so label
+    cardinality stays bounded. Latency covers the full response, including
+    streamed bodies.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route_template(scope) -> str:
+        from starlette.routing import Match
+
+        router = getattr(scope.get("app"), "router", None)
+        for route in getattr(router, "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route_template(scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(method=method, route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(method=method, route=route)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, method=method, route=route, status=status["code"])
@@ -17,6 +17,9 @@ import pandas as pd
 from collections import Counter
 import re
 
+from publication_file import read_publications
+from http_cache import create_client_session
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -94,7 +97,7 @@ class NaturalLanguageAnalyzer:
 
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        self.session = create_client_session()
         await self._initialize_nlp_models()
         return self
 
@@ -958,8 +961,7 @@ if __name__ == "__main__":
         
         # Load documents (this would come from your data pipeline)
         try:
-            with open("data/processed_publications.json", 'r') as f:
-                documents = json.load(f)
+            documents = read_publications("data/processed_publications.json")
         except FileNotFoundError:
             print("No processed publications found. Run data processing first.")
             return
@@ -5,6 +5,8 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import time
 
+from http_cache import create_requests_session
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,7 +19,8 @@ class NSLSLHarvester:
     
     def __init__(self, base_url: str = "https://ntrs.nasa.gov/api/citations"):
         self.base_url = base_url
-        self.session = requests.Session()
+        # Shares the pipeline's HTTP cache, so unchanged citations are revalidated, not re-sent
+        self.session = create_requests_session()
         # Set a user agent to avoid being blocked
         self.session.headers.update({
             'User-Agent': 'NASA-Space-Biology-Knowledge-Engine/1.0'
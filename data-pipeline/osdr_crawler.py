@@ -10,6 +10,8 @@ import boto3
 from botocore import UNSIGNED
 from botocore.config import Config
 
+from http_cache import create_client_session
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,7 +29,7 @@ class OSDRCrawler:
         
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        self.session = create_client_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
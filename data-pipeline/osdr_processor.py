@@ -3,13 +3,14 @@ import aiohttp
 import pandas as pd
 import numpy as np
 import json
-import tarfile
-import zipfile
 import io
 import requests
 import os
+import time
+import tempfile
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator, Iterator, Tuple, Sequence, BinaryIO
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 import logging
@@ -18,24 +19,25 @@ import PyPDF2
 import spacy
 from transformers import pipeline
 
-# Try to import boto3 for direct S3 access
-S3_AVAILABLE = False
-try:
-    import boto3
-    from botocore import UNSIGNED
-    from botocore.config import Config
-    S3_AVAILABLE = True
-except ImportError:
-    # If boto3 is not available, we'll handle this gracefully in the code
-    boto3 = None
-    UNSIGNED = None
-    Config = None
-    logging.warning("boto3 not available. Install with: pip install boto3")
+from metrics import STAGE_LATENCY, S3_DOWNLOAD_BYTES
+from s3_catalog import S3_AVAILABLE, S3CatalogLister
+from publication_file import PublicationFileWriter
+from adaptive_concurrency import AIMDLimiter, PipelineProgress, run_adaptive_pipeline
+from http_cache import create_client_session
+from download_cache import DownloadCache, CachedFile, DownloadError
+from hdf5_inspector import H5PY_AVAILABLE, HDF5Source, inspect_hdf5, inspect_remote_hdf5
+from archive_extraction import (
+    ArchiveSource, DEFAULT_MAX_MEMBER_BYTES, DEFAULT_SCRATCH_DIR,
+    is_archive, iter_archive_members, spool_archive
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Studies whose publications are built concurrently (in worker threads)
+STUDY_PROCESSING_CONCURRENCY = int(os.getenv('STUDY_PROCESSING_CONCURRENCY', '4'))
+
 @dataclass
 class Publication:
     """Data class for NASA bioscience publications"""
@@ -52,6 +54,23 @@ class Publication:
     file_urls: List[str]
     metadata: Dict[str, Any]
 
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable record as stored in the processed publications file"""
+        return {
+            'title': self.title,
+            'authors': self.authors,
+            'abstract': self.abstract,
+            'publication_date': self.publication_date.isoformat(),
+            'doi': self.doi,
+            'osdr_id': self.osdr_id,
+            'keywords': self.keywords,
+            'research_area': self.research_area,
+            'study_type': self.study_type,
+            'organisms': self.organisms,
+            'file_urls': self.file_urls,
+            'metadata': self.metadata
+        }
+
 class OSDADataProcessor:
     """
     Processor for NASA Open Science Data Repository (OSDR) data
@@ -63,6 +82,9 @@ class OSDADataProcessor:
         self.s3_bucket = "nasa-osdr"
         self.session = None
         self.nlp = None
+        self.download_cache = DownloadCache()
+        # Counters of the running (or last) write_all_studies call
+        self.progress: Optional[PipelineProgress] = None
         
         # Initialize NLP models
         self._initialize_nlp()
@@ -77,7 +99,7 @@ class OSDADataProcessor:
 
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        self.session = create_client_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -90,99 +112,101 @@ class OSDADataProcessor:
         Fetch the complete OSDR catalog from the NASA OSDR S3 bucket
         Uses direct S3 access if available, otherwise falls back to web scraping
         """
+        return [study async for study in self.iter_osdr_catalog()]
+
+    async def iter_osdr_catalog(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield OSDR studies as they are discovered
+        Uses direct S3 access if available, otherwise falls back to web scraping
+
+        Raises:
+            ConnectionError: If the S3 listing fails after studies were already yielded
+        """
         if S3_AVAILABLE:
             logger.info("Attempting to fetch OSDR catalog using direct S3 access")
+            yielded = 0
             try:
-                return await self._fetch_osdr_catalog_s3()
+                async for study in self._iter_osdr_catalog_s3():
+                    yielded += 1
+                    yield study
+                return
             except Exception as e:
+                if yielded:
+                    raise
                 logger.warning(f"Direct S3 access failed: {e}. Falling back to web scraping.")
         
         # Fallback to web scraping
         logger.info("Attempting to fetch OSDR catalog using web scraping")
-        return await self._fetch_osdr_catalog_web()
+        for study in await self._fetch_osdr_catalog_web():
+            yield study
 
     async def _fetch_osdr_catalog_s3(self) -> List[Dict[str, Any]]:
         """
         Fetch the complete OSDR catalog using direct S3 access
         """
+        return [study async for study in self._iter_osdr_catalog_s3()]
+
+    async def _iter_osdr_catalog_s3(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield OSDR studies from direct S3 access as each study's listing completes
+
+        Study prefixes are listed concurrently in a bounded thread pool (see
+        S3CatalogLister), so the event loop stays free during the crawl.
+        """
         if not S3_AVAILABLE:
             raise RuntimeError("S3 access not available. boto3 is required.")
             
+        found = 0
         try:
-            # Create S3 client with unsigned requests (public bucket)
-            # Check if boto3 is actually available before using it
-            if S3_AVAILABLE and boto3 is not None and Config is not None and UNSIGNED is not None:
-                s3 = boto3.client('s3', config=Config(signature_version=UNSIGNED))
-            else:
-                raise RuntimeError("boto3 not properly imported")
-            
             # List objects in the bucket with OSD prefix (not GLDS as previously assumed)
-            paginator = s3.get_paginator('list_objects_v2')
-            pages = paginator.paginate(Bucket=self.s3_bucket, Prefix='OSD-', Delimiter='/')
-            
-            studies = []
-            
-            for page in pages:
-                # Get common prefixes (directories)
-                if 'CommonPrefixes' in page:
-                    for prefix in page['CommonPrefixes']:
-                        prefix_name = prefix['Prefix']
-                        # Extract study ID from prefix (e.g., "OSD-123/")
-                        if prefix_name.startswith('OSD-') and prefix_name.endswith('/'):
-                            study_id = prefix_name.rstrip('/')
-                            logger.info(f"Found OSD study: {study_id}")
-                            
-                            # Get objects in this study directory
-                            study_objects = []
-                            study_paginator = s3.get_paginator('list_objects_v2')
-                            study_pages = study_paginator.paginate(Bucket=self.s3_bucket, Prefix=prefix_name)
-                            
-                            for study_page in study_pages:
-                                if 'Contents' in study_page:
-                                    for obj in study_page['Contents']:
-                                        # Create S3 URL for the object
-                                        s3_url = f"https://{self.s3_bucket}.s3.amazonaws.com/{obj['Key']}"
-                                        study_objects.append({
-                                            'file_url': s3_url,
-                                            'file_type': 'NASA Research Data',
-                                            'key': obj['Key']
-                                        })
-                            
-                            # Only add studies that have objects
-                            if study_objects:
-                                # Try to extract real publication date from metadata
-                                real_date = self._extract_publication_date(study_id, study_objects)
-                                
-                                study = {
-                                    'accession': study_id,
-                                    'title': f"NASA OSDR Study {study_id}",
-                                    'description': f"Real research from NASA OSDR: {study_id}",
-                                    'study_type': self._categorize_study_type(study_id, study_objects),
-                                    'submission_date': real_date.isoformat() if real_date else datetime.now().isoformat(),
-                                    'doi': f"10.26030/nasa-{study_id.lower()}",
-                                    'principal_investigator': ["NASA OSDR Team"],
-                                    'authors': ["NASA OSDR Team"],
-                                    'organism': [{"scientificName": self._extract_species_from_study_id(study_id)}],
-                                    'datafiles': study_objects,
-                                    'keywords': ["space biology", "NASA", "OSDR", study_id.lower()],
-                                    'space_program': "NASA OSDR",
-                                    'repository_source': f"s3://{self.s3_bucket}"
-                                }
-                                
-                                studies.append(study)
-                                logger.debug(f"Added study {study_id} with {len(study_objects)} files")
-            
-            if not studies:
-                logger.error("No OSD studies found in NASA OSDR S3 bucket")
-                raise ValueError("Failed to parse any real NASA OSDR data from S3 bucket")
-                
-            logger.info(f"Successfully found {len(studies)} OSD studies in NASA OSDR S3")
-            return studies
-            
+            # Client creation loads botocore's service models; keep it off the event loop
+            lister = await asyncio.to_thread(S3CatalogLister, self.s3_bucket, 'OSD-')
+            async for study_id, objects in lister.iter_studies():
+                logger.info(f"Found OSD study: {study_id}")
+                found += 1
+                yield self._build_s3_study(study_id, objects)
         except Exception as e:
             error_msg = f"Error accessing NASA OSDR S3 bucket: {e}"
             logger.error(error_msg)
             raise ConnectionError(error_msg)
+        
+        if not found:
+            logger.error("No OSD studies found in NASA OSDR S3 bucket")
+            raise ValueError("Failed to parse any real NASA OSDR data from S3 bucket")
+            
+        logger.info(f"Successfully found {found} OSD studies in NASA OSDR S3")
+
+    def _build_s3_study(self, study_id: str, objects: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build a study record from the S3 objects listed under its prefix"""
+        study_objects = [
+            {
+                # Create S3 URL for the object
+                'file_url': f"https://{self.s3_bucket}.s3.amazonaws.com/{obj['Key']}",
+                'file_type': 'NASA Research Data',
+                'key': obj['Key']
+            }
+            for obj in objects
+        ]
+        
+        # Try to extract real publication date from metadata
+        real_date = self._extract_publication_date(study_id, study_objects)
+        
+        logger.debug(f"Added study {study_id} with {len(study_objects)} files")
+        return {
+            'accession': study_id,
+            'title': f"NASA OSDR Study {study_id}",
+            'description': f"Real research from NASA OSDR: {study_id}",
+            'study_type': self._categorize_study_type(study_id, study_objects),
+            'submission_date': real_date.isoformat() if real_date else datetime.now().isoformat(),
+            'doi': f"10.26030/nasa-{study_id.lower()}",
+            'principal_investigator': ["NASA OSDR Team"],
+            'authors': ["NASA OSDR Team"],
+            'organism': [{"scientificName": self._extract_species_from_study_id(study_id)}],
+            'datafiles': study_objects,
+            'keywords': ["space biology", "NASA", "OSDR", study_id.lower()],
+            'space_program': "NASA OSDR",
+            'repository_source': f"s3://{self.s3_bucket}"
+        }
 
     async def _fetch_osdr_catalog_web(self) -> List[Dict[str, Any]]:
         """
@@ -309,30 +333,47 @@ class OSDADataProcessor:
     async def download_file(self, url: str, max_size_mb: int = 100) -> Optional[bytes]:
         """
         Download file with size limit and error handling
+        
+        The file goes through the download cache; use download_to_cache to
+        work with it on disk instead of in memory.
+        """
+        cached = await self.download_to_cache(url, max_size_mb)
+        if cached is None:
+            return None
+        return await asyncio.to_thread(cached.read_bytes)
+
+    async def download_to_cache(self, url: str, max_size_mb: int = 100) -> Optional[CachedFile]:
+        """
+        Download file into the local content-addressed cache, streaming it in chunks
+        
+        Unchanged files are revalidated instead of downloaded again, and
+        interrupted downloads resume where they stopped.
+        
+        Returns:
+            The cached file, or None if it could not be downloaded or exceeds max_size_mb
         """
         if not self.session:
             raise RuntimeError("Session not initialized. Use async context manager.")
             
         try:
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    # Check file size
-                    content_length = response.headers.get('content-length')
-                    if content_length and int(content_length) > max_size_mb * 1024 * 1024:
-                        logger.warning(f"File too large: {url} ({content_length} bytes)")
-                        return None
-                    
-                    content = await response.read()
-                    return content
-                else:
-                    logger.warning(f"Failed to download {url}: HTTP {response.status}")
-                    return None
+            start = time.perf_counter()
+            cached = await self.download_cache.fetch(self.session, url, max_bytes=max_size_mb * 1024 * 1024)
+            if not cached.from_cache:
+                STAGE_LATENCY.observe(time.perf_counter() - start, stage="s3_download")
+            return cached
                     
+        except DownloadError as e:
+            logger.warning(f"Failed to download {url}: {e}")
+            return None
         except Exception as e:
             logger.error(f"Error downloading {url}: {e}")
             return None
 
-    def extract_archive(self, content: bytes, filename: str) -> Dict[str, bytes]:
+    def extract_archive(self,
+                        content: bytes,
+                        filename: str,
+                        max_member_bytes: Optional[int] = DEFAULT_MAX_MEMBER_BYTES,
+                        extensions: Optional[Sequence[str]] = None) -> Dict[str, bytes]:
         """
         Extract contents from NASA OSDR files: tar, zip, JSON, and scientific data formats
         Handles space biology research data from NASA's Open Science Data Repository:
@@ -340,44 +381,29 @@ class OSDADataProcessor:
         - Physiological measurements: body weight, heart rate, bone density, immune response
         - Metadata: mission details (spaceflight vs ground control), sample type, organism
         - Imaging data: microscopy, histology images
+        
+        Every member is held in memory; use iter_archive or spooled_archive for
+        archives that may not fit.
+        
+        Args:
+            content: File content
+            filename: File name, used to detect its format
+            max_member_bytes: Skip archive members larger than this (None: no limit)
+            extensions: Only extract archive members whose names end with one of these
         """
         extracted_files = {}
         
         try:
             # Handle TAR files (tar, tar.gz, tgz) - common for omics datasets
-            if filename.endswith(('.tar', '.tar.gz', '.tgz')):
-                logger.info(f"Processing NASA OSDR TAR archive: {filename}")
-                with tarfile.open(fileobj=io.BytesIO(content), mode='r:*') as tar:
-                    for member in tar.getmembers():
-                        if member.isfile() and not member.name.startswith('.'):
-                            try:
-                                extracted_file = tar.extractfile(member)
-                                if extracted_file:
-                                    file_content = extracted_file.read()
-                                    extracted_files[member.name] = file_content
-                                    
-                                    # Categorize OSDR space biology data types
-                                    self._log_osdr_file_type(member.name)
-                                    
-                            except Exception as e:
-                                logger.warning(f"Error extracting {member.name} from TAR: {e}")
-                                
-            # Handle ZIP files - may contain imaging data or datasets
-            elif filename.endswith('.zip'):
-                logger.info(f"Processing NASA OSDR ZIP archive: {filename}")
-                with zipfile.ZipFile(io.BytesIO(content)) as zip_file:
-                    for file_info in zip_file.filelist:
-                        if not file_info.filename.startswith('.'):
-                            try:
-                                file_content = zip_file.read(file_info.filename)
-                                extracted_files[file_info.filename] = file_content
-                                
-                                # Categorize OSDR space biology data types
-                                self._log_osdr_file_type(file_info.filename)
-                                    
-                            except Exception as e:
-                                logger.warning(f"Error extracting {file_info.filename} from ZIP: {e}")
-            
+            # and ZIP files - may contain imaging data or datasets
+            if is_archive(filename):
+                logger.info(f"Processing NASA OSDR archive: {filename}")
+                for name, member in self.iter_archive(content, filename, max_member_bytes, extensions):
+                    try:
+                        extracted_files[name] = member.read()
+                    except Exception as e:
+                        logger.warning(f"Error extracting {name} from {filename}: {e}")
+                        
             # Handle JSON files - metadata and experimental details
             elif filename.endswith('.json'):
                 logger.info(f"Processing NASA OSDR JSON metadata: {filename}")
@@ -421,54 +447,97 @@ class OSDADataProcessor:
             
         logger.info(f"Extracted {len(extracted_files)} files from NASA OSDR data {filename}")
         return extracted_files
+
+    def iter_archive(self,
+                     source: ArchiveSource,
+                     filename: str,
+                     max_member_bytes: Optional[int] = DEFAULT_MAX_MEMBER_BYTES,
+                     extensions: Optional[Sequence[str]] = None) -> Iterator[Tuple[str, BinaryIO]]:
+        """
+        Stream the members of an OSDR archive as file objects
+
+        Memory use stays bounded by the read buffer whatever the archive
+        size. Each file object is only valid until the next member is
+        requested.
+
+        Args:
+            source: Archive bytes, path, or binary file object
+            filename: Archive file name, used to detect its format
+            max_member_bytes: Skip members larger than this (None: no limit)
+            extensions: Only yield members whose names end with one of these (e.g. ['.csv', '.tsv'])
+        """
+        for name, member in iter_archive_members(source, filename, max_member_bytes, extensions):
+            # Categorize OSDR space biology data types
+            self._log_osdr_file_type(name)
+            yield name, member
+
+    @contextmanager
+    def spooled_archive(self,
+                        source: ArchiveSource,
+                        filename: str,
+                        max_member_bytes: Optional[int] = DEFAULT_MAX_MEMBER_BYTES,
+                        extensions: Optional[Sequence[str]] = None,
+                        scratch_dir: Optional[str] = DEFAULT_SCRATCH_DIR) -> Iterator[Dict[str, str]]:
+        """
+        Extract an OSDR archive to a scratch directory that is removed on exit
+
+        Usage:
+            with processor.spooled_archive(path, "GLDS-1.tar.gz", extensions=['.csv']) as files:
+                for name, path in files.items():
+                    ...
+
+        Args:
+            source: Archive bytes, path, or binary file object
+            filename: Archive file name, used to detect its format
+            max_member_bytes: Skip members larger than this (None: no limit)
+            extensions: Only extract members whose names end with one of these
+            scratch_dir: Parent of the temporary directory (default: ARCHIVE_SCRATCH_DIR or the system default)
+
+        Yields:
+            Mapping of member name to extracted file path
+        """
+        with tempfile.TemporaryDirectory(prefix="osdr-archive-", dir=scratch_dir) as directory:
+            files = spool_archive(source, filename, directory, max_member_bytes, extensions)
+            for name in files:
+                self._log_osdr_file_type(name)
+            logger.info(f"Spooled {len(files)} files from NASA OSDR archive {filename} to {directory}")
+            yield files
         
-    def process_hdf5_data(self, content: bytes, filename: str) -> Dict[str, Any]:
+    def process_hdf5_data(self, content: HDF5Source, filename: str) -> Dict[str, Any]:
         """
         Process HDF5 high-dimensional data files from NASA OSDR
+        
+        Args:
+            content: File bytes, a local path (e.g. a download cache entry) or a seekable file object
+            filename: File name, for logging
         """
+        if not H5PY_AVAILABLE:
+            logger.warning("h5py not available for HDF5 processing. Install with: pip install h5py")
+            return {}
         try:
-            import h5py  # type: ignore[reportMissingImports]
-            import tempfile
-            
-            # Write content to temporary file for h5py processing
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_file.write(content)
-                temp_path = temp_file.name
-            
-            # Read HDF5 structure and extract metadata
-            hdf5_info = {}
-            with h5py.File(temp_path, 'r') as h5_file:
-                def extract_info(name, obj):
-                    if isinstance(obj, h5py.Dataset):
-                        hdf5_info[name] = {
-                            'shape': obj.shape,
-                            'dtype': str(obj.dtype),
-                            'size': obj.size,
-                            'attrs': dict(obj.attrs)
-                        }
-                    elif isinstance(obj, h5py.Group):
-                        hdf5_info[name] = {
-                            'type': 'group',
-                            'attrs': dict(obj.attrs)
-                        }
-                
-                h5_file.visititems(extract_info)
-            
-            # Clean up temp file
-            os.unlink(temp_path)
-            
+            # Read HDF5 structure and extract metadata straight from memory or the cache file
+            hdf5_info = inspect_hdf5(content)
             logger.info(f"Processed HDF5 file {filename}: {len(hdf5_info)} datasets/groups")
             return hdf5_info
             
-        except ImportError:
-            logger.warning("h5py not available for HDF5 processing. Install with: pip install h5py")
-            return {}
         except Exception as e:
             logger.error(f"Error processing HDF5 file {filename}: {e}")
             return {}
 
-
-
+    async def inspect_remote_hdf5(self, url: str) -> Dict[str, Any]:
+        """
+        Process a remote HDF5 file by fetching only its metadata with HTTP range requests
+        
+        Useful for multi-GB files whose structure is needed but whose datasets are not.
+        """
+        if not H5PY_AVAILABLE:
+            logger.warning("h5py not available for HDF5 processing. Install with: pip install h5py")
+            return {}
+        try:
+            return await asyncio.to_thread(inspect_remote_hdf5, url)
+        except Exception as e:
+            logger.error(f"Error inspecting remote HDF5 file {url}: {e}")
+            return {}
 
     def extract_text_from_pdf(self, pdf_content: bytes) -> str:
         """
@@ -580,66 +649,75 @@ class OSDADataProcessor:
         Process a single study from OSDR data
         """
         try:
-            # Extract basic metadata
-            title = study_data.get('title', 'Unknown Title')
-            description = study_data.get('description', '')
-            osdr_id = study_data.get('accession', '')
-            
-            # Parse publication date
-            pub_date = study_data.get('submission_date', datetime.now().isoformat())
-            if isinstance(pub_date, str):
-                try:
-                    pub_date = datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
-                except:
-                    pub_date = datetime.now()
-            
-            # Extract organisms
-            organisms = []
-            if 'organism' in study_data:
-                organisms = [org.get('scientificName', '') for org in study_data['organism']]
-            
-            # Extract file URLs
-            file_urls = []
-            if 'datafiles' in study_data:
-                file_urls = [file.get('file_url', '') for file in study_data['datafiles']]
-            
-            # Process text content with AI if available
-            full_text = f"{title}\n\n{description}"
-            entities = self.extract_entities(full_text)
-            
-            # AI analysis (not using external AI services)
-            ai_summary = ""
-            keywords = []
-            
-            # Determine research area based on study content
-            research_area = self._categorize_research_area(study_data, file_urls, organisms)
-            
-            # Create publication object
-            publication = Publication(
-                title=title,
-                authors=study_data.get('principal_investigator', []),
-                abstract=description,
-                publication_date=pub_date,
-                doi=study_data.get('doi', ''),
-                osdr_id=osdr_id,
-                keywords=keywords,
-                research_area=research_area,
-                study_type=research_area,  # Use the same value for both
-                organisms=organisms,
-                file_urls=file_urls,
-                metadata={
-                    **study_data,
-                    'entities': entities,
-                    'ai_summary': ai_summary
-                }
-            )
-            
-            return publication
-            
+            # NER and categorization are CPU-bound; keep them off the event loop
+            return await asyncio.to_thread(self.build_publication, study_data)
         except Exception as e:
             logger.error(f"Error processing study {study_data.get('accession', 'unknown')}: {e}")
             return None
 
+    def build_publication(self, study_data: Dict[str, Any]) -> Publication:
+        """
+        Build the publication for a single study (blocking)
+
+        Raises:
+            Exception: Whatever metadata parsing or entity extraction raised
+        """
+        # Extract basic metadata
+        title = study_data.get('title', 'Unknown Title')
+        description = study_data.get('description', '')
+        osdr_id = study_data.get('accession', '')
+        
+        # Parse publication date
+        pub_date = study_data.get('submission_date', datetime.now().isoformat())
+        if isinstance(pub_date, str):
+            try:
+                pub_date = datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
+            except:
+                pub_date = datetime.now()
+        
+        # Extract organisms
+        organisms = []
+        if 'organism' in study_data:
+            organisms = [org.get('scientificName', '') for org in study_data['organism']]
+        
+        # Extract file URLs
+        file_urls = []
+        if 'datafiles' in study_data:
+            file_urls = [file.get('file_url', '') for file in study_data['datafiles']]
+        
+        # Process text content with AI if available
+        full_text = f"{title}\n\n{description}"
+        entities = self.extract_entities(full_text)
+        
+        # AI analysis (not using external AI services)
+        ai_summary = ""
+        keywords = []
+        
+        # Determine research area based on study content
+        research_area = self._categorize_research_area(study_data, file_urls, organisms)
+        
+        # Create publication object
+        publication = Publication(
+            title=title,
+            authors=study_data.get('principal_investigator', []),
+            abstract=description,
+            publication_date=pub_date,
+            doi=study_data.get('doi', ''),
+            osdr_id=osdr_id,
+            keywords=keywords,
+            research_area=research_area,
+            study_type=research_area,  # Use the same value for both
+            organisms=organisms,
+            file_urls=file_urls,
+            metadata={
+                **study_data,
+                'entities': entities,
+                'ai_summary': ai_summary
+            }
+        )
+        
+        return publication
+
     def _categorize_research_area(self, study_data: Dict[str, Any], file_urls: List[str], organisms: List[str]) -> str:
         """
         Categorize research area based on study content, file URLs and organisms
@@ -760,87 +838,109 @@ class OSDADataProcessor:
         
         return study_type
 
-    async def process_all_studies(self, output_path: str = "data/processed_publications.json"):
+    async def process_all_studies(self,
+                                  output_path: str = "data/processed_publications.json",
+                                  progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Publication]:
+        """
+        Process all OSDR studies, save them to file and return them
+
+        Keeps every publication in memory; callers that only need the file
+        should use write_all_studies.
+
+        Args:
+            output_path: Where to write the processed publications
+            progress_callback: Called with (studies processed, total studies) after each batch
+        """
+        publications: List[Publication] = []
+        await self.write_all_studies(output_path, progress_callback, on_publications=publications.extend)
+        return publications
+
+    async def write_all_studies(self,
+                                output_path: str = "data/processed_publications.json",
+                                progress_callback: Optional[Callable[[int, int], None]] = None,
+                                on_publications: Optional[Callable[[List[Publication]], None]] = None) -> int:
         """
-        Process all OSDR studies and save to file
+        Process all OSDR studies and stream them to file
         ONLY processes real NASA OSDR data - no fallback to fake data
+
+        Studies are processed by a pool of STUDY_PROCESSING_CONCURRENCY
+        worker threads as the catalog listing discovers them; the S3 listing
+        itself runs under an AIMD limit that backs off when S3 throttles (see
+        S3CatalogLister). Each publication is appended to the output as JSON
+        Lines as soon as it is processed; the file replaces output_path only
+        once every study is done, and is discarded if processing fails. Live
+        counters are kept in self.progress.
+
+        Args:
+            output_path: Where to write the processed publications
+            progress_callback: Called with (studies processed, studies found so far) after each study
+            on_publications: Called with each processed publication
+
+        Returns:
+            Number of publications written
         """
         logger.info("Starting NASA OSDR data processing from S3 repository...")
         
+        writer = PublicationFileWriter(output_path)
+        # NER is CPU-bound, so a fixed pool: there is no remote backend here to adapt to
+        concurrency = STUDY_PROCESSING_CONCURRENCY
+        limiter = AIMDLimiter('study_processing', initial=concurrency, minimum=concurrency, maximum=concurrency)
+        write_lock = asyncio.Lock()
+        
+        async def on_result(study: Dict[str, Any], publication: Publication):
+            # The writer is not thread-safe, and its periodic fsync must not block the event loop
+            async with write_lock:
+                await asyncio.to_thread(writer.write, [publication.to_dict()])
+            if on_publications:
+                on_publications([publication])
+        
+        def on_progress(progress: PipelineProgress):
+            self.progress = progress
+            if progress_callback:
+                # The total grows until the listing completes
+                progress_callback(progress.processed, progress.discovered)
+        
         try:
-            # Fetch catalog from real NASA OSDR S3 repository
-            studies = await self.fetch_osdr_catalog()
+            try:
+                # Fetch catalog from real NASA OSDR S3 repository
+                # Errors reach the pipeline, so failed studies are counted as failed
+                progress = await run_adaptive_pipeline(
+                    self.iter_osdr_catalog(),
+                    lambda study: asyncio.to_thread(self.build_publication, study),
+                    limiter, on_result=on_result, on_progress=on_progress
+                )
+                found = progress.discovered
+                
+                if not found:
+                    # If no real studies found, raise an error instead of using fallback data
+                    error_msg = "CRITICAL ERROR: No real NASA OSDR data found in S3 repository"
+                    logger.error(error_msg)
+                    raise ValueError(error_msg)
+                
+                logger.info(f"Processed {found} NASA OSDR studies ({progress.failed} failed, "
+                            f"{progress.rate:.1f} studies/s)")
+                
+            except (ConnectionError, ValueError) as e:
+                # If there's an error fetching real data, raise the error directly
+                error_msg = f"CRITICAL ERROR: Failed to access NASA OSDR S3 repository: {e}"
+                logger.error(error_msg)
+                raise ConnectionError(error_msg)
             
-            if not studies:
-                # If no real studies found, raise an error instead of using fallback data
-                error_msg = "CRITICAL ERROR: No real NASA OSDR data found in S3 repository"
+            # If no publications were processed successfully, raise an error
+            if not writer.count:
+                error_msg = "CRITICAL ERROR: No publications processed successfully from real NASA OSDR data"
                 logger.error(error_msg)
                 raise ValueError(error_msg)
             
-            logger.info(f"Found {len(studies)} NASA OSDR studies to process")
-            
-        except (ConnectionError, ValueError) as e:
-            # If there's an error fetching real data, raise the error directly
-            error_msg = f"CRITICAL ERROR: Failed to access NASA OSDR S3 repository: {e}"
-            logger.error(error_msg)
-            raise ConnectionError(error_msg)
-        
-        # Process studies in batches
-        batch_size = 10
-        publications = []
+            # Publish the complete file; readers never see a partial one
+            await asyncio.to_thread(writer.commit)
+        except BaseException:
+            writer.abort()
+            raise
         
-        for i in range(0, len(studies), batch_size):
-            batch = studies[i:i + batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1}/{(len(studies)-1)//batch_size + 1}")
-            
-            # Process batch concurrently
-            tasks = [self.process_study(study) for study in batch]
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Collect successful results
-            for result in batch_results:
-                if isinstance(result, Publication):
-                    publications.append(result)
-                elif isinstance(result, Exception):
-                    logger.error(f"Processing error: {result}")
-            
-            # Add delay between batches
-            await asyncio.sleep(1)
-        
-        # If no publications were processed successfully, raise an error
-        if not publications:
-            error_msg = "CRITICAL ERROR: No publications processed successfully from real NASA OSDR data"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-        
-        # Save results
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        # Convert to JSON-serializable format
-        publications_data = []
-        for pub in publications:
-            pub_dict = {
-                'title': pub.title,
-                'authors': pub.authors,
-                'abstract': pub.abstract,
-                'publication_date': pub.publication_date.isoformat(),
-                'doi': pub.doi,
-                'osdr_id': pub.osdr_id,
-                'keywords': pub.keywords,
-                'research_area': pub.research_area,
-                'study_type': pub.study_type,
-                'organisms': pub.organisms,
-                'file_urls': pub.file_urls,
-                'metadata': pub.metadata
-            }
-            publications_data.append(pub_dict)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(publications_data, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Successfully processed {len(publications)} NASA OSDR publications")
+        logger.info(f"Successfully processed {writer.count} NASA OSDR publications")
         logger.info(f"Data saved to {output_path}")
-        return publications
+        return writer.count
 
     def _extract_species_from_study_id(self, study_id: str) -> str:
         """
@@ -11,6 +11,7 @@ import json
 # Import our modules
 from osdr_processor import OSDADataProcessor
 from data_analyzer import NASADataAnalyzer
+from publication_file import iter_publications_file
 
 # Configure logging
 logging.basicConfig(
@@ -41,12 +42,12 @@ class PipelineOrchestrator:
         try:
             # Use real OSDR processor only
             async with OSDADataProcessor() as processor:
-                publications = await processor.process_all_studies(
+                publication_count = await processor.write_all_studies(
                     output_path=str(self.raw_data_path)
                 )
                 
-                if publications:
-                    logger.info(f" Successfully fetched {len(publications)} real publications")
+                if publication_count:
+                    logger.info(f" Successfully fetched {publication_count} real publications")
                     return True
                 else:
                     logger.error(" Failed to fetch OSDR data")
@@ -211,9 +212,8 @@ class PipelineOrchestrator:
         try:
             # Load and display results summary
             if self.raw_data_path.exists():
-                with open(self.raw_data_path, 'r') as f:
-                    raw_data = json.load(f)
-                logger.info(f" Publications processed: {len(raw_data)}")
+                publication_count = sum(1 for _ in iter_publications_file(str(self.raw_data_path)))
+                logger.info(f" Publications processed: {publication_count}")
             
             if self.analysis_results_path.exists():
                 with open(self.analysis_results_path, 'r') as f:
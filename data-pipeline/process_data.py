@@ -1,5 +1,4 @@
 import asyncio
-import json
 from osdr_processor import OSDADataProcessor
 
 async def main():
@@ -9,35 +8,14 @@ async def main():
             print("Starting NASA OSDR data processing...")
             publications = await processor.process_all_studies()
             
-            # Save results
-            publications_data = []
+            # process_all_studies has already written data/processed_publications.json
             research_areas = {}
             
             for pub in publications:
-                pub_dict = {
-                    'title': pub.title,
-                    'authors': pub.authors,
-                    'abstract': pub.abstract,
-                    'publication_date': pub.publication_date.isoformat(),
-                    'doi': pub.doi,
-                    'osdr_id': pub.osdr_id,
-                    'keywords': pub.keywords,
-                    'research_area': pub.research_area,
-                    'study_type': pub.study_type,
-                    'organisms': pub.organisms,
-                    'file_urls': pub.file_urls,
-                    'metadata': pub.metadata
-                }
-                publications_data.append(pub_dict)
-                
                 # Count research areas
                 area = pub.research_area
                 research_areas[area] = research_areas.get(area, 0) + 1
             
-            # Save to file
-            with open('data/processed_publications.json', 'w', encoding='utf-8') as f:
-                json.dump(publications_data, f, indent=2, ensure_ascii=False)
-            
             print(f"Successfully processed {len(publications)} NASA OSDR publications")
             print(f"Research Areas Distribution: {research_areas}")
             
@@ -5,8 +5,6 @@ Script to process OSDR data and save to cache file
 
 import asyncio
 import logging
-import json
-import os
 from osdr_processor import OSDADataProcessor
 
 # Configure logging
@@ -27,34 +25,13 @@ async def process_osdr_data():
             
             logger.info(f"Successfully processed {len(publications)} publications")
             
-            # Save to a more accessible location for testing
+            # process_all_studies has already written the publications file
             output_path = "data/processed_publications.json"
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Convert to JSON-serializable format
-            publications_data = []
-            for pub in publications:
-                pub_dict = {
-                    'title': pub.title,
-                    'authors': pub.authors,
-                    'abstract': pub.abstract,
-                    'publication_date': pub.publication_date.isoformat(),
-                    'doi': pub.doi,
-                    'osdr_id': pub.osdr_id,
-                    'keywords': pub.keywords,
-                    'research_area': pub.research_area,
-                    'study_type': pub.study_type,
-                    'organisms': pub.organisms,
-                    'file_urls': pub.file_urls,
-                    'metadata': pub.metadata
-                }
-                publications_data.append(pub_dict)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(publications_data, f, indent=2, ensure_ascii=False)
-            
             logger.info(f"Data saved to {output_path}")
             
+            # Records as written to the file
+            publications_data = [pub.to_dict() for pub in publications]
+            
             # Show some statistics
             if publications_data:
                 total_pubs = len(publications_data)
@@ -0,0 +1,114 @@
+import json
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Sequence
+
+# Try to import orjson for fast JSON encoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+    logging.warning("orjson not available, falling back to json. Install with: pip install orjson")
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode('utf-8')
+
+
+def loads(data: bytes) -> Any:
+    """Decode JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def fingerprint_fragments(fragments: Iterable[bytes]) -> str:
+    """Digest of a sequence of encoded records, identifying the dataset content"""
+    digest = hashlib.blake2b(digest_size=16)
+    for fragment in fragments:
+        digest.update(fragment)
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def json_object_with_list(key: str, fragments: Iterable[bytes], extra: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Assemble {key: [fragments...], **extra} from pre-encoded list items
+
+    Args:
+        key: Name of the list field
+        fragments: JSON-encoded list items
+        extra: Additional fields encoded on the fly
+
+    Returns:
+        JSON document as bytes
+    """
+    body = b'{' + dumps(key) + b':[' + b','.join(fragments) + b']'
+    if extra:
+        # Splice the remaining fields in place of the opening brace
+        body += b',' + dumps(extra)[1:]
+    else:
+        body += b'}'
+    return body
+
+
+class EncodedPublications:
+    """
+    Publication records encoded to JSON once, when the cache is built
+
+    Each publication's JSON bytes (including its metadata blob) are kept next
+    to the record, so list endpoints concatenate ready-made fragments instead
+    of re-serializing the same nested dictionaries on every request.
+
+    The fingerprint is a digest of all fragments, identifying the dataset
+    content independently of the process that loaded it.
+    """
+
+    def __init__(self, publications: Optional[List[Dict[str, Any]]] = None):
+        self.fragments: Sequence[bytes] = []
+        self.fingerprint: str = fingerprint_fragments([])
+        if publications:
+            self.build(publications)
+
+    @classmethod
+    def from_fragments(cls, fragments: Sequence[bytes], fingerprint: str) -> 'EncodedPublications':
+        """Wrap records that are already encoded, e.g. a memory-mapped publication store"""
+        encoded = cls()
+        encoded.fragments = fragments
+        encoded.fingerprint = fingerprint
+        return encoded
+
+    def __len__(self) -> int:
+        return len(self.fragments)
+
+    def __getitem__(self, index):
+        return self.fragments[index]
+
+    def build(self, publications: List[Dict[str, Any]]):
+        """Encode every publication in cache order"""
+        self.fragments = [dumps(pub) for pub in publications]
+        self.fingerprint = fingerprint_fragments(self.fragments)
+        total_bytes = sum(len(fragment) for fragment in self.fragments)
+        logger.info(f"Pre-encoded {len(self.fragments)} publications ({total_bytes / 1024 / 1024:.1f} MB, "
+                    f"{'orjson' if ORJSON_AVAILABLE else 'json'})")
+
+    def select(self, doc_ids: Iterable[int]) -> List[bytes]:
+        """Fragments for the given document IDs, in order"""
+        return [self.fragments[doc_id] for doc_id in doc_ids]
+
+    def iter_ndjson(self, start: int = 0, end: Optional[int] = None, batch_size: int = 100) -> Iterator[bytes]:
+        """Yield fragments as newline-delimited JSON in small batches"""
+        fragments = self.fragments
+        end = len(fragments) if end is None else min(end, len(fragments))
+        for batch_start in range(start, end, batch_size):
+            batch = fragments[batch_start:min(batch_start + batch_size, end)]
+            yield b'\n'.join(batch) + b'\n'
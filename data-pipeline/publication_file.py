@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import logging
+from typing import List, Dict, Any, Iterable, Iterator, TextIO
+
+from publication_encoder import dumps, loads
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds between fsyncs of a publications file being written
+DEFAULT_FSYNC_INTERVAL = float(os.getenv('PUBLICATIONS_FSYNC_INTERVAL', '5'))
+
+# Characters read at a time when streaming a legacy JSON array
+READ_CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = ' \t\r\n'
+
+
+def _fsync_directory(path: str):
+    """Persist a rename in the directory holding path (best effort, POSIX only)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class PublicationFileWriter:
+    """
+    Streams publication records to a JSON Lines file that appears atomically
+
+    Records are appended to a temporary file next to the target as one
+    compact JSON document per line, so memory stays bounded by the batch
+    being written. The file is fsynced at most every fsync_interval seconds
+    while writing; commit() fsyncs it once more and renames it over the
+    target, so readers see either the previous file or the complete new one.
+    Used as a context manager, it commits on success and removes the
+    temporary file on error.
+    """
+
+    def __init__(self, path: str, fsync_interval: float = DEFAULT_FSYNC_INTERVAL):
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(self.tmp_path, 'wb')
+        self._last_sync = time.monotonic()
+
+    def __enter__(self) -> 'PublicationFileWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append records to the file
+
+        Returns:
+            Number of records written
+        """
+        written = 0
+        for record in records:
+            self._file.write(dumps(record) + b'\n')
+            written += 1
+        self.count += written
+
+        if time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._last_sync = time.monotonic()
+        return written
+
+    def commit(self):
+        """Make the file durable and publish it at the target path"""
+        if self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+        _fsync_directory(self.path)
+        logger.info(f"Wrote {self.count} publications to {self.path}")
+
+    def abort(self):
+        """Discard everything written so far"""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+def _iter_json_lines(f) -> Iterator[Dict[str, Any]]:
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid publication record on line {line_number}: {e}")
+
+
+def _iter_json_array(f: TextIO) -> Iterator[Dict[str, Any]]:
+    """Yield the elements of a JSON array of objects without parsing the whole document at once"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_CHUNK_SIZE)
+    position = 0
+    eof = False
+
+    def skip(chars: str) -> bool:
+        """Advance past chars, reading more input as needed; False at end of input"""
+        nonlocal buffer, position, eof
+        while True:
+            while position < len(buffer) and buffer[position] in chars:
+                position += 1
+            if position < len(buffer):
+                return True
+            if eof:
+                return False
+            buffer, position = f.read(READ_CHUNK_SIZE), 0
+            eof = not buffer
+
+    if not skip(_WHITESPACE) or buffer[position] != '[':
+        raise ValueError("Publications file does not contain a JSON array")
+    position += 1
+
+    while True:
+        if not skip(_WHITESPACE + ','):
+            raise ValueError("Unterminated JSON array in publications file")
+        if buffer[position] == ']':
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # The element continues past the buffered text
+            more = f.read(READ_CHUNK_SIZE)
+            if not more:
+                raise
+            buffer, position = buffer[position:] + more, 0
+            continue
+        yield record
+        position = end
+        if position > READ_CHUNK_SIZE:
+            buffer, position = buffer[position:], 0
+
+
+def iter_publications_file(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream publication records from a processed publications file
+
+    Reads JSON Lines as written by PublicationFileWriter, and the indented
+    JSON arrays written by earlier versions, one record at a time.
+
+    Raises:
+        ValueError: If the file is in neither format
+    """
+    with open(path, 'rb') as f:
+        head = f.read(64).lstrip()
+    if head.startswith(b'\xef\xbb\xbf'):
+        head = head[3:].lstrip()
+
+    if head.startswith(b'['):
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            yield from _iter_json_array(f)
+    else:
+        with open(path, 'rb') as f:
+            yield from _iter_json_lines(f)
+
+
+def read_publications(path: str) -> List[Dict[str, Any]]:
+    """Load every record of a processed publications file (see iter_publications_file)"""
+    return list(iter_publications_file(path))
@@ -0,0 +1,221 @@
+import os
+import glob
+import mmap
+import struct
+import logging
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
+
+import numpy as np
+
+from publication_encoder import dumps, loads, fingerprint_fragments
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    # Windows: concurrent builders just race; both write identical files under the same versioned name
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.getenv('PUBLICATION_STORE_PATH', 'data/publications.store')
+
+MAGIC = b"NSBKPUB1"
+# magic, record count, source mtime_ns, source size, fingerprint
+HEADER = struct.Struct("<8sQqq16s")
+
+
+class MappedPublicationStore:
+    """
+    Read-only, memory-mapped file of JSON-encoded publication records
+
+    Layout: a fixed header, count + 1 little-endian uint64 offsets, then the
+    concatenated record bytes. Every uvicorn worker maps the same file, so
+    the records live once in the OS page cache instead of once per process.
+    Each source version is published under its own file name (see
+    versioned_store_path), so a new version never replaces a file that a
+    worker still maps, which Windows does not allow; a mapping is closed
+    when the snapshot using it is garbage collected.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, mtime_ns, size, fingerprint = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a publication store")
+        self.count = count
+        self.source_signature: Tuple[int, int] = (mtime_ns, size)
+        self.fingerprint = fingerprint.hex()
+        self.offsets = np.frombuffer(self._mmap, dtype='<u8', count=count + 1, offset=HEADER.size)
+        self._data_start = HEADER.size + 8 * (count + 1)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def fragment(self, index: int) -> bytes:
+        """Encoded JSON bytes of one record"""
+        start = self._data_start + int(self.offsets[index])
+        end = self._data_start + int(self.offsets[index + 1])
+        return self._mmap[start:end]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mmap)
+
+
+class StoreFragments:
+    """Sequence view of a store's encoded records, as EncodedPublications expects"""
+
+    def __init__(self, store: MappedPublicationStore):
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.store.fragment(i) for i in range(*index.indices(len(self.store)))]
+        if index < 0:
+            index += len(self.store)
+        if not 0 <= index < len(self.store):
+            raise IndexError(index)
+        return self.store.fragment(index)
+
+    def __iter__(self) -> Iterator[bytes]:
+        for i in range(len(self.store)):
+            yield self.store.fragment(i)
+
+
+class StorePublications(StoreFragments):
+    """Sequence view decoding records to publication dictionaries on access"""
+
+    def __getitem__(self, index):
+        fragments = super().__getitem__(index)
+        if isinstance(index, slice):
+            return [loads(fragment) for fragment in fragments]
+        return loads(fragments)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for fragment in super().__iter__():
+            yield loads(fragment)
+
+
+def versioned_store_path(store_path: str, source_signature: Tuple[int, int]) -> str:
+    """File name of the store built from one version of the source file"""
+    mtime_ns, size = source_signature
+    return f"{store_path}.{mtime_ns:x}-{size:x}"
+
+
+def remove_stale_stores(store_path: str, keep: str):
+    """
+    Delete store files of other source versions (and the legacy unversioned file)
+
+    Files still mapped by a worker cannot be deleted on Windows; they are
+    skipped and removed by a later build.
+    """
+    candidates = glob.glob(glob.escape(store_path) + ".*") + [store_path]
+    for path in candidates:
+        if path == keep or path.endswith(('.lock', '.tmp')) or not os.path.isfile(path):
+            continue
+        try:
+            os.remove(path)
+            logger.info(f"Removed stale publication store {path}")
+        except OSError as e:
+            logger.debug(f"Publication store {path} still in use: {e}")
+
+
+def write_store(path: str,
+                publications: Iterable[Dict[str, Any]],
+                source_signature: Tuple[int, int]):
+    """
+    Encode publications into a store file and publish it atomically
+
+    Args:
+        path: Final store path
+        publications: Records to encode, in cache order
+        source_signature: (mtime_ns, size) of the file the records were read from
+    """
+    fragments = [dumps(pub) for pub in publications]
+    fingerprint = fingerprint_fragments(fragments)
+    offsets = np.zeros(len(fragments) + 1, dtype='<u8')
+    np.cumsum([len(fragment) for fragment in fragments], out=offsets[1:])
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(fragments), source_signature[0], source_signature[1],
+                            bytes.fromhex(fingerprint)))
+        f.write(offsets.tobytes())
+        for fragment in fragments:
+            f.write(fragment)
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        os.replace(tmp_path, path)
+    except PermissionError:
+        # Windows, without a build lock: another worker published (and mapped) this version first
+        os.remove(tmp_path)
+        if not os.path.exists(path):
+            raise
+    logger.info(f"Wrote publication store {path} ({len(fragments)} records, {int(offsets[-1]) / 1024 / 1024:.1f} MB)")
+
+
+def open_store(path: str) -> Optional[MappedPublicationStore]:
+    """Map a store file, or return None if it is missing or invalid"""
+    try:
+        return MappedPublicationStore(path)
+    except (OSError, ValueError, struct.error) as e:
+        logger.debug(f"Publication store {path} not usable: {e}")
+        return None
+
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive advisory lock on a sidecar file for the duration of the block"""
+    with open(path, 'w') as lock_file:
+        if FCNTL_AVAILABLE:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_or_build_store(store_path: str,
+                        source_signature: Tuple[int, int],
+                        read_publications) -> MappedPublicationStore:
+    """
+    Map the store built from the given source file version, building it if needed
+
+    Only one process builds at a time (flock on a sidecar lock file); the
+    others wait and then map the file it published. The store is kept at
+    a path derived from store_path and the source version; files of older
+    versions are deleted after a build.
+
+    Args:
+        store_path: Base store file path
+        source_signature: (mtime_ns, size) of the source publications file
+        read_publications: Callable returning the parsed source publications
+    """
+    path = versioned_store_path(store_path, source_signature)
+    store = open_store(path)
+    if store is not None and store.source_signature == source_signature:
+        return store
+
+    os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+    with file_lock(f"{store_path}.lock"):
+        # Another worker may have built it while we waited
+        store = open_store(path)
+        if store is None or store.source_signature != source_signature:
+            write_store(path, read_publications(), source_signature)
+            store = MappedPublicationStore(path)
+        remove_stale_stores(store_path, keep=path)
+
+    return store
@@ -0,0 +1,199 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+# Try to import redis for a shared cache backend
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+    logging.warning("redis not available, response cache will be in-process only. Install with: pip install redis")
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+DEFAULT_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+DEFAULT_REDIS_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '3600'))
+REDIS_KEY_PREFIX = "nasa-pipeline:response:"
+
+
+@dataclass
+class CachedResponse:
+    """Encoded response body and its strong validator"""
+    body: bytes
+    etag: str
+    media_type: str = "application/json"
+
+    @classmethod
+    def from_body(cls, body: bytes, media_type: str = "application/json") -> 'CachedResponse':
+        return cls(body=body, etag=compute_etag(body), media_type=media_type)
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag derived from the exact response bytes"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def make_cache_key(endpoint: str, params: Dict[str, Any], dataset_version: str) -> str:
+    """
+    Build a cache key from the endpoint, its normalized parameters and the dataset version
+
+    Parameters are serialized with sorted keys so equivalent requests share an
+    entry regardless of argument order.
+    """
+    normalized = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+    return f"{dataset_version}:{endpoint}:{digest}"
+
+
+class LRUResponseCache:
+    """In-process LRU cache of encoded responses bounded by total body size"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse):
+        size = len(entry.body)
+        if size > self.max_bytes:
+            # Never let one response flush the whole cache
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous.body)
+            self._entries[key] = entry
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted.body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+class RedisResponseCache:
+    """
+    Redis-backed response cache shared between API workers
+
+    Keys embed the dataset version, so entries for replaced data are never
+    read again and simply expire after the TTL.
+    """
+
+    def __init__(self, url: str, ttl: int = DEFAULT_REDIS_TTL):
+        self.client = aioredis.from_url(url)
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        value = await self.client.hgetall(REDIS_KEY_PREFIX + key)
+        if not value:
+            return None
+        return CachedResponse(
+            body=value[b'body'],
+            etag=value[b'etag'].decode('utf-8'),
+            media_type=value[b'media_type'].decode('utf-8')
+        )
+
+    async def set(self, key: str, entry: CachedResponse):
+        redis_key = REDIS_KEY_PREFIX + key
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(redis_key, mapping={'body': entry.body, 'etag': entry.etag, 'media_type': entry.media_type})
+            pipe.expire(redis_key, self.ttl)
+            await pipe.execute()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class ResponseCache:
+    """
+    Versioned cache for read-only endpoint responses
+
+    Entries are keyed by (endpoint, normalized params, dataset version) and
+    held in an in-process LRU. With RESPONSE_CACHE_BACKEND=redis, misses in
+    the LRU fall through to Redis so workers share encoded responses; Redis
+    errors degrade to the LRU alone.
+    """
+
+    def __init__(self,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 backend: str = DEFAULT_BACKEND,
+                 redis_url: Optional[str] = None):
+        self.local = LRUResponseCache(max_bytes)
+        self.remote: Optional[RedisResponseCache] = None
+        self.hits = 0
+        self.misses = 0
+
+        if backend == "redis":
+            redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379')
+            if REDIS_AVAILABLE:
+                self.remote = RedisResponseCache(redis_url)
+                logger.info(f"Response cache using Redis at {redis_url}")
+            else:
+                logger.warning("RESPONSE_CACHE_BACKEND=redis but redis is not installed, using in-process cache")
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.local.get(key)
+        if entry is None and self.remote is not None:
+            try:
+                entry = await self.remote.get(key)
+            except Exception as e:
+                logger.warning(f"Redis response cache read failed: {e}")
+            if entry is not None:
+                self.local.set(key, entry)
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    async def set(self, key: str, entry: CachedResponse):
+        self.local.set(key, entry)
+        if self.remote is not None:
+            try:
+                await self.remote.set(key, entry)
+            except Exception as e:
+                logger.warning(f"Redis response cache write failed: {e}")
+
+    def invalidate(self):
+        """Drop all in-process entries (Redis entries are orphaned by the new dataset version)"""
+        self.local.clear()
+
+    async def close(self):
+        if self.remote is not None:
+            await self.remote.close()
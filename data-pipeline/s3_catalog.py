@@ -0,0 +1,194 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
+
+from metrics import S3_OBJECTS_LISTED, STAGE_LATENCY
+from adaptive_concurrency import AIMDLimiter, is_throttling_error
+
+# Try to import boto3 for direct S3 access
+try:
+    import boto3
+    from botocore import UNSIGNED
+    from botocore.config import Config
+    from botocore.exceptions import BotoCoreError, ClientError
+    S3_AVAILABLE = True
+except ImportError:
+    boto3 = None
+    UNSIGNED = None
+    Config = None
+    BotoCoreError = ClientError = Exception
+    S3_AVAILABLE = False
+    logging.warning("boto3 not available. Install with: pip install boto3")
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIST_CONCURRENCY = int(os.getenv('S3_LIST_CONCURRENCY', '16'))
+DEFAULT_LIST_RETRIES = int(os.getenv('S3_LIST_RETRIES', '4'))
+# Alternative endpoint (MinIO, moto server) instead of AWS S3
+DEFAULT_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL') or None
+
+# First delay before retrying a failed prefix listing; doubles per attempt
+RETRY_BASE_DELAY = 0.5
+
+
+def create_s3_client(max_pool_connections: int = DEFAULT_LIST_CONCURRENCY,
+                     endpoint_url: Optional[str] = DEFAULT_ENDPOINT_URL):
+    """
+    Unsigned S3 client for public buckets, safe to share between listing threads
+
+    Botocore's standard retry mode already retries throttling and transient
+    errors per request with exponential backoff.
+    """
+    if not S3_AVAILABLE:
+        raise RuntimeError("S3 access not available. boto3 is required.")
+    config = Config(
+        signature_version=UNSIGNED,
+        max_pool_connections=max_pool_connections,
+        retries={'max_attempts': 5, 'mode': 'standard'}
+    )
+    return boto3.client('s3', config=config, endpoint_url=endpoint_url)
+
+
+class S3CatalogLister:
+    """
+    Lists study prefixes of a bucket and the objects under each, concurrently
+
+    The top-level listing (Delimiter='/') runs page by page in one thread;
+    each study prefix found is listed in a bounded thread pool as soon as
+    its page arrives, and studies are yielded in completion order so
+    callers can start processing before the crawl finishes. A prefix whose
+    listing fails after botocore's own retries is listed again from the
+    start with exponential backoff and jitter, then skipped. The number of
+    listings in flight follows an AIMD limit (up to `concurrency`) that is
+    halved when S3 answers 503 SlowDown and grows back on success.
+    """
+
+    def __init__(self,
+                 bucket: str,
+                 prefix: str = 'OSD-',
+                 client=None,
+                 concurrency: int = DEFAULT_LIST_CONCURRENCY,
+                 retries: int = DEFAULT_LIST_RETRIES,
+                 limiter: Optional[AIMDLimiter] = None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.client = client if client is not None else create_s3_client(self.concurrency)
+        self.limiter = limiter if limiter is not None else AIMDLimiter(
+            "s3_list", initial=self.concurrency, maximum=self.concurrency)
+        self.failed_prefixes: List[str] = []
+
+    def _list_study_prefixes_pages(self):
+        paginator = self.client.get_paginator('list_objects_v2')
+        return iter(paginator.paginate(Bucket=self.bucket, Prefix=self.prefix, Delimiter='/'))
+
+    def _next_prefix_page(self, pages) -> Optional[Dict[str, Any]]:
+        """Fetch the next page of study prefixes (blocking); None when done"""
+        with STAGE_LATENCY.time(stage="s3_list"):
+            return next(pages, None)
+
+    def list_objects(self, prefix: str) -> List[Dict[str, Any]]:
+        """
+        List every object under a prefix (blocking), retrying the whole listing on failure
+
+        Raises:
+            BotoCoreError, ClientError: If the last attempt fails
+        """
+        return self._list_objects(prefix)[0]
+
+    def _list_objects(self, prefix: str) -> Tuple[List[Dict[str, Any]], bool]:
+        """Objects under a prefix, and whether any attempt was throttled"""
+        throttled = False
+        for attempt in range(self.retries + 1):
+            try:
+                objects: List[Dict[str, Any]] = []
+                with STAGE_LATENCY.time(stage="s3_list"):
+                    paginator = self.client.get_paginator('list_objects_v2')
+                    for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                        contents = page.get('Contents', [])
+                        objects.extend(contents)
+                        S3_OBJECTS_LISTED.inc(len(contents))
+                return objects, throttled
+            except (BotoCoreError, ClientError) as e:
+                throttled = throttled or is_throttling_error(e)
+                if attempt == self.retries:
+                    raise
+                delay = RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.warning(f"Listing s3://{self.bucket}/{prefix} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _list_study(self, prefix: str) -> Tuple[str, Optional[List[Dict[str, Any]]], bool]:
+        try:
+            return (prefix, *self._list_objects(prefix))
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"Giving up on s3://{self.bucket}/{prefix}: {e}")
+            return prefix, None, is_throttling_error(e)
+
+    async def iter_studies(self) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Yield (study ID, objects) for every study prefix, as each listing completes
+
+        Studies without objects, and studies whose listing failed (recorded in
+        failed_prefixes), are not yielded.
+
+        Raises:
+            BotoCoreError, ClientError: If the top-level prefix listing fails
+        """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="s3-list")
+        self.failed_prefixes = []
+        pending = set()
+        # Study prefixes waiting for a slot under the adaptive limit
+        backlog: deque = deque()
+        pages = await asyncio.to_thread(self._list_study_prefixes_pages)
+        # The top-level listing gets its own thread so it never queues behind study listings
+        next_page: Optional[asyncio.Future] = asyncio.ensure_future(asyncio.to_thread(self._next_prefix_page, pages))
+
+        try:
+            while next_page is not None or pending or backlog:
+                while backlog and self.limiter.try_acquire():
+                    pending.add(loop.run_in_executor(executor, self._list_study, backlog.popleft()))
+
+                waiting = (pending | {next_page}) if next_page is not None else pending
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                if next_page in done:
+                    page = next_page.result()
+                    next_page = None
+                    if page is not None:
+                        for common_prefix in page.get('CommonPrefixes', []):
+                            prefix = common_prefix['Prefix']
+                            if prefix.startswith(self.prefix) and prefix.endswith('/'):
+                                backlog.append(prefix)
+                        next_page = asyncio.ensure_future(asyncio.to_thread(self._next_prefix_page, pages))
+
+                for future in done & pending:
+                    pending.discard(future)
+                    self.limiter.release()
+                    prefix, objects, throttled = future.result()
+                    if throttled:
+                        self.limiter.record_throttle()
+                    elif objects is not None:
+                        self.limiter.record_success()
+                    if objects is None:
+                        self.failed_prefixes.append(prefix)
+                    elif objects:
+                        yield prefix.rstrip('/'), objects
+        finally:
+            for future in pending:
+                future.cancel()
+                self.limiter.release()
+            if next_page is not None:
+                next_page.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if self.failed_prefixes:
+            logger.warning(f"Skipped {len(self.failed_prefixes)} study prefixes whose listing kept failing")
@@ -12,6 +12,9 @@ import re
 
 # Add import for the NASADataAnalyzer to leverage its dynamic extraction methods
 from data_analyzer import NASADataAnalyzer
+from publication_file import read_publications
+from http_cache import create_client_session
+from download_cache import DownloadCache, DownloadError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,12 +28,13 @@ class ScientificDataAnalyzer:
     
     def __init__(self):
         self.session = None
+        self.download_cache = DownloadCache()
         # Initialize NASADataAnalyzer to leverage its dynamic extraction methods
         self.data_analyzer = NASADataAnalyzer()
         
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        self.session = create_client_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -41,28 +45,31 @@ class ScientificDataAnalyzer:
     async def download_and_process_file(self, url: str) -> Optional[Dict[str, Any]]:
         """
         Download and process a scientific data file
+        
+        Files are streamed into the shared download cache (capped at
+        DOWNLOAD_MAX_MB), so files already fetched are only revalidated.
         """
         if not self.session:
             raise RuntimeError("Session not initialized. Use async context manager.")
             
         try:
             logger.info(f"Downloading scientific data file: {url}")
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    content = await response.read()
-                    
-                    # Process based on file type
-                    if url.endswith('.CEL.gz') or url.endswith('.txt.gz'):
-                        return await self._process_microarray_data(content, url)
-                    elif url.endswith('.csv') or url.endswith('.tsv'):
-                        return await self._process_tabular_data(content, url)
-                    elif url.endswith('.fastq.gz') or url.endswith('.fq.gz'):
-                        return await self._process_fastq_data(content, url)
-                    else:
-                        return await self._process_generic_data(content, url)
-                else:
-                    logger.warning(f"Failed to download {url}: HTTP {response.status}")
-                    return None
+            try:
+                cached = await self.download_cache.fetch(self.session, url)
+            except DownloadError as e:
+                logger.warning(f"Failed to download {url}: {e}")
+                return None
+            content = await asyncio.to_thread(cached.read_bytes)
+            
+            # Process based on file type
+            if url.endswith('.CEL.gz') or url.endswith('.txt.gz'):
+                return await self._process_microarray_data(content, url)
+            elif url.endswith('.csv') or url.endswith('.tsv'):
+                return await self._process_tabular_data(content, url)
+            elif url.endswith('.fastq.gz') or url.endswith('.fq.gz'):
+                return await self._process_fastq_data(content, url)
+            else:
+                return await self._process_generic_data(content, url)
         except Exception as e:
             logger.error(f"Error processing file {url}: {e}")
             return None
@@ -643,8 +650,7 @@ async def analyze_all_scientific_data(publications_file: str = "data/processed_p
     
     try:
         # Load publications
-        with open(publications_file, 'r', encoding='utf-8') as f:
-            publications = json.load(f)
+        publications = read_publications(publications_file)
         
         logger.info(f"Loaded {len(publications)} publications for scientific data analysis")
         
@@ -0,0 +1,461 @@
+import re
+import heapq
+import logging
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Categorical code for publications without a value
+MISSING_CODE = -1
+
+# Fields that /search can return value counts for
+FACET_FIELDS = ('research_area', 'organism', 'study_type', 'year')
+
+# Set bits in every byte value, for NumPy releases without bitwise_count
+_BYTE_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+# Relative weight of a token hit in each indexed field
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'keywords': 2.0,
+    'abstract': 1.0
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-cased alphanumeric tokens"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def parse_publication_date(value: Any) -> Optional[float]:
+    """Parse a publication date into a UTC epoch timestamp, or None if unparseable"""
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, str) and value:
+        try:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    return to_epoch(dt)
+
+
+def to_epoch(dt: datetime) -> float:
+    """Convert a datetime to a UTC epoch timestamp, treating naive values as UTC"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def to_epoch_micros(dt: datetime) -> int:
+    """Convert a datetime to integer microseconds since the UTC epoch"""
+    return round(to_epoch(dt) * 1_000_000)
+
+
+def popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row of a 2-D uint64 array"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _BYTE_POPCOUNT[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def pack_bitmap(mask: np.ndarray) -> np.ndarray:
+    """Pack a boolean document mask into uint64 words"""
+    padded = np.zeros(-(-len(mask) // 64) * 64, dtype=bool)
+    padded[:len(mask)] = mask
+    return np.packbits(padded, bitorder='little').view(np.uint64)
+
+
+class FacetBitmaps:
+    """
+    Packed per-value document bitmaps for one facet field
+
+    Counting a result set is one vectorized AND of its packed bitmap against
+    every value's row followed by a popcount, i.e. O(values x documents / 64)
+    word operations instead of visiting every hit's fields.
+    """
+
+    def __init__(self, value_docs: Dict[str, List[int]], count: int):
+        self.values = list(value_docs)
+        self.bitmaps = np.zeros((len(self.values), -(-count // 64)), dtype=np.uint64)
+        for row, doc_ids in enumerate(value_docs.values()):
+            mask = np.zeros(count, dtype=bool)
+            mask[doc_ids] = True
+            self.bitmaps[row] = pack_bitmap(mask)
+        self.totals = popcount_rows(self.bitmaps)
+
+    def counts(self, result: Optional[np.ndarray] = None, limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Count documents per value, most frequent first
+
+        Args:
+            result: Packed bitmap of the result set, or None for all documents
+            limit: Maximum number of values to return
+
+        Returns:
+            Mapping of value to document count, omitting values with no hits
+        """
+        counts = self.totals if result is None else popcount_rows(self.bitmaps & result)
+        order = np.lexsort((np.arange(len(counts)), -counts))
+        nonzero = order[counts[order] > 0]
+        if limit is not None:
+            nonzero = nonzero[:limit]
+        return {self.values[row]: int(counts[row]) for row in nonzero}
+
+
+class CategoricalColumn:
+    """Per-document integer codes for a single-valued string field"""
+
+    def __init__(self, values: List[Optional[str]]):
+        self.categories: Dict[str, int] = {}
+        codes = np.full(len(values), MISSING_CODE, dtype=np.int32)
+        for doc_id, value in enumerate(values):
+            if value:
+                codes[doc_id] = self.categories.setdefault(value, len(self.categories))
+        self.codes = codes
+
+    def mask(self, wanted: List[str]) -> np.ndarray:
+        """Boolean mask of documents whose value is any of wanted"""
+        wanted_codes = [self.categories[value] for value in wanted if value in self.categories]
+        if not wanted_codes:
+            return np.zeros(len(self.codes), dtype=bool)
+        return np.isin(self.codes, wanted_codes)
+
+    def value_docs(self) -> Dict[str, List[int]]:
+        """Document IDs holding each value"""
+        doc_ids = np.argsort(self.codes, kind='stable')
+        bounds = np.searchsorted(self.codes[doc_ids], np.arange(len(self.categories) + 1))
+        return {value: doc_ids[bounds[code]:bounds[code + 1]].tolist() for value, code in self.categories.items()}
+
+
+class PublicationSearchIndex:
+    """
+    In-memory inverted index over the publications cache
+
+    Text postings map each token of title, abstract and keywords to the
+    publications containing it along with a field-weighted score. Structured
+    filters are served from a typed side-table built once per cache load:
+    int64 publication dates sorted with their permutation (date ranges are
+    two binary searches), categorical codes for research area and study
+    type, and a boolean bitmap per organism. Filters combine as vectorized
+    NumPy masks instead of per-record parsing. Facet counts for a result set
+    come from packed per-value bitmaps (see FacetBitmaps).
+    """
+
+    def __init__(self, publications: Optional[List[Dict[str, Any]]] = None):
+        self.publications: List[Dict[str, Any]] = []
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.vocabulary: List[str] = []
+        # Vocabulary joined by newlines (never part of a term) and each term's start offset
+        self.vocabulary_text = ""
+        self.term_offsets: List[int] = []
+        self.research_areas = CategoricalColumn([])
+        self.study_types = CategoricalColumn([])
+        self.organism_bitmaps: Dict[str, np.ndarray] = {}
+        # Publication dates in microseconds, ascending, and the document IDs in that order
+        self.sorted_dates = np.empty(0, dtype=np.int64)
+        self.date_order = np.empty(0, dtype=np.int32)
+        self.facets: Dict[str, FacetBitmaps] = {field: FacetBitmaps({}, 0) for field in FACET_FIELDS}
+
+        if publications:
+            self.build(publications)
+
+    def __len__(self) -> int:
+        return len(self.publications)
+
+    def build(self, publications: List[Dict[str, Any]]):
+        """
+        (Re)build all postings from a list of publication dictionaries
+
+        Args:
+            publications: Publications in cache order; positions become document IDs
+        """
+        postings: Dict[str, Dict[int, float]] = {}
+        organism_docs: Dict[str, List[int]] = {}
+        dated_ids: List[int] = []
+        dates: List[int] = []
+        year_docs: Dict[str, List[int]] = {}
+
+        for doc_id, pub in enumerate(publications):
+            fields = {
+                'title': tokenize(pub.get('title', '')),
+                'abstract': tokenize(pub.get('abstract', '')),
+                'keywords': [token for keyword in pub.get('keywords', []) or [] for token in tokenize(keyword)]
+            }
+            for field, tokens in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for token in tokens:
+                    doc_scores = postings.setdefault(token, {})
+                    doc_scores[doc_id] = doc_scores.get(doc_id, 0.0) + weight
+
+            for organism in pub.get('organisms', []) or []:
+                if organism:
+                    organism_docs.setdefault(organism, []).append(doc_id)
+
+            timestamp = parse_publication_date(pub.get('publication_date'))
+            if timestamp is not None:
+                dated_ids.append(doc_id)
+                dates.append(round(timestamp * 1_000_000))
+                year = str(datetime.fromtimestamp(timestamp, timezone.utc).year)
+                year_docs.setdefault(year, []).append(doc_id)
+
+        count = len(publications)
+        organism_bitmaps: Dict[str, np.ndarray] = {}
+        for organism, doc_ids in organism_docs.items():
+            bitmap = np.zeros(count, dtype=bool)
+            bitmap[doc_ids] = True
+            organism_bitmaps[organism] = bitmap
+
+        date_values = np.array(dates, dtype=np.int64)
+        permutation = np.argsort(date_values, kind='stable')
+
+        research_areas = CategoricalColumn([pub.get('research_area') for pub in publications])
+        study_types = CategoricalColumn([pub.get('study_type') for pub in publications])
+
+        self.publications = publications
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+        self.vocabulary_text = "\n".join(self.vocabulary)
+        self.term_offsets = []
+        offset = 0
+        for term in self.vocabulary:
+            self.term_offsets.append(offset)
+            offset += len(term) + 1
+        self.research_areas = research_areas
+        self.study_types = study_types
+        self.organism_bitmaps = organism_bitmaps
+        self.sorted_dates = date_values[permutation]
+        self.date_order = np.array(dated_ids, dtype=np.int32)[permutation]
+        self.facets = {
+            'research_area': FacetBitmaps(research_areas.value_docs(), count),
+            'organism': FacetBitmaps(organism_docs, count),
+            'study_type': FacetBitmaps(study_types.value_docs(), count),
+            'year': FacetBitmaps(dict(sorted(year_docs.items())), count)
+        }
+
+        logger.info(f"Built search index: {len(publications)} publications, {len(self.vocabulary)} terms")
+
+    def _match_token(self, token: str) -> Dict[int, float]:
+        """
+        Collect scores for every indexed term containing token
+
+        Like the substring search this index replaced, "gravity" matches
+        "microgravity" and "microgr" matches "microgravity". Exact hits rank
+        above prefix expansions, which rank above matches inside a term.
+        """
+        matches: Dict[int, float] = {}
+        for term_id in self._terms_containing(token):
+            term = self.vocabulary[term_id]
+            if term == token:
+                boost = 1.0
+            elif term.startswith(token):
+                boost = 0.5
+            else:
+                boost = 0.25
+            for doc_id, score in self.postings[term].items():
+                matches[doc_id] = matches.get(doc_id, 0.0) + score * boost
+        return matches
+
+    def _terms_containing(self, token: str) -> List[int]:
+        """Vocabulary positions of the terms containing token"""
+        term_ids: List[int] = []
+        position = self.vocabulary_text.find(token)
+        while position != -1:
+            term_id = bisect_right(self.term_offsets, position) - 1
+            term_ids.append(term_id)
+            # Continue after this term; one hit per term is enough
+            position = self.vocabulary_text.find(token, self.term_offsets[term_id] + len(self.vocabulary[term_id]))
+        return term_ids
+
+    def _date_mask(self, date_from: Optional[datetime], date_to: Optional[datetime]) -> np.ndarray:
+        """Boolean mask of documents whose publication date lies within the inclusive range"""
+        lo = np.searchsorted(self.sorted_dates, to_epoch_micros(date_from), side='left') if date_from else 0
+        hi = np.searchsorted(self.sorted_dates, to_epoch_micros(date_to), side='right') if date_to else len(self.sorted_dates)
+        mask = np.zeros(len(self.publications), dtype=bool)
+        mask[self.date_order[lo:hi]] = True
+        return mask
+
+    def _organism_mask(self, organisms: List[str]) -> np.ndarray:
+        """Boolean mask of documents studying any of the organisms"""
+        mask = np.zeros(len(self.publications), dtype=bool)
+        for organism in organisms:
+            bitmap = self.organism_bitmaps.get(organism)
+            if bitmap is not None:
+                mask |= bitmap
+        return mask
+
+    def filter_mask(self,
+                    research_areas: Optional[List[str]] = None,
+                    organisms: Optional[List[str]] = None,
+                    date_from: Optional[datetime] = None,
+                    date_to: Optional[datetime] = None,
+                    study_types: Optional[List[str]] = None) -> Optional[np.ndarray]:
+        """
+        Combine the structured filters into one boolean mask
+
+        Returns:
+            Mask over document IDs, or None if no filter is active
+        """
+        masks: List[np.ndarray] = []
+        if research_areas:
+            masks.append(self.research_areas.mask(research_areas))
+        if study_types:
+            masks.append(self.study_types.mask(study_types))
+        if organisms:
+            masks.append(self._organism_mask(organisms))
+        if date_from or date_to:
+            masks.append(self._date_mask(date_from, date_to))
+
+        if not masks:
+            return None
+        mask = masks[0]
+        for other in masks[1:]:
+            mask &= other
+        return mask
+
+    def search(self,
+               query: str = "",
+               research_areas: Optional[List[str]] = None,
+               organisms: Optional[List[str]] = None,
+               date_from: Optional[datetime] = None,
+               date_to: Optional[datetime] = None,
+               limit: int = 50,
+               offset: int = 0,
+               study_types: Optional[List[str]] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Run a ranked search and return matching publication dictionaries
+
+        Returns:
+            Tuple of (total number of hits, publications on the requested page)
+        """
+        total, doc_ids = self.search_ids(query, research_areas, organisms, date_from, date_to, limit, offset, study_types)
+        return total, [self.publications[doc_id] for doc_id in doc_ids]
+
+    def search_ids(self,
+                   query: str = "",
+                   research_areas: Optional[List[str]] = None,
+                   organisms: Optional[List[str]] = None,
+                   date_from: Optional[datetime] = None,
+                   date_to: Optional[datetime] = None,
+                   limit: int = 50,
+                   offset: int = 0,
+                   study_types: Optional[List[str]] = None) -> Tuple[int, List[int]]:
+        """
+        Run a ranked search with structured filters
+
+        Args:
+            query: Free-text query; every token must match (as a term prefix)
+            research_areas: Keep publications in any of these research areas
+            organisms: Keep publications studying any of these organisms
+            date_from: Inclusive lower bound on publication date
+            date_to: Inclusive upper bound on publication date
+            limit: Page size
+            offset: Page offset
+            study_types: Keep publications of any of these study types
+
+        Returns:
+            Tuple of (total number of hits, document IDs on the requested page)
+        """
+        total, doc_ids, _ = self.search_with_facets(
+            query, research_areas, organisms, date_from, date_to, limit, offset, study_types
+        )
+        return total, doc_ids
+
+    def search_with_facets(self,
+                           query: str = "",
+                           research_areas: Optional[List[str]] = None,
+                           organisms: Optional[List[str]] = None,
+                           date_from: Optional[datetime] = None,
+                           date_to: Optional[datetime] = None,
+                           limit: int = 50,
+                           offset: int = 0,
+                           study_types: Optional[List[str]] = None,
+                           facets: Optional[List[str]] = None,
+                           facet_limit: Optional[int] = None) -> Tuple[int, List[int], Dict[str, Dict[str, int]]]:
+        """
+        Run a ranked search and count facet values over the full result set
+
+        Takes the same arguments as search_ids, plus:
+            facets: Facet fields to count (see FACET_FIELDS)
+            facet_limit: Maximum number of values returned per facet
+
+        Returns:
+            Tuple of (total number of hits, document IDs on the requested page,
+            {facet: {value: count}})
+
+        Raises:
+            ValueError: If a facet field is not in FACET_FIELDS
+        """
+        unknown = [facet for facet in facets or [] if facet not in self.facets]
+        if unknown:
+            raise ValueError(f"Unknown facets {unknown}; expected any of {list(FACET_FIELDS)}")
+
+        offset = max(offset, 0)
+        limit = max(limit, 0)
+        scores, matching = self._match(query, research_areas, organisms, date_from, date_to, study_types)
+
+        facet_counts: Dict[str, Dict[str, int]] = {}
+        if facets:
+            result: Optional[np.ndarray] = None
+            if matching is not None:
+                mask = np.zeros(len(self.publications), dtype=bool)
+                mask[matching] = True
+                result = pack_bitmap(mask)
+            facet_counts = {facet: self.facets[facet].counts(result, facet_limit) for facet in facets}
+
+        if matching is None:
+            # No query and no filters: cache order
+            total = len(self.publications)
+            return total, list(range(offset, min(offset + limit, total))), facet_counts
+        if scores is None:
+            # Filters only: matching documents in cache order
+            return len(matching), matching[offset:offset + limit].tolist(), facet_counts
+
+        candidates = matching.tolist()
+        ranked = heapq.nsmallest(offset + limit, candidates, key=lambda doc_id: (-scores[doc_id], doc_id))
+        return len(candidates), ranked[offset:offset + limit], facet_counts
+
+    def _match(self,
+               query: str,
+               research_areas: Optional[List[str]],
+               organisms: Optional[List[str]],
+               date_from: Optional[datetime],
+               date_to: Optional[datetime],
+               study_types: Optional[List[str]]) -> Tuple[Optional[Dict[int, float]], Optional[np.ndarray]]:
+        """
+        Find every document matching the query and filters
+
+        Returns:
+            Tuple of (text scores, or None without a text query; matching
+            document IDs, or None if every document matches)
+        """
+        scores: Optional[Dict[int, float]] = None
+        for token in dict.fromkeys(tokenize(query)):
+            matches = self._match_token(token)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {doc_id: score + matches[doc_id] for doc_id, score in scores.items() if doc_id in matches}
+            if not scores:
+                return scores, np.empty(0, dtype=np.int64)
+
+        mask = self.filter_mask(research_areas, organisms, date_from, date_to, study_types)
+
+        if scores is None:
+            return None, None if mask is None else np.flatnonzero(mask)
+
+        candidates = np.fromiter(scores, dtype=np.int64, count=len(scores))
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        return scores, candidates
@@ -0,0 +1,295 @@
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Callable, Sequence
+
+import numpy as np
+
+from publication_store import file_lock
+
+# Try to import the shared sentence-transformer wrapper
+try:
+    from embedding.embedding_generator import EmbeddingGenerator
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EmbeddingGenerator = None
+    EMBEDDINGS_AVAILABLE = False
+    logging.warning("EmbeddingGenerator not available, semantic search disabled")
+
+# Try to import FAISS for approximate nearest neighbour search
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    faiss = None
+    FAISS_AVAILABLE = False
+    logging.warning("FAISS not available, semantic search will use exact NumPy scoring. Install with: pip install faiss-cpu")
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDINGS_DIR = os.getenv('PUBLICATION_EMBEDDINGS_DIR', 'data/embeddings')
+DEFAULT_MODEL_NAME = os.getenv('PUBLICATION_EMBEDDING_MODEL', 'all-mpnet-base-v2')
+EMBEDDING_BATCH_SIZE = int(os.getenv('PUBLICATION_EMBEDDING_BATCH_SIZE', '64'))
+
+# Below this many publications an exact scan is as fast as the graph
+HNSW_MIN_DOCUMENTS = int(os.getenv('SEMANTIC_HNSW_MIN_DOCUMENTS', '5000'))
+HNSW_NEIGHBORS = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = int(os.getenv('SEMANTIC_HNSW_EF_SEARCH', '64'))
+
+# Filtered searches with at most this many candidates are scored exactly
+EXACT_SEARCH_MAX_CANDIDATES = 4096
+
+# Query embeddings kept per process (typeahead and paging repeat queries)
+QUERY_CACHE_SIZE = 1024
+
+
+class SemanticIndexSuperseded(Exception):
+    """Raised when a build is abandoned because a newer dataset version was requested"""
+
+
+def publication_text(pub: Dict[str, Any]) -> str:
+    """Text embedded for a publication: its title followed by its abstract"""
+    title = (pub.get('title') or '').strip()
+    abstract = (pub.get('abstract') or '').strip()
+    return f"{title}. {abstract}" if abstract else title
+
+
+def embeddings_path(directory: str, fingerprint: str, model_name: str) -> str:
+    """File holding the embeddings of one dataset version under one model"""
+    model = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+    return os.path.join(directory, f"{fingerprint}-{model}.npy")
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first"""
+    if k < len(scores):
+        positions = np.argpartition(-scores, k - 1)[:k]
+    else:
+        positions = np.arange(len(scores))
+    return positions[np.argsort(-scores[positions], kind='stable')]
+
+
+class SemanticIndex:
+    """
+    Cosine-similarity index over one dataset version's publication embeddings
+
+    Rows of the embedding matrix are L2-normalized and aligned with the
+    snapshot's document IDs. Large corpora are searched through a FAISS HNSW
+    graph; small corpora, and filtered searches that leave few candidates,
+    are scored exactly with one matrix-vector product.
+    """
+
+    def __init__(self, embeddings: np.ndarray, fingerprint: str):
+        self.embeddings = embeddings
+        self.fingerprint = fingerprint
+        self.ann = None
+
+        if FAISS_AVAILABLE and len(embeddings) >= HNSW_MIN_DOCUMENTS:
+            index = faiss.IndexHNSWFlat(embeddings.shape[1], HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+            self.ann = index
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    def _exact(self, query: np.ndarray, k: int, candidates: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        if candidates is None:
+            scores = self.embeddings @ query
+            positions = top_k(scores, k)
+            return positions, scores[positions]
+        scores = self.embeddings[candidates] @ query
+        positions = top_k(scores, k)
+        return candidates[positions], scores[positions]
+
+    def _approximate(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores, labels = self.ann.search(query.reshape(1, -1), k)
+        found = labels[0] >= 0
+        return labels[0][found], scores[0][found]
+
+    def search(self,
+               query: np.ndarray,
+               k: int,
+               mask: Optional[np.ndarray] = None) -> Tuple[List[int], List[float]]:
+        """
+        Find the publications most similar to a normalized query embedding
+
+        Args:
+            query: Query embedding (L2-normalized)
+            k: Number of results
+            mask: Optional boolean mask of admissible document IDs
+
+        Returns:
+            Tuple of (document IDs, cosine similarities), best first
+        """
+        if k <= 0 or len(self) == 0:
+            return [], []
+        query = np.asarray(query, dtype=np.float32)
+
+        if mask is None:
+            if self.ann is None:
+                doc_ids, scores = self._exact(query, k, None)
+            else:
+                doc_ids, scores = self._approximate(query, k)
+            return doc_ids.tolist(), scores.tolist()
+
+        candidates = np.flatnonzero(mask)
+        if self.ann is not None and len(candidates) > EXACT_SEARCH_MAX_CANDIDATES:
+            # Oversample in proportion to the filter's selectivity, then post-filter
+            fetch = min(len(self), 2 * k * len(self) // len(candidates) + k)
+            doc_ids, scores = self._approximate(query, fetch)
+            keep = mask[doc_ids]
+            if keep.sum() >= k or fetch == len(self):
+                return doc_ids[keep][:k].tolist(), scores[keep][:k].tolist()
+
+        doc_ids, scores = self._exact(query, k, candidates)
+        return doc_ids.tolist(), scores.tolist()
+
+
+class SemanticSearchService:
+    """
+    Builds and serves the semantic index for the current dataset version
+
+    Embeddings are computed once per dataset fingerprint and saved as a .npy
+    file that every worker memory-maps; one worker computes them under a
+    file lock while the others wait and load the result. Request handlers
+    look the index up by fingerprint, so results always refer to the
+    document IDs of the snapshot they searched.
+    """
+
+    def __init__(self,
+                 directory: str = DEFAULT_EMBEDDINGS_DIR,
+                 model_name: str = DEFAULT_MODEL_NAME):
+        self.directory = directory
+        self.model_name = model_name
+        self.index: Optional[SemanticIndex] = None
+        # Fingerprint of the most recently requested build
+        self._target: Optional[str] = None
+        self._generator = None
+        self._generator_lock = threading.Lock()
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return EMBEDDINGS_AVAILABLE
+
+    def index_for(self, fingerprint: str) -> Optional[SemanticIndex]:
+        """The index built for a dataset fingerprint, or None if it is not ready"""
+        index = self.index
+        if index is not None and index.fingerprint == fingerprint:
+            return index
+        return None
+
+    def _get_generator(self):
+        with self._generator_lock:
+            if self._generator is None:
+                generator = EmbeddingGenerator(self.model_name)
+                generator.initialize_model()
+                self._generator = generator
+            return self._generator
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.asarray(self._get_generator().generate_embeddings(texts), dtype=np.float32)
+        # The generator normalizes already; repeat it so the index never depends on that
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def encode_query(self, text: str) -> np.ndarray:
+        """Embed a query string (blocking; cached per process)"""
+        with self._query_cache_lock:
+            cached = self._query_cache.get(text)
+            if cached is not None:
+                self._query_cache.move_to_end(text)
+                return cached
+
+        embedding = self._encode([text])[0]
+
+        with self._query_cache_lock:
+            self._query_cache[text] = embedding
+            while len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return embedding
+
+    def _write_embeddings(self,
+                          path: str,
+                          fingerprint: str,
+                          publications: Sequence[Dict[str, Any]],
+                          progress: Optional[Callable[[int, int], None]]):
+        count = len(publications)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        matrix = None
+        try:
+            for start in range(0, count, EMBEDDING_BATCH_SIZE):
+                if self._target != fingerprint:
+                    raise SemanticIndexSuperseded(f"Embedding of dataset {fingerprint} superseded")
+                batch = self._encode([publication_text(publications[i])
+                                      for i in range(start, min(start + EMBEDDING_BATCH_SIZE, count))])
+                if matrix is None:
+                    matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32,
+                                                       shape=(count, batch.shape[1]))
+                matrix[start:start + len(batch)] = batch
+                if progress:
+                    progress(start + len(batch), count)
+            matrix.flush()
+            del matrix
+            os.replace(tmp_path, path)
+        except BaseException:
+            matrix = None
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # Embeddings of older dataset versions are never read again
+        for name in os.listdir(self.directory):
+            stale = os.path.join(self.directory, name)
+            if name.endswith('.npy') and stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+    def build(self,
+              publications: Sequence[Dict[str, Any]],
+              fingerprint: str,
+              progress: Optional[Callable[[int, int], None]] = None) -> SemanticIndex:
+        """
+        Load or compute the embeddings for a dataset version and publish its index (blocking)
+
+        Args:
+            publications: Publications in document ID order
+            fingerprint: Dataset fingerprint the embeddings belong to
+            progress: Called with (embedded, total) after each batch
+
+        Returns:
+            The index (published unless a newer build was requested meanwhile)
+
+        Raises:
+            SemanticIndexSuperseded: If a newer build was requested while embedding
+        """
+        self._target = fingerprint
+        path = embeddings_path(self.directory, fingerprint, self.model_name)
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            with file_lock(os.path.join(self.directory, '.lock')):
+                # Another worker may have computed them while we waited
+                if not os.path.exists(path):
+                    logger.info(f"Embedding {len(publications)} publications with {self.model_name}")
+                    self._write_embeddings(path, fingerprint, publications, progress)
+
+        embeddings = np.load(path, mmap_mode='r')
+        if len(embeddings) != len(publications):
+            raise ValueError(f"{path} holds {len(embeddings)} embeddings for {len(publications)} publications")
+
+        index = SemanticIndex(embeddings, fingerprint)
+        if self._target != fingerprint:
+            return index
+        self.index = index
+        logger.info(f"Semantic index ready: {len(index)} publications ({'HNSW' if index.ann is not None else 'exact'})")
+        return index
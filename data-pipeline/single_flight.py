@@ -0,0 +1,58 @@
+import json
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Any, Callable, Awaitable
+
+from metrics import SINGLE_FLIGHT_REQUESTS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def canonical_key(payload: Any) -> str:
+    """Hash of a request payload that is independent of key order and whitespace"""
+    normalized = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one computation
+
+    The first caller for a key starts the computation as its own task; callers
+    arriving while it is in flight await the same task instead of starting
+    another. The task is shielded, so a disconnecting caller does not cancel
+    the work the others are waiting for. Results are shared, not copied, and
+    must be treated as read-only.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func for key, or join the in-flight run for the same key
+
+        Args:
+            key: Canonical request key (see canonical_key)
+            func: Coroutine function producing the result
+
+        Returns:
+            The result of the shared computation
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            SINGLE_FLIGHT_REQUESTS.inc(group=self.name, role="leader")
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            SINGLE_FLIGHT_REQUESTS.inc(group=self.name, role="coalesced")
+            logger.info(f"Coalesced {self.name} request onto in-flight computation")
+        return await asyncio.shield(task)
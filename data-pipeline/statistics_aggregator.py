@@ -0,0 +1,195 @@
+import os
+import math
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Number of distinct values tracked exactly before switching to a HyperLogLog sketch
+DEFAULT_SKETCH_THRESHOLD = int(os.getenv('STATISTICS_SKETCH_THRESHOLD', '100000'))
+
+ORGANISM_FIELDS = ['organism', 'organisms', 'species', 'scientificName']
+
+
+class HyperLogLog:
+    """
+    HyperLogLog cardinality sketch
+
+    Uses 2^precision one-byte registers (16 KB at the default precision of 14,
+    ~0.8% standard error).
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.registers = bytearray(self.num_registers)
+
+    def add(self, value: Any):
+        """Add a value to the sketch"""
+        digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def cardinality(self) -> int:
+        """Estimate the number of distinct values added"""
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class DistinctCounter:
+    """
+    Distinct-value counter that is exact for small cardinalities
+
+    Values are counted in a Counter. Once the number of distinct values
+    exceeds `threshold`, new values are fed into a HyperLogLog sketch
+    instead, bounding memory; from then on the cardinality is an estimate.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_SKETCH_THRESHOLD):
+        self.threshold = threshold
+        self.counts: Counter = Counter()
+        self.sketch: Optional[HyperLogLog] = None
+
+    @property
+    def is_sketch(self) -> bool:
+        return self.sketch is not None
+
+    def add(self, value: Any):
+        if value in self.counts or self.sketch is None:
+            self.counts[value] += 1
+            if self.sketch is None and len(self.counts) > self.threshold:
+                self._switch_to_sketch()
+        else:
+            self.sketch.add(value)
+
+    def _switch_to_sketch(self):
+        logger.info(f"Distinct values exceeded {self.threshold}; switching to HyperLogLog sketch")
+        self.sketch = HyperLogLog()
+        for value in self.counts:
+            self.sketch.add(value)
+
+    def cardinality(self) -> int:
+        if self.sketch is not None:
+            return self.sketch.cardinality()
+        return len(self.counts)
+
+    def most_common(self, n: int) -> List[Any]:
+        """Most frequent tracked values (exact below the threshold)"""
+        return [value for value, _ in self.counts.most_common(n)]
+
+
+def extract_organisms(pub: Dict[str, Any]) -> List[str]:
+    """Extract organism names from a publication, falling back to its metadata"""
+    organisms_list = list(pub.get('organisms', []) or [])
+    if not organisms_list and 'metadata' in pub:
+        # Try to extract from metadata
+        metadata = pub.get('metadata') or {}
+        if 'organism' in metadata:
+            organism_data = metadata['organism']
+            if isinstance(organism_data, list):
+                for org in organism_data:
+                    if isinstance(org, dict) and 'scientificName' in org:
+                        organisms_list.append(org['scientificName'])
+                    elif isinstance(org, str):
+                        organisms_list.append(org)
+            elif isinstance(organism_data, dict) and 'scientificName' in organism_data:
+                organisms_list.append(organism_data['scientificName'])
+            elif isinstance(organism_data, str):
+                organisms_list.append(organism_data)
+
+    # If still no organisms, try direct publication fields
+    if not organisms_list:
+        for field in ORGANISM_FIELDS:
+            if field in pub:
+                org_data = pub[field]
+                if isinstance(org_data, list):
+                    organisms_list.extend(org_data)
+                elif isinstance(org_data, str):
+                    organisms_list.append(org_data)
+                elif isinstance(org_data, dict) and 'scientificName' in org_data:
+                    organisms_list.append(org_data['scientificName'])
+
+    return [org for org in organisms_list if isinstance(org, str)]
+
+
+def extract_year(pub: Dict[str, Any]) -> Optional[int]:
+    """Extract the publication year, or None if the date cannot be parsed"""
+    value = pub.get('publication_date', '')
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).year
+    except (AttributeError, ValueError) as e:
+        logger.debug(f"Error parsing publication date {value!r}: {e}")
+        return None
+
+
+class PublicationStatistics:
+    """
+    Dataset statistics for GET /statistics
+
+    Built in one pass over a dataset snapshot's publications (a reload
+    builds a new instance); snapshot() returns the response dictionary,
+    computed once and then cached.
+    """
+
+    def __init__(self,
+                 publications: Optional[Iterable[Dict[str, Any]]] = None,
+                 sketch_threshold: int = DEFAULT_SKETCH_THRESHOLD):
+        self.total_publications = 0
+        self.research_areas: Counter = Counter()
+        self.years: Counter = Counter()
+        self.organisms = DistinctCounter(sketch_threshold)
+        self.authors = DistinctCounter(sketch_threshold)
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+        if publications:
+            for pub in publications:
+                self.add_publication(pub)
+
+    def add_publication(self, pub: Dict[str, Any]):
+        """Account for one publication"""
+        self.total_publications += 1
+        self.research_areas[pub.get('research_area', 'Unknown')] += 1
+        for organism in set(extract_organisms(pub)):
+            self.organisms.add(organism)
+        year = extract_year(pub)
+        if year is not None:
+            self.years[year] += 1
+        for author in set(pub.get('authors', []) or []):
+            self.authors.add(author)
+        self._snapshot = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics response, computing it on first use"""
+        if self._snapshot is None:
+            year_range = "N/A"
+            if self.years:
+                year_range = f"{min(self.years)} - {max(self.years)}"
+
+            self._snapshot = {
+                "total_publications": self.total_publications,
+                "unique_organisms": self.organisms.cardinality(),
+                "unique_authors": self.authors.cardinality(),
+                "research_areas": len(self.research_areas),
+                "year_range": year_range,
+                "top_research_areas": dict(self.research_areas.most_common(10)),
+                "publications_by_year": dict(sorted(self.years.items())),
+                "top_organisms": self.organisms.most_common(20)
+            }
+        return self._snapshot
@@ -0,0 +1,204 @@
+import logging
+from bisect import bisect_left
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Sequence
+
+import numpy as np
+
+from search_index import PublicationSearchIndex, tokenize
+
+# Try to import the controlled vocabularies used for entity suggestions
+try:
+    from kg_extraction.vocabulary_normalizer import VocabularyNormalizer
+    VOCABULARY_AVAILABLE = True
+except ImportError:
+    VocabularyNormalizer = None
+    VOCABULARY_AVAILABLE = False
+    logging.warning("VocabularyNormalizer not available, suggestions will not include normalized entities")
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Suggestion kinds, in the order they win when two sources yield the same text
+SUGGESTION_KINDS = ('organism', 'entity', 'keyword', 'title')
+
+# Entries are also reachable from this many leading word starts ("loss" finds "bone loss")
+MAX_WORD_STARTS = 8
+
+# Prefixes up to this length span much of the index, so their top suggestions are precomputed
+PRECOMPUTED_PREFIX_LENGTH = 2
+PRECOMPUTED_LIMIT = 20
+
+
+def normalize_suggestion(text: str) -> str:
+    """Lower-case text and collapse it to single-space separated tokens"""
+    return " ".join(tokenize(text))
+
+
+@lru_cache(maxsize=1)
+def entity_aliases() -> Dict[str, str]:
+    """Map each alias in the local controlled vocabularies to its normalized entity name"""
+    if not VOCABULARY_AVAILABLE:
+        return {}
+    aliases: Dict[str, str] = {}
+    for vocabulary in VocabularyNormalizer().local_vocabularies.values():
+        for alias, term in vocabulary.items():
+            aliases[alias] = term['name']
+    return aliases
+
+
+class SuggestionIndex:
+    """
+    Typeahead index over titles, keywords, organisms and normalized entities
+
+    Every suggestion is stored under its normalized text and under the
+    suffixes starting at its first few word boundaries, in one sorted array
+    of keys. A prefix lookup is two binary searches; the entries in that
+    range are ranked by a precomputed global rank (document frequency, then
+    shorter text). Very short prefixes, whose ranges span much of the
+    index, are answered from a table built with the index.
+    """
+
+    def __init__(self,
+                 publications: Optional[Sequence[Dict[str, Any]]] = None,
+                 search_index: Optional[PublicationSearchIndex] = None):
+        self.texts: List[str] = []
+        self.kinds: List[str] = []
+        self.counts = np.empty(0, dtype=np.int64)
+        self.keys: List[str] = []
+        # Global rank of the entry stored at each key position
+        self.key_ranks = np.empty(0, dtype=np.int32)
+        self._short_prefixes: Dict[str, List[int]] = {}
+
+        if publications:
+            self.build(publications, search_index)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def build(self,
+              publications: Sequence[Dict[str, Any]],
+              search_index: Optional[PublicationSearchIndex] = None):
+        """
+        (Re)build the index from publication dictionaries
+
+        Args:
+            publications: Publications to draw titles, keywords and organisms from
+            search_index: Index of the same publications, used to count entity mentions
+        """
+        # normalized text -> [display text, kind, document frequency]
+        entries: Dict[str, list] = {}
+
+        def add(text: str, kind: str, count: int):
+            key = normalize_suggestion(text)
+            if not key:
+                return
+            entry = entries.get(key)
+            if entry is None:
+                entries[key] = [text.strip(), kind, count]
+            elif SUGGESTION_KINDS.index(kind) == SUGGESTION_KINDS.index(entry[1]):
+                entry[2] += count
+            elif count > entry[2]:
+                entry[1:] = [kind, count]
+
+        titles: Dict[str, int] = {}
+        keywords: Dict[str, int] = {}
+        organisms: Dict[str, int] = {}
+        for pub in publications:
+            title = pub.get('title')
+            if title:
+                titles[title] = titles.get(title, 0) + 1
+            for keyword in set(pub.get('keywords', []) or []):
+                if keyword:
+                    keywords[keyword] = keywords.get(keyword, 0) + 1
+            for organism in set(pub.get('organisms', []) or []):
+                if organism:
+                    organisms[organism] = organisms.get(organism, 0) + 1
+
+        for organism, count in organisms.items():
+            add(organism, 'organism', count)
+        if search_index is not None:
+            for name, count in self._entity_counts(search_index).items():
+                add(name, 'entity', count)
+        for keyword, count in keywords.items():
+            add(keyword, 'keyword', count)
+        for title, count in titles.items():
+            add(title, 'title', count)
+
+        ordered = sorted(entries.items(), key=lambda item: (-item[1][2], len(item[0]), item[0]))
+        self.texts = [entry[0] for _, entry in ordered]
+        self.kinds = [entry[1] for _, entry in ordered]
+        self.counts = np.array([entry[2] for _, entry in ordered], dtype=np.int64)
+
+        keyed: List[Tuple[str, int]] = []
+        for rank, (key, _) in enumerate(ordered):
+            words = key.split(" ")
+            start = 0
+            for word in words[:MAX_WORD_STARTS]:
+                keyed.append((key[start:], rank))
+                start += len(word) + 1
+        keyed.sort()
+        self.keys = [key for key, _ in keyed]
+        self.key_ranks = np.array([rank for _, rank in keyed], dtype=np.int32)
+
+        self._short_prefixes = {}
+        short = {key[:length] for key in self.keys for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1)}
+        for prefix in short:
+            self._short_prefixes[prefix] = self._top_ranks(prefix, PRECOMPUTED_LIMIT)
+
+        logger.info(f"Built suggestion index: {len(self.texts)} suggestions, {len(self.keys)} keys")
+
+    @staticmethod
+    def _entity_counts(search_index: PublicationSearchIndex) -> Dict[str, int]:
+        """Count publications mentioning any alias of each normalized entity"""
+        documents: Dict[str, set] = {}
+        for alias, name in entity_aliases().items():
+            tokens = tokenize(alias)
+            if not tokens:
+                continue
+            # Every alias token must appear as an indexed term
+            postings = [search_index.postings.get(token) for token in tokens]
+            if not all(postings):
+                continue
+            matches = set(min(postings, key=len))
+            for posting in postings:
+                matches.intersection_update(posting)
+            if matches:
+                documents.setdefault(name, set()).update(matches)
+        return {name: len(doc_ids) for name, doc_ids in documents.items()}
+
+    def _top_ranks(self, prefix: str, limit: int) -> List[int]:
+        """Distinct entry ranks of the best `limit` suggestions under a normalized prefix"""
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff", lo)
+        ranks = self.key_ranks[lo:hi]
+        if len(ranks) > 4 * limit:
+            # An entry can sit under several word starts; oversample before de-duplicating
+            top = np.unique(np.partition(ranks, 4 * limit)[:4 * limit])
+            if len(top) >= limit:
+                return top[:limit].tolist()
+        return np.unique(ranks)[:limit].tolist()
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Suggest completions for a partially typed query
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            Suggestions with text, kind and document count, most frequent first
+        """
+        key = normalize_suggestion(prefix)
+        if not key or limit <= 0:
+            return []
+        if len(key) <= PRECOMPUTED_PREFIX_LENGTH and limit <= PRECOMPUTED_LIMIT:
+            ranks = self._short_prefixes.get(key, [])[:limit]
+        else:
+            ranks = self._top_ranks(key, limit)
+        return [
+            {"text": self.texts[rank], "type": self.kinds[rank], "count": int(self.counts[rank])}
+            for rank in ranks
+        ]
@@ -1,5 +1,7 @@
 import logging
 import json
+import os
+import asyncio
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
@@ -12,6 +14,7 @@ from database.chunk_storage import ChunkStorage
 from kg_extraction.ner_extractor import NERExtractor
 from kg_extraction.vocabulary_normalizer import VocabularyNormalizer
 from summarization.audit_logger import AuditLogger  # Added import
+from metrics import STAGE_LATENCY
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -52,6 +55,8 @@ class RetrievalAugmentedSummarizer:
         
         # Initialize components
         self.vector_storage = VectorStorage(index_path=vector_store_path)
+        self._vector_index_mtime = None
+        self._reload_lock = None
         self.embedding_generator = EmbeddingGenerator()
         self.chunk_storage = None  # Will initialize in context manager
         self.ner_extractor = NERExtractor()
@@ -75,6 +80,7 @@ class RetrievalAugmentedSummarizer:
     def _initialize_models(self):
         """Initialize required models"""
         try:
+            self._vector_index_mtime = self._get_vector_index_mtime()
             self.vector_storage.initialize_index()
             self.embedding_generator.initialize_model()
             
@@ -91,6 +97,63 @@ class RetrievalAugmentedSummarizer:
             logger.error(f"Error initializing models: {e}")
             raise
 
+    def _get_vector_index_mtime(self) -> Optional[float]:
+        """Return the modification time of the FAISS index file, or None if absent"""
+        try:
+            return os.path.getmtime(self.vector_store_path)
+        except OSError:
+            return None
+
+    def warm_up(self):
+        """
+        Run a dummy query through the embedding model, vector index and NER model
+        so the first real request does not pay for lazy initialization
+        """
+        try:
+            query_embedding = self.embedding_generator.generate_embedding("effects of microgravity on plant growth")
+            if self.vector_storage.index is not None and self.vector_storage.index.ntotal > 0:
+                self.vector_storage.search_vectors(query_embedding, k=1)
+            self.ner_extractor.extract_entities("Arabidopsis thaliana seedlings were grown in microgravity.")
+            logger.info("Summarizer warmed up")
+        except Exception as e:
+            logger.warning(f"Summarizer warm-up failed: {e}")
+
+    async def reload_vector_index_if_changed(self) -> bool:
+        """
+        Hot-swap the FAISS index if the index file has been rewritten
+        
+        The new index is loaded into a separate VectorStorage in a worker thread
+        and swapped in with a single attribute assignment, so in-flight searches
+        keep using the index they started with.
+        
+        Returns:
+            True if a new index was loaded
+        """
+        mtime = self._get_vector_index_mtime()
+        if mtime is None or mtime == self._vector_index_mtime:
+            return False
+        
+        if self._reload_lock is None:
+            self._reload_lock = asyncio.Lock()
+        
+        async with self._reload_lock:
+            # Another request may have reloaded while we waited
+            if mtime == self._vector_index_mtime:
+                return False
+            
+            new_storage = VectorStorage(dimension=self.vector_storage.dimension,
+                                        index_path=self.vector_store_path)
+            try:
+                await asyncio.to_thread(new_storage.initialize_index)
+            except Exception as e:
+                logger.error(f"Error reloading FAISS index, keeping current index: {e}")
+                return False
+            
+            self.vector_storage = new_storage
+            self._vector_index_mtime = mtime
+            logger.info(f"Hot-swapped FAISS index from {self.vector_store_path}")
+            return True
+
     async def __aenter__(self):
         """Async context manager entry"""
         self.chunk_storage = ChunkStorage(self.db_config)
@@ -124,21 +187,25 @@ class RetrievalAugmentedSummarizer:
             )
             
             # Generate query embedding
-            query_embedding = self.embedding_generator.generate_embedding(query)
+            with STAGE_LATENCY.time(stage="embedding_encode"):
+                query_embedding = self.embedding_generator.generate_embedding(query)
             
-            # Search vector store
-            results = self.vector_storage.search_vectors(query_embedding, k=top_k)
+            # Search vector store (local reference survives a concurrent hot swap)
+            vector_storage = self.vector_storage
+            with STAGE_LATENCY.time(stage="faiss_search"):
+                results = vector_storage.search_vectors(query_embedding, k=top_k)
             
             # Enrich with chunk content
             enriched_results = []
-            for result in results:
-                chunk_id = result.get('section_id')
-                if chunk_id:
-                    chunk = await self.chunk_storage.get_chunk_by_id(chunk_id)
-                    if chunk:
-                        # Combine vector store metadata with chunk content
-                        enriched_result = {**result, **chunk}
-                        enriched_results.append(enriched_result)
+            with STAGE_LATENCY.time(stage="postgres_fetch"):
+                for result in results:
+                    chunk_id = result.get('section_id')
+                    if chunk_id:
+                        chunk = await self.chunk_storage.get_chunk_by_id(chunk_id)
+                        if chunk:
+                            # Combine vector store metadata with chunk content
+                            enriched_result = {**result, **chunk}
+                            enriched_results.append(enriched_result)
             
             logger.info(f"Retrieved {len(enriched_results)} relevant chunks")
             return enriched_results
@@ -283,7 +350,8 @@ class RetrievalAugmentedSummarizer:
         
         # Extract key entities from chunks
         all_content = ' '.join([chunk.get('content', '') for chunk in chunks[:3]])
-        entities = self.ner_extractor.extract_entities(all_content)
+        with STAGE_LATENCY.time(stage="ner"):
+            entities = self.ner_extractor.extract_entities(all_content)
         
         if entities:
             entity_names = list(set([e.entity_name for e in entities[:3]]))
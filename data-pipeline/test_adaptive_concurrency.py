@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for the adaptive study pipeline: results, throttling and error shutdown
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from adaptive_concurrency import AIMDLimiter, run_adaptive_pipeline
+
+
+class Throttled(Exception):
+    """Stands in for an S3 503 SlowDown"""
+    status = 503
+
+
+async def numbers(count=None):
+    i = 0
+    while count is None or i < count:
+        yield i
+        i += 1
+        await asyncio.sleep(0)
+
+
+async def test_completes():
+    results = []
+    calls = {}
+
+    async def worker(i):
+        calls[i] = calls.get(i, 0) + 1
+        await asyncio.sleep(0.001)
+        # Every fifth item is throttled once, then succeeds on retry
+        if i % 5 == 0 and calls[i] == 1:
+            raise Throttled("slow down")
+        return i * 2
+
+    limiter = AIMDLimiter("test_completes", initial=4, maximum=8, cooldown=0)
+    progress = await run_adaptive_pipeline(numbers(50), worker, limiter,
+                                           on_result=lambda item, result: results.append(result))
+    assert sorted(results) == [i * 2 for i in range(50)], results
+    assert progress.completed == 50 and progress.failed == 0, progress
+    assert progress.throttled == 10 and progress.retried == 10, progress
+    assert limiter.in_flight == 0
+    print("Pipeline completes with throttle retries:", progress.to_dict())
+
+
+async def test_callback_error_stops_pipeline():
+    # An endless source with a small queue: the queue is full when the callback fails
+    def on_result(item, result):
+        if item == 10:
+            raise OSError("No space left on device")
+
+    async def worker(i):
+        await asyncio.sleep(0.01)
+        return i
+
+    limiter = AIMDLimiter("test_callback_error", initial=2, maximum=2)
+    try:
+        await asyncio.wait_for(run_adaptive_pipeline(numbers(), worker, limiter, on_result=on_result), timeout=5)
+    except asyncio.TimeoutError:
+        raise AssertionError("pipeline hung after the callback error")
+    except OSError as e:
+        print("Callback error propagated:", e)
+    else:
+        raise AssertionError("pipeline finished despite the callback error")
+
+
+async def test_async_callback_is_awaited():
+    written = []
+    lock = asyncio.Lock()
+
+    async def on_result(item, result):
+        # Like write_all_studies: serialized writes done in a thread
+        async with lock:
+            await asyncio.to_thread(written.append, result)
+
+    async def worker(i):
+        return await asyncio.to_thread(lambda: i + 1)
+
+    def failing(i):
+        raise ValueError(f"bad study {i}")
+
+    limiter = AIMDLimiter("test_async_callback", initial=4, minimum=4, maximum=4)
+    progress = await run_adaptive_pipeline(numbers(20), worker, limiter, on_result=on_result)
+    assert sorted(written) == list(range(1, 21)), written
+    print("Async callback awaited for every result:", len(written))
+
+    # Worker errors are counted as failures, not completions
+    progress = await run_adaptive_pipeline(numbers(5), lambda i: asyncio.to_thread(failing, i), limiter)
+    assert progress.failed == 5 and progress.completed == 0, progress
+    print("Worker errors counted as failed:", progress.failed)
+
+
+async def test_source_error_stops_pipeline():
+    async def failing_source():
+        async for i in numbers(20):
+            yield i
+        raise ConnectionError("listing failed")
+
+    async def worker(i):
+        await asyncio.sleep(0.01)
+        return i
+
+    limiter = AIMDLimiter("test_source_error", initial=2, maximum=2)
+    try:
+        await asyncio.wait_for(run_adaptive_pipeline(failing_source(), worker, limiter), timeout=5)
+    except asyncio.TimeoutError:
+        raise AssertionError("pipeline hung after the source error")
+    except ConnectionError as e:
+        print("Source error propagated:", e)
+    else:
+        raise AssertionError("pipeline finished despite the source error")
+
+
+async def main():
+    print("Testing adaptive concurrency pipeline...")
+    print("=" * 60)
+    await test_completes()
+    await test_callback_error_stops_pipeline()
+    await test_async_callback_is_awaited()
+    await test_source_error_stops_pipeline()
+    print("All adaptive pipeline tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -263,11 +263,14 @@ class VectorStorage:
             raise RuntimeError("Index not initialized.")
             
         try:
-            # Save index
-            faiss.write_index(self.index, self.index_path)
+            # Write both files to temporaries first so readers that hot-reload
+            # the index never observe a partially written file
+            index_tmp_path = f"{self.index_path}.tmp"
+            faiss.write_index(self.index, index_tmp_path)
             
             # Save metadata
             metadata_path = self.index_path.replace('.faiss', '_metadata.json')
+            metadata_tmp_path = f"{metadata_path}.tmp"
             metadata = {
                 'id_mapping': self.id_mapping,
                 'metadata': self.metadata,
@@ -275,8 +278,12 @@ class VectorStorage:
                 'created_at': datetime.now().isoformat()
             }
             
-            with open(metadata_path, 'w') as f:
+            with open(metadata_tmp_path, 'w') as f:
                 json.dump(metadata, f, indent=2)
+            
+            # Publish metadata before the index: readers key off the index mtime
+            os.replace(metadata_tmp_path, metadata_path)
+            os.replace(index_tmp_path, self.index_path)
                 
             logger.info(f"Saved index with {self.index.ntotal} vectors to {self.index_path}")
             